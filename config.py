@@ -29,3 +29,41 @@ PATREON_REDIRECT_URI = "http://127.0.0.1:8188/morpheus/patreon/callback"
 PATREON_AUTHORIZE_URL = "https://www.patreon.com/oauth2/authorize"
 PATREON_TOKEN_URL = "https://www.patreon.com/api/oauth2/token"
 PATREON_API_URL = "https://www.patreon.com/api/oauth2/v2"
+
+# Remote Image Cache Settings
+REMOTE_DOWNLOAD_CHUNK_SIZE = 256 * 1024
+REMOTE_DOWNLOAD_TIMEOUT = 30
+WARMUP_DEFAULT_WORKERS = int(os.environ.get("MORPHEUS_WARMUP_WORKERS", "4"))
+WARMUP_DEFAULT_MAX_KBPS = int(os.environ.get("MORPHEUS_WARMUP_MAX_KBPS", "0"))
+DECODED_TENSOR_CACHE_MB = int(os.environ.get("MORPHEUS_TENSOR_CACHE_MB", "512"))
+DECODED_SIDECARS_ENABLED = os.environ.get("MORPHEUS_DECODED_SIDECARS", "0") == "1"
+BATCH_DECODE_WORKERS = int(os.environ.get("MORPHEUS_BATCH_DECODE_WORKERS", str(min(8, os.cpu_count() or 4))))
+REMOTE_CATALOG_TTL_SECONDS = int(os.environ.get("MORPHEUS_REMOTE_CATALOG_TTL", "300"))
+REMOTE_CATALOG_RETRY_SECONDS = int(os.environ.get("MORPHEUS_REMOTE_CATALOG_RETRY", "30"))
+
+# Catalog Persistence Settings
+CATALOG_FLUSH_DELAY_SECONDS = float(os.environ.get("MORPHEUS_CATALOG_FLUSH_DELAY", "1.0"))
+CATALOG_FLUSH_MAX_DELAY_SECONDS = float(os.environ.get("MORPHEUS_CATALOG_FLUSH_MAX_DELAY", "5.0"))
+CATALOG_BACKEND = os.environ.get("MORPHEUS_CATALOG_BACKEND", "json").lower()  # "json" or "sqlite"
+CATALOG_JOURNAL_ENABLED = os.environ.get("MORPHEUS_CATALOG_JOURNAL", "1") == "1"
+CATALOG_JOURNAL_COMPACT_BYTES = int(os.environ.get("MORPHEUS_CATALOG_JOURNAL_COMPACT_KB", "256")) * 1024
+CATALOG_MANAGER_LIMIT = int(os.environ.get("MORPHEUS_CATALOG_MANAGER_LIMIT", "8"))  # open catalogs kept in memory
+
+# Gallery UI State Settings
+UI_STATE_MAX_ENTRIES = int(os.environ.get("MORPHEUS_UI_STATE_MAX_ENTRIES", "1000"))
+UI_STATE_MAX_AGE_DAYS = float(os.environ.get("MORPHEUS_UI_STATE_MAX_AGE_DAYS", "90"))
+
+# Bulk Import Settings
+THUMBNAIL_WORKERS = int(os.environ.get("MORPHEUS_THUMBNAIL_WORKERS", str(min(4, os.cpu_count() or 2))))
+IMPORT_MAX_FILE_MB = int(os.environ.get("MORPHEUS_IMPORT_MAX_FILE_MB", "50"))
+IMPORT_MAX_ARCHIVE_MB = int(os.environ.get("MORPHEUS_IMPORT_MAX_ARCHIVE_MB", "500"))
+
+# Upload Settings
+UPLOAD_MAX_FILE_MB = int(os.environ.get("MORPHEUS_UPLOAD_MAX_FILE_MB", str(IMPORT_MAX_FILE_MB)))
+UPLOAD_NEAR_DUPLICATE_DISTANCE = int(os.environ.get("MORPHEUS_UPLOAD_NEAR_DUPLICATE_DISTANCE", "6"))  # dHash bits, 0 disables
+TEMP_UPLOAD_MAX_AGE_HOURS = float(os.environ.get("MORPHEUS_TEMP_UPLOAD_MAX_AGE_HOURS", "24"))
+
+# Filesystem Watcher Settings
+WATCHER_ENABLED = os.environ.get("MORPHEUS_WATCHER", "1") == "1"
+WATCHER_INTERVAL_SECONDS = float(os.environ.get("MORPHEUS_WATCHER_INTERVAL", "0.5"))
+WATCHER_BACKEND = os.environ.get("MORPHEUS_WATCHER_BACKEND", "auto").lower()  # "auto", "inotify" or "poll"
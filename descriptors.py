@@ -0,0 +1,236 @@
+"""
+Morpheus Model Management - Image descriptors
+Compact CPU-computed image descriptors and a NumPy matrix for
+nearest-neighbor "similar talents" queries
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Any
+
+import numpy as np
+from PIL import Image
+
+from .persistence import DebouncedFlusher
+
+HUE_BINS, SAT_BINS, VAL_BINS = 12, 4, 2
+HISTOGRAM_SIZE = HUE_BINS * SAT_BINS * VAL_BINS
+EMBEDDING_SIDE = 8
+# Share of each block in the cosine similarity
+DESCRIPTOR_WEIGHTS = {"histogram": 0.4, "embedding": 0.4, "dhash": 0.2}
+DESCRIPTOR_SIZE = HISTOGRAM_SIZE + EMBEDDING_SIDE * EMBEDDING_SIDE * 3 + 64
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
+
+def compute_descriptor(image_path: str) -> Optional[np.ndarray]:
+    """Unit-length float32 vector: HSV histogram, 8x8 color thumbnail and dHash bits
+
+    Each block is normalized and scaled by the square root of its weight, so
+    the dot product of two descriptors is the weighted mean of the block
+    cosines. Returns None for unreadable images.
+    """
+    try:
+        with Image.open(image_path) as img:
+            img.draft('RGB', (64, 64))
+            rgb = img.convert('RGB').resize((32, 32), Image.BILINEAR)
+    except Exception:
+        return None
+
+    # Hellinger-style color histogram: square roots of the bin shares have unit length
+    hsv = np.asarray(rgb.convert('HSV'), dtype=np.uint32).reshape(-1, 3)
+    bins = ((hsv[:, 0] * HUE_BINS) >> 8) * SAT_BINS * VAL_BINS \
+        + ((hsv[:, 1] * SAT_BINS) >> 8) * VAL_BINS + ((hsv[:, 2] * VAL_BINS) >> 8)
+    histogram = np.sqrt(np.bincount(bins, minlength=HISTOGRAM_SIZE) / len(bins))
+
+    embedding = np.asarray(rgb.resize((EMBEDDING_SIDE, EMBEDDING_SIDE), Image.BILINEAR), dtype=np.float32).ravel() / 255.0
+    embedding = _unit(embedding - embedding.mean())
+
+    gray = np.asarray(rgb.convert('L').resize((9, 8), Image.BILINEAR), dtype=np.int16)
+    dhash_bits = np.where(gray[:, :-1] > gray[:, 1:], 1.0, -1.0).ravel() / 8.0
+
+    return np.concatenate([
+        histogram * np.sqrt(DESCRIPTOR_WEIGHTS["histogram"]),
+        embedding * np.sqrt(DESCRIPTOR_WEIGHTS["embedding"]),
+        dhash_bits * np.sqrt(DESCRIPTOR_WEIGHTS["dhash"]),
+    ]).astype(np.float32)
+
+class DescriptorIndex:
+    """Descriptors of one catalog's images, kept as a single (N, D) matrix
+
+    Descriptors are keyed by talent id and recomputed only when the image's
+    size or mtime changes. `add()` is called as images are uploaded or
+    cached, `refresh()` reconciles with the full catalog (in the background,
+    claimed with `begin_refresh()`), and `search()` is one matrix-vector
+    product. The index is written behind to an .npz
+    file.
+    """
+
+    def __init__(self, cache_path: str):
+        self.cache_path = cache_path
+        self.lock = threading.Lock()
+        self.entries: Optional[Dict[str, Tuple[str, int, int, np.ndarray]]] = None
+        self.catalog_version = None
+        self.pending_version = None
+        self.keys: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.matrix = np.zeros((0, DESCRIPTOR_SIZE), dtype=np.float32)
+        self.matrix_dirty = True
+        self.flusher = DebouncedFlusher(self._write, delay=2.0, max_delay=10.0, name="morpheus-descriptors-flush")
+
+    def _ensure_loaded(self):
+        if self.entries is not None:
+            return
+        self.entries = {}
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as data:
+                if data["vectors"].shape[1:] != (DESCRIPTOR_SIZE,):
+                    return  # descriptor layout changed, recompute
+                for key, path, (size, mtime_ns), vector in zip(data["keys"], data["paths"], data["stats"], data["vectors"]):
+                    self.entries[str(key)] = (str(path), int(size), int(mtime_ns), vector)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Morpheus: Ignoring unreadable descriptor cache: {e}")
+
+    def _write(self):
+        with self.lock:
+            items = list(self.entries.items())
+        if not items:
+            vectors = np.zeros((0, DESCRIPTOR_SIZE), dtype=np.float32)
+        else:
+            vectors = np.stack([entry[3] for _, entry in items])
+        temp_path = f"{self.cache_path}.{os.getpid()}.tmp.npz"
+        try:
+            np.savez(temp_path,
+                     keys=np.array([key for key, _ in items], dtype=str),
+                     paths=np.array([entry[0] for _, entry in items], dtype=str),
+                     stats=np.array([[entry[1], entry[2]] for _, entry in items], dtype=np.int64).reshape(-1, 2),
+                     vectors=vectors)
+            os.replace(temp_path, self.cache_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @staticmethod
+    def _fresh_entry(path: str, entry: Optional[Tuple[str, int, int, np.ndarray]]):
+        """(changed, entry) for an image, entry is None if it is missing or unreadable"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return entry is not None, None
+        if entry is not None and entry[0] == path and entry[1] == stat.st_size and entry[2] == stat.st_mtime_ns:
+            return False, entry
+        vector = compute_descriptor(path)
+        if vector is None:
+            return entry is not None, None
+        return True, (path, stat.st_size, stat.st_mtime_ns, vector)
+
+    def add(self, key: str, path: str):
+        """Compute the descriptor of a newly uploaded or cached image"""
+        with self.lock:
+            self._ensure_loaded()
+            changed, entry = self._fresh_entry(path, self.entries.get(key))
+            if entry is None:
+                self.entries.pop(key, None)
+            else:
+                self.entries[key] = entry
+            self.matrix_dirty = self.matrix_dirty or changed
+        if changed:
+            self.flusher.mark_dirty()
+
+    @property
+    def refreshing(self) -> bool:
+        return self.pending_version is not None
+
+    def begin_refresh(self, catalog_version: Any) -> bool:
+        """Claim a refresh for catalog_version, False if it is current or already under way"""
+        with self.lock:
+            if catalog_version is not None and catalog_version in (self.catalog_version, self.pending_version):
+                return False
+            self.pending_version = catalog_version
+            return True
+
+    def refresh(self, images: Iterable[Tuple[str, str]], catalog_version: Any = None):
+        """Reconcile with (key, image_path) pairs, skipped while catalog_version is unchanged
+
+        Descriptors are computed outside the lock, so searches keep answering
+        from the current matrix while a large catalog is backfilled.
+        """
+        with self.lock:
+            self._ensure_loaded()
+            if catalog_version is not None and catalog_version == self.catalog_version:
+                return
+            known = dict(self.entries)
+        updates, seen = {}, set()
+        for key, path in images:
+            seen.add(key)
+            changed, entry = self._fresh_entry(path, known.get(key))
+            if changed:
+                updates[key] = entry
+        with self.lock:
+            changed = False
+            # Entries that add() replaced meanwhile are newer than ours
+            for key, entry in updates.items():
+                if self.entries.get(key) is not known.get(key):
+                    continue
+                if entry is None:
+                    self.entries.pop(key, None)
+                else:
+                    self.entries[key] = entry
+                changed = True
+            for key in [key for key in known if key not in seen and self.entries.get(key) is known[key]]:
+                del self.entries[key]
+                changed = True
+            self.catalog_version = catalog_version
+            if self.pending_version == catalog_version:
+                self.pending_version = None
+            self.matrix_dirty = self.matrix_dirty or changed
+        if changed:
+            self.flusher.mark_dirty()
+
+    def invalidate(self):
+        """Re-check the images on the next refresh even if the catalog is unchanged"""
+        with self.lock:
+            self.catalog_version = None
+            self.pending_version = None
+
+    def flush(self) -> bool:
+        return self.flusher.flush()
+
+    def _ensure_matrix(self):
+        if not self.matrix_dirty:
+            return
+        self.keys = list(self.entries)
+        self.rows = {key: row for row, key in enumerate(self.keys)}
+        self.matrix = np.stack([self.entries[key][3] for key in self.keys]) if self.keys \
+            else np.zeros((0, DESCRIPTOR_SIZE), dtype=np.float32)
+        self.matrix_dirty = False
+
+    def search(self, key: str, limit: int = 12, candidates: Optional[Set[str]] = None) -> Optional[List[Tuple[str, float]]]:
+        """Most similar (key, score) pairs, best first; None if `key` has no descriptor
+
+        `candidates` restricts the results to those keys (e.g. a filtered
+        catalog view).
+        """
+        with self.lock:
+            self._ensure_loaded()
+            self._ensure_matrix()
+            row = self.rows.get(key)
+            if row is None:
+                return None
+            keys, matrix = self.keys, self.matrix
+            rows = self.rows
+        scores = matrix @ matrix[row]
+        if candidates is not None:
+            mask = np.zeros(len(keys), dtype=bool)
+            mask[[rows[k] for k in candidates if k in rows]] = True
+            scores = np.where(mask, scores, -np.inf)
+        scores[row] = -np.inf
+        limit = min(limit, int(np.isfinite(scores).sum()))
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [(keys[i], round(float(scores[i]), 4)) for i in top]
@@ -0,0 +1,87 @@
+"""
+Morpheus Model Management - Favorites overlay
+Per-device favorite talent ids kept apart from catalog data, so they work for
+the local and the remote catalog alike
+"""
+
+import os
+import json
+import threading
+from typing import Callable, Dict, Iterable, List, Any, Optional, FrozenSet
+
+from .persistence import DebouncedFlusher, atomic_write_json
+
+class FavoritesOverlay:
+    """Set of favorite talent ids with its own small, write-behind persisted file
+
+    Toggling only touches the in-memory set; the file is rewritten by a
+    debounced flush. Catalog queries merge the overlay in through `ids()`,
+    which returns a frozen copy cached until the next change.
+    """
+
+    def __init__(self, path: str, device_id_fn: Optional[Callable[[], str]] = None,
+                 seed_fn: Optional[Callable[[], Iterable[str]]] = None):
+        self.path = path
+        self.device_id_fn = device_id_fn
+        self.seed_fn = seed_fn
+        self.lock = threading.Lock()
+        self.favorites = None
+        self.version = 0
+        self._frozen: Optional[FrozenSet[str]] = None
+        self.flusher = DebouncedFlusher(self._write, delay=0.5, max_delay=2.0, name="morpheus-favorites-flush")
+
+    def _ensure_loaded(self):
+        if self.favorites is not None:
+            return
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.favorites = set(json.load(f).get("favorites", []))
+                return
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"Morpheus: Ignoring unreadable favorites file: {e}")
+        # First run: carry over the is_favorite flags stored in the catalog
+        self.favorites = set(self.seed_fn() if self.seed_fn else [])
+        if self.favorites:
+            self.flusher.mark_dirty()
+
+    def _write(self):
+        with self.lock:
+            favorites = sorted(self.favorites or [])
+        data = {"device_id": self.device_id_fn() if self.device_id_fn else "", "favorites": favorites}
+        atomic_write_json(self.path, data)
+
+    def ids(self) -> FrozenSet[str]:
+        with self.lock:
+            self._ensure_loaded()
+            if self._frozen is None:
+                self._frozen = frozenset(self.favorites)
+            return self._frozen
+
+    def contains(self, talent_id: str) -> bool:
+        with self.lock:
+            self._ensure_loaded()
+            return talent_id in self.favorites
+
+    def set(self, talent_id: str, is_favorite: bool) -> bool:
+        with self.lock:
+            self._ensure_loaded()
+            if is_favorite == (talent_id in self.favorites):
+                return is_favorite
+            if is_favorite:
+                self.favorites.add(talent_id)
+            else:
+                self.favorites.discard(talent_id)
+            self._frozen = None
+            self.version += 1
+        self.flusher.mark_dirty()
+        return is_favorite
+
+    def toggle(self, talent_id: str) -> bool:
+        """Flip a talent's favorite state, returns the new state"""
+        return self.set(talent_id, not self.contains(talent_id))
+
+    def merge(self, talents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Copies of the records with is_favorite taken from the overlay"""
+        ids = self.ids()
+        return [{**talent, "is_favorite": talent.get("id") in ids} for talent in talents]
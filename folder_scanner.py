@@ -0,0 +1,131 @@
+"""
+Morpheus Model Management - Incremental folder scanner
+Diffs an images folder against a manifest of (path, size, mtime_ns) so a
+rescan only reports files that were added, changed or removed
+"""
+
+import os
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from .persistence import atomic_write_json
+
+SCAN_IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp'}
+
+class ScanDelta:
+    """Files that differ from the manifest, as paths relative to the scanned folder"""
+
+    def __init__(self):
+        self.added: List[str] = []
+        self.changed: List[str] = []
+        self.removed: Dict[str, Optional[str]] = {}  # path -> talent id it was recorded with
+        # No manifest to compare with, files deleted before this scan can't show up in `removed`
+        self.initial = False
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def summary(self) -> Dict[str, int]:
+        return {"added": len(self.added), "changed": len(self.changed), "removed": len(self.removed)}
+
+class FolderScanner:
+    """Walks a folder with os.scandir and compares every image with the manifest
+
+    An unchanged folder costs one stat per file (the directory walk reuses
+    scandir's cached entry types) and no writes. The manifest also remembers
+    which talent each file belongs to, so removals can be mapped back to
+    catalog records; `commit()` persists it once the delta was applied.
+    """
+
+    def __init__(self, folder: str, manifest_path: str, extensions=SCAN_IMAGE_EXTENSIONS):
+        self.folder = folder
+        self.manifest_path = manifest_path
+        self.extensions = {ext.lower() for ext in extensions}
+        self.lock = threading.Lock()
+        self.files: Optional[Dict[str, List[Any]]] = None
+        self.pending: Optional[Dict[str, List[Any]]] = None
+
+    def _ensure_loaded(self):
+        if self.files is not None:
+            return
+        self.files = {}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                # A manifest of another folder is no baseline for this one
+                if manifest.get("folder") == self.folder:
+                    self.files = manifest.get("files", {})
+            except (json.JSONDecodeError, IOError, AttributeError) as e:
+                print(f"Morpheus: Ignoring unreadable scan manifest: {e}")
+
+    def _walk(self, directory: str, prefix: str, found: Dict[str, List[Any]]):
+        try:
+            entries = os.scandir(directory)
+        except OSError as e:
+            print(f"Morpheus: Could not scan {directory}: {e}")
+            return
+        with entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    self._walk(entry.path, prefix + entry.name + "/", found)
+                elif os.path.splitext(entry.name)[1].lower() in self.extensions:
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    found[prefix + entry.name] = [stat.st_size, stat.st_mtime_ns]
+
+    def scan(self) -> ScanDelta:
+        """Compare the folder with the manifest, the result stays pending until commit()"""
+        found: Dict[str, List[Any]] = {}
+        if os.path.isdir(self.folder):
+            self._walk(self.folder, "", found)
+        delta = ScanDelta()
+        with self.lock:
+            self._ensure_loaded()
+            delta.initial = not self.files
+            for path, (size, mtime_ns) in found.items():
+                known = self.files.get(path)
+                if known is None:
+                    delta.added.append(path)
+                    continue
+                if known[0] != size or known[1] != mtime_ns:
+                    delta.changed.append(path)
+                # Carry the talent id over
+                found[path].append(known[2] if len(known) > 2 else None)
+            for path, known in self.files.items():
+                if path not in found:
+                    delta.removed[path] = known[2] if len(known) > 2 else None
+            self.pending = found
+        delta.added.sort()
+        return delta
+
+    def assign(self, path: str, talent_id: Optional[str]):
+        """Record which talent a pending file belongs to"""
+        with self.lock:
+            entry = (self.pending or {}).get(path)
+            if entry is not None:
+                entry[2:] = [talent_id]
+
+    def talent_for(self, path: str) -> Optional[str]:
+        with self.lock:
+            entry = (self.pending or self.files or {}).get(path)
+            return entry[2] if entry is not None and len(entry) > 2 else None
+
+    def commit(self):
+        """Make the last scan the new baseline"""
+        with self.lock:
+            if self.pending is None:
+                return
+            files, self.pending = self.pending, None
+            for entry in files.values():
+                if len(entry) < 3:
+                    entry.append(None)
+            if files == self.files:
+                return
+            self.files = files
+            atomic_write_json(self.manifest_path, {"folder": self.folder, "files": files}, indent=None)
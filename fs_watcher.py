@@ -0,0 +1,323 @@
+"""
+Morpheus Model Management - Filesystem watcher
+Notices external edits to catalog files and folders (inotify on Linux, stat
+polling elsewhere) and tells the in-process caches what changed
+"""
+
+import os
+import time
+import ctypes
+import ctypes.util
+import struct
+import select
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+WatchCallback = Callable[[Set[str]], None]
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+def _load_inotify():
+    """libc with inotify, or None where it is unavailable"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            return None
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+class _PollBackend:
+    """Stat signatures of watched files, plus mtimes and listings of watched directory trees
+
+    Adding, removing or renaming an entry changes its directory's mtime, so
+    each poll only stats the directories; a listing is re-read just for the
+    directories that moved. In-place rewrites that keep the directory's
+    mtime are noticed for watched files only.
+    """
+
+    def __init__(self):
+        self.files: Dict[str, Optional[Tuple[int, int, int]]] = {}
+        self.dirs: Dict[str, Optional[int]] = {}
+        self.listings: Dict[str, Dict[str, Tuple[int, int, bool]]] = {}
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _list(self, directory: str) -> Dict[str, Tuple[int, int, bool]]:
+        listing = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                        listing[entry.name] = (st.st_mtime_ns, st.st_size, entry.is_dir(follow_symlinks=False))
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return listing
+
+    def _track_tree(self, directory: str, changed: Optional[Set[str]] = None):
+        try:
+            self.dirs[directory] = os.stat(directory).st_mtime_ns
+        except OSError:
+            self.dirs[directory] = None
+            return
+        listing = self.listings[directory] = self._list(directory)
+        for name, (_, _, is_dir) in listing.items():
+            path = os.path.join(directory, name)
+            if changed is not None:
+                changed.add(path)
+            if is_dir:
+                self._track_tree(path, changed)
+
+    def add_file(self, path: str):
+        self.files[path] = self._signature(path)
+
+    def add_dir(self, path: str):
+        self._track_tree(path)
+
+    def poll(self, timeout: float, stop: threading.Event) -> Set[str]:
+        if stop.wait(timeout):
+            return set()
+        changed = set()
+        for path, signature in list(self.files.items()):
+            current = self._signature(path)
+            if current != signature:
+                self.files[path] = current
+                changed.add(path)
+        for directory, mtime_ns in list(self.dirs.items()):
+            if directory not in self.dirs:
+                continue  # dropped with a removed parent
+            try:
+                current = os.stat(directory).st_mtime_ns
+            except OSError:
+                current = None
+            if current == mtime_ns:
+                continue
+            self.dirs[directory] = current
+            old = self.listings.pop(directory, {})
+            new = self.listings[directory] = self._list(directory) if current is not None else {}
+            for name in set(old) | set(new):
+                if old.get(name) == new.get(name):
+                    continue
+                path = os.path.join(directory, name)
+                changed.add(path)
+                if name in old and old[name][2]:
+                    self._forget_tree(path, changed)
+                if name in new and new[name][2]:
+                    self._track_tree(path, changed)
+        return changed
+
+    def _forget_tree(self, directory: str, changed: Set[str]):
+        for name in self.listings.pop(directory, {}):
+            changed.add(os.path.join(directory, name))
+        self.dirs.pop(directory, None)
+        prefix = directory + os.sep
+        for path in [path for path in self.dirs if path.startswith(prefix)]:
+            self.dirs.pop(path, None)
+            self.listings.pop(path, None)
+
+    def close(self):
+        pass
+
+class _InotifyBackend:
+    """inotify watches on every watched directory and on the parents of watched paths
+
+    Watching the parent catches files replaced by rename (atomic writes) and
+    directories that are created after the watcher started.
+    """
+
+    def __init__(self, libc):
+        self.libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(f"inotify_init1 failed (errno {ctypes.get_errno()})")
+        self.paths: Dict[int, str] = {}
+        self.tree_roots: Set[str] = set()
+
+    def _add_watch(self, path: str) -> bool:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            return False
+        self.paths[wd] = path
+        return True
+
+    def _watch_tree(self, directory: str, changed: Optional[Set[str]] = None):
+        if not self._add_watch(directory):
+            return
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if changed is not None:
+                        changed.add(entry.path)
+                    if entry.is_dir(follow_symlinks=False):
+                        self._watch_tree(entry.path, changed)
+        except OSError:
+            pass
+
+    def _in_tree(self, path: str) -> bool:
+        return any(path == root or path.startswith(root + os.sep) for root in self.tree_roots)
+
+    def add_file(self, path: str):
+        self._add_watch(os.path.dirname(path))
+
+    def add_dir(self, path: str):
+        self.tree_roots.add(path)
+        self._add_watch(os.path.dirname(path))
+        if os.path.isdir(path):
+            self._watch_tree(path)
+
+    def poll(self, timeout: float, stop: threading.Event) -> Set[str]:
+        changed = set()
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable or stop.is_set():
+            return changed
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost, report every watched path
+                changed.update(self.paths.values())
+                changed.update(self.tree_roots)
+                continue
+            directory = self.paths.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                self.paths.pop(wd, None)
+                continue
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            changed.add(path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and self._in_tree(path):
+                self._watch_tree(path, changed)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+class FileWatcher:
+    """Background thread reporting changes under watched files and directory trees
+
+    Callbacks receive the set of changed paths below their target. Bursts
+    (a pipeline copying many files) are coalesced for `settle` seconds and
+    delivered as one call. `on_start` runs once every watch is registered,
+    so changes from then on are reported; `on_stop` runs when the thread
+    exits, stopped or failed, so callers relying on it can go back to
+    checking for themselves.
+    """
+
+    def __init__(self, interval: float = 0.5, backend: str = "auto", settle: float = 0.1,
+                 on_start: Optional[Callable[[], None]] = None, on_stop: Optional[Callable[[], None]] = None):
+        self.interval = interval
+        self.settle = settle
+        self.requested_backend = backend
+        self.on_start = on_start
+        self.on_stop = on_stop
+        self.targets: List[Tuple[str, WatchCallback, bool]] = []
+        self.backend = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.events = 0
+
+    @property
+    def backend_name(self) -> str:
+        if self.backend is None:
+            return "stopped"
+        return "inotify" if isinstance(self.backend, _InotifyBackend) else "poll"
+
+    def watch(self, path: str, callback: WatchCallback, directory: bool = False):
+        """Watch a file, or a directory tree with directory=True; call before start()"""
+        self.targets.append((os.path.abspath(path), callback, directory))
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="morpheus-fs-watcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.interval + 1)
+            self.thread = None
+
+    def _create_backend(self):
+        if self.requested_backend in ("auto", "inotify"):
+            libc = _load_inotify()
+            if libc is not None:
+                try:
+                    return _InotifyBackend(libc)
+                except OSError as e:
+                    print(f"Morpheus: inotify unavailable ({e}), polling instead")
+        return _PollBackend()
+
+    def _run(self):
+        backend = None
+        try:
+            backend = self._create_backend()
+            for path, _, directory in self.targets:
+                if directory:
+                    backend.add_dir(path)
+                else:
+                    backend.add_file(path)
+            self.backend = backend
+            if self.on_start is not None:
+                self.on_start()
+            while not self.stop_event.is_set():
+                changed = backend.poll(self.interval, self.stop_event)
+                if not changed:
+                    continue
+                deadline = time.monotonic() + self.settle
+                while time.monotonic() < deadline:
+                    changed |= backend.poll(max(0.0, deadline - time.monotonic()), self.stop_event)
+                self.events += 1
+                self._dispatch(changed)
+        except Exception as e:
+            print(f"Morpheus: File watcher stopped: {e}")
+        finally:
+            if backend is not None:
+                backend.close()
+            self.backend = None
+            if self.on_stop is not None:
+                self.on_stop()
+
+    def _dispatch(self, changed: Set[str]):
+        for target, callback, _ in self.targets:
+            prefix = target + os.sep
+            paths = {path for path in changed if path == target or path.startswith(prefix)}
+            if not paths:
+                continue
+            try:
+                callback(paths)
+            except Exception as e:
+                print(f"Morpheus: Watch callback for {target} failed: {e}")
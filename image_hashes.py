@@ -0,0 +1,141 @@
+"""
+Morpheus Model Management - Image hashes
+Content and perceptual hashes of catalog images for duplicate detection
+"""
+
+import os
+import json
+import shutil
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from PIL import Image
+
+from .persistence import atomic_write_json
+
+def dhash(image_path: str, hash_size: int = 8) -> Optional[int]:
+    """Difference hash: one bit per horizontally adjacent pixel pair of a small grayscale copy
+
+    Survives re-encoding, resizing and small edits, so visually identical
+    images end up a few bits apart. Returns None for unreadable images.
+    """
+    try:
+        with Image.open(image_path) as img:
+            img.draft('L', (hash_size * 8, hash_size * 8))
+            pixels = list(img.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS).getdata())
+    except Exception:
+        return None
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def file_sha256(path: str, chunk_size: int = 256 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ImageHashIndex:
+    """sha256 and dHash of every catalog image, persisted between sessions
+
+    Entries are keyed by image path and reused while the file's size and
+    mtime are unchanged, so `refresh()` only hashes new or modified images.
+    """
+
+    def __init__(self, cache_path: str):
+        self.cache_path = cache_path
+        self.lock = threading.Lock()
+        self.entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self.talents: Dict[str, str] = {}
+        self.catalog_version = None
+
+    def _ensure_loaded(self):
+        if self.entries is not None:
+            return
+        self.entries = {}
+        if os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get("images", {})
+            except (json.JSONDecodeError, IOError, AttributeError) as e:
+                print(f"Morpheus: Ignoring unreadable image hash cache: {e}")
+
+    def refresh(self, images: Iterable[Tuple[str, str]], catalog_version: Any = None):
+        """Bring the index up to date with (talent_id, image_path) pairs
+
+        Skipped entirely while `catalog_version` matches the last refresh.
+        """
+        with self.lock:
+            self._ensure_loaded()
+            if catalog_version is not None and catalog_version == self.catalog_version:
+                return
+            talents, entries, changed = {}, {}, False
+            for talent_id, image_path in images:
+                try:
+                    stat = os.stat(image_path)
+                except OSError:
+                    continue
+                entry = self.entries.get(image_path)
+                if entry is None or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+                    entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                             "sha256": file_sha256(image_path), "dhash": dhash(image_path)}
+                    changed = True
+                entries[image_path] = entry
+                talents[image_path] = talent_id
+            changed = changed or len(entries) != len(self.entries)
+            self.entries, self.talents = entries, talents
+            self.catalog_version = catalog_version
+            if changed:
+                try:
+                    atomic_write_json(self.cache_path, {"images": entries}, indent=None)
+                except OSError as e:
+                    print(f"Morpheus: Could not save image hash cache: {e}")
+
+    def invalidate(self):
+        """Re-check the images on the next refresh even if the catalog is unchanged"""
+        with self.lock:
+            self.catalog_version = None
+
+    def find_duplicates(self, sha256: str, phash: Optional[int], max_distance: int = 0) -> List[Dict[str, Any]]:
+        """Catalog images matching the hashes, exact matches first, then by distance"""
+        matches = []
+        with self.lock:
+            for image_path, entry in (self.entries or {}).items():
+                talent_id = self.talents.get(image_path)
+                if talent_id is None:
+                    continue
+                if entry["sha256"] == sha256:
+                    matches.append({"talent_id": talent_id, "match": "exact", "distance": 0})
+                elif phash is not None and entry.get("dhash") is not None and max_distance > 0:
+                    distance = hamming_distance(phash, entry["dhash"])
+                    if distance <= max_distance:
+                        matches.append({"talent_id": talent_id, "match": "near", "distance": distance})
+        return sorted(matches, key=lambda match: (match["match"] != "exact", match["distance"]))
+
+def expire_temp_files(temp_dir: str, max_age_seconds: float) -> int:
+    """Remove entries of temp_dir not modified for max_age_seconds, returns how many"""
+    if not os.path.isdir(temp_dir):
+        return 0
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for entry in os.scandir(temp_dir):
+        try:
+            if entry.stat(follow_symlinks=False).st_mtime >= cutoff:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.remove(entry.path)
+            removed += 1
+        except OSError as e:
+            print(f"Morpheus: Could not expire temp upload {entry.name}: {e}")
+    return removed
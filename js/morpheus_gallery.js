@@ -637,6 +637,8 @@ const MorpheusGalleryNode = {
                 );
                 
                 galleryEl.innerHTML = "";
+                this.gallerySource = data.source;
+                this.visibleTalents = new Map();
                 
                 // Check if user is not authenticated - show Connect Patreon overlay
                 if (data.authenticated === false || data.show_cta === true) {
@@ -723,6 +725,8 @@ const MorpheusGalleryNode = {
                 data.talents.forEach(talent => {
                     const card = document.createElement("div");
                     card.className = "morpheus-talent-card";
+                    card.dataset.talentId = talent.id;
+                    this.visibleTalents.set(talent.id, talent);
                     if (talent.id === this.selectedTalentId) {
                         card.classList.add("selected");
                     }
@@ -964,15 +968,26 @@ const MorpheusGalleryNode = {
 
                 try {
                     // Upload file
-                    const formData = new FormData();
-                    formData.append('image', file);
-                    
-                    const response = await api.fetchApi('/morpheus/upload', {
-                        method: 'POST',
-                        body: formData
-                    });
+                    const uploadImage = async (allowDuplicates) => {
+                        const formData = new FormData();
+                        formData.append('image', file);
+                        
+                        const response = await api.fetchApi('/morpheus/upload' + (allowDuplicates ? '?allow_duplicates=1' : ''), {
+                            method: 'POST',
+                            body: formData
+                        });
+                        return await response.json();
+                    };
 
-                    const result = await response.json();
+                    let result = await uploadImage(false);
+                    
+                    // The server already holds this image (or a near-identical one)
+                    if (result.status === 'duplicate') {
+                        if (!confirm(result.error + '\n\nUpload it anyway?')) {
+                            return;
+                        }
+                        result = await uploadImage(true);
+                    }
                     
                     if (result.status === 'success') {
                         // Show metadata form
@@ -1260,6 +1275,64 @@ const MorpheusGalleryNode = {
                 renderTalents();
             });
 
+            // Catalog changes pushed by the server: patch visible cards in place,
+            // re-fetch the page only when talents were added or the catalog was reloaded
+            let refreshTimer = null;
+            const scheduleRefresh = () => {
+                clearTimeout(refreshTimer);
+                refreshTimer = setTimeout(() => renderTalents(), 300);
+            };
+            const findCard = (talentId) => Array.from(galleryEl.querySelectorAll(".morpheus-talent-card"))
+                .find(card => card.dataset.talentId === talentId);
+
+            const onCatalogEvent = ({ detail }) => {
+                if (!detail || !this.visibleTalents) return;
+                if (detail.source && detail.source !== this.gallerySource) return;
+                
+                switch (detail.kind) {
+                    case "favorite": {
+                        const talent = this.visibleTalents.get(detail.talent_id);
+                        const card = findCard(detail.talent_id);
+                        if (talent) talent.is_favorite = detail.is_favorite;
+                        card?.querySelector(".morpheus-favorite-star")?.classList.toggle("active", detail.is_favorite);
+                        if (this.filters?.favorites_only && !detail.is_favorite) scheduleRefresh();
+                        break;
+                    }
+                    case "talent_updated": {
+                        const talent = this.visibleTalents.get(detail.talent_id);
+                        const card = findCard(detail.talent_id);
+                        if (!talent || !card) break;
+                        Object.assign(talent, detail.fields);
+                        card.querySelector(".morpheus-talent-name").textContent = talent.name;
+                        card.querySelector(".talent-image").alt = talent.name;
+                        card.querySelector(".morpheus-talent-tags").innerHTML =
+                            (talent.tags || []).map(tag => `<span class="tag">${tag}</span>`).join('');
+                        if (talent.id === this.selectedTalentId) updatePreview(talent);
+                        break;
+                    }
+                    case "talent_deleted": {
+                        const card = findCard(detail.talent_id);
+                        if (card) {
+                            card.remove();
+                            this.visibleTalents.delete(detail.talent_id);
+                        }
+                        break;
+                    }
+                    case "talent_added":
+                    case "catalog_version":
+                        scheduleRefresh();
+                        break;
+                }
+            };
+            api.addEventListener("morpheus.catalog", onCatalogEvent);
+
+            const onRemoved = this.onRemoved;
+            this.onRemoved = function () {
+                api.removeEventListener("morpheus.catalog", onCatalogEvent);
+                clearTimeout(refreshTimer);
+                return onRemoved?.apply(this, arguments);
+            };
+
             // Initialize gallery with default size
             this.size[1] = 600;
             
@@ -6,10 +6,20 @@ A ComfyUI custom node for browsing and selecting talent models with gallery inte
 import os
 import json
 import uuid
+import asyncio
+import functools
+import time
+import glob
+import hashlib
+import warnings
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import torch
 import numpy as np
-from typing import Dict, List, Any, Tuple, Optional
+from typing import Callable, Dict, List, Any, Tuple, Optional
+from contextlib import asynccontextmanager
 # Conditional imports for ComfyUI environment
 try:
     import server
@@ -21,27 +31,55 @@ except ImportError:
     web = None
     COMFYUI_AVAILABLE = False
 
-from .schema import CatalogManager, create_sample_catalog
+try:
+    import comfy.utils
+    import comfy.model_management
+    COMFY_EXECUTION_AVAILABLE = True
+except ImportError:
+    comfy = None
+    COMFY_EXECUTION_AVAILABLE = False
+
+from .schema import TALENT_SCHEMA, get_catalog_manager, create_sample_catalog, validate_talent, add_external_change_listener
+from .thumbnails import THUMBNAIL_SIZE, make_thumbnail, generate_thumbnails, get_thumbnail_builder
+from .favorites import FavoritesOverlay
+from .ui_state import UIStateStore
+from .image_hashes import ImageHashIndex, dhash, expire_temp_files
+from .folder_scanner import FolderScanner, ScanDelta, SCAN_IMAGE_EXTENSIONS
+from .fs_watcher import FileWatcher
+from .descriptors import DescriptorIndex
 from .config import (
     SUPABASE_URL, SUPABASE_ANON_KEY, 
     CATALOG_JSON_URL, CATALOG_BASE_URL, IMAGES_BASE_URL, THUMBNAILS_BASE_URL,
     LICENSE_CACHE_DAYS, LICENSE_OFFLINE_GRACE_DAYS,
     PATREON_CLIENT_ID, PATREON_CLIENT_SECRET, PATREON_CREATOR_ACCESS_TOKEN,
     PATREON_REDIRECT_URI, PATREON_AUTHORIZE_URL, PATREON_TOKEN_URL, PATREON_API_URL,
-    SUPABASE_FUNCTIONS_URL
+    SUPABASE_FUNCTIONS_URL, REMOTE_DOWNLOAD_CHUNK_SIZE, REMOTE_DOWNLOAD_TIMEOUT,
+    DECODED_TENSOR_CACHE_MB, DECODED_SIDECARS_ENABLED, BATCH_DECODE_WORKERS,
+    REMOTE_CATALOG_TTL_SECONDS, REMOTE_CATALOG_RETRY_SECONDS,
+    UI_STATE_MAX_ENTRIES, UI_STATE_MAX_AGE_DAYS, THUMBNAIL_WORKERS, IMPORT_MAX_FILE_MB,
+    IMPORT_MAX_ARCHIVE_MB, UPLOAD_MAX_FILE_MB, UPLOAD_NEAR_DUPLICATE_DISTANCE, TEMP_UPLOAD_MAX_AGE_HOURS,
+    WATCHER_ENABLED, WATCHER_INTERVAL_SECONDS, WATCHER_BACKEND
 )
 from datetime import datetime, timedelta
+from email.utils import formatdate
+import http.client
 import urllib.request
 import urllib.error
 import urllib.parse
 
 # Node directory for file paths
 NODE_DIR = os.path.dirname(os.path.abspath(__file__))
-UI_STATE_FILE = os.path.join(NODE_DIR, "morpheus_ui_state.json")
+UI_STATE_FILE = os.path.join(NODE_DIR, "morpheus_ui_state.json")  # legacy, migrated into UI_STATE_DIR
+UI_STATE_DIR = os.path.join(NODE_DIR, ".ui_state")
 LICENSE_CACHE_FILE = os.path.join(NODE_DIR, ".license_cache.json")
 PATREON_AUTH_FILE = os.path.join(NODE_DIR, ".patreon_auth.json")
 REMOTE_CATALOG_CACHE = os.path.join(NODE_DIR, ".remote_catalog_cache.json")
 DEVICE_ID_FILE = os.path.join(NODE_DIR, ".device_id")
+FAVORITES_FILE = os.path.join(NODE_DIR, ".favorites.json")
+IMAGE_HASHES_FILE = os.path.join(NODE_DIR, ".image_hashes.json")
+LOCAL_DESCRIPTORS_FILE = os.path.join(NODE_DIR, ".descriptors_local.npz")
+REMOTE_DESCRIPTORS_FILE = os.path.join(NODE_DIR, ".descriptors_remote.npz")
+TEMP_UPLOAD_DIR = os.path.join(NODE_DIR, ".temp_uploads")
 
 def get_or_create_device_id() -> str:
     """Get or create a unique device ID for Patreon OAuth authentication"""
@@ -179,39 +217,22 @@ def validate_license(license_key: str, email: str) -> dict:
                 pass
         return {"valid": False, "error": f"License validation failed: {str(e)}"}
 
-# Helper functions for JSON state management
-def load_json_file(file_path, default_data={}):
-    if not os.path.exists(file_path):
-        return default_data
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            if not content:
-                return default_data
-            return json.loads(content)
-    except Exception as e:
-        print(f"Morpheus: Error loading {file_path}: {e}")
-        return default_data
-
-def save_json_file(data, file_path):
-    try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-    except Exception as e:
-        print(f"Morpheus: Error saving {file_path}: {e}")
+# Gallery UI state, sharded and written behind
+ui_state_store = UIStateStore(UI_STATE_DIR, legacy_file=UI_STATE_FILE,
+                              max_entries=UI_STATE_MAX_ENTRIES, max_age_days=UI_STATE_MAX_AGE_DAYS)
 
-load_ui_state = lambda: load_json_file(UI_STATE_FILE)
-save_ui_state = lambda data: save_json_file(data, UI_STATE_FILE)
+# Exact-match attributes shared by node filter specs and both catalog filters
+FILTER_SPEC_ATTRIBUTES = ['gender', 'age_group', 'ethnicity', 'skin_tone', 'hair_color', 'hair_style', 'eye_color', 'body_type']
 
 def filter_remote_talents(talents: List[Dict], filters: Dict) -> List[Dict]:
     """Filter talents from remote catalog using the same logic as local catalog"""
     filter_name = filters.get('name_filter', '').lower()
     filter_tags = filters.get('tag_filter', [])
     filter_logic = filters.get('tag_logic', 'OR').upper()
-    filter_gender = filters.get('gender')
-    filter_age_group = filters.get('age_group')
-    filter_ethnicity = filters.get('ethnicity')
+    filter_attributes = [(attr, filters[attr]) for attr in FILTER_SPEC_ATTRIBUTES if filters.get(attr)]
     filter_favorites_only = filters.get('favorites_only', False)
+    favorite_ids = filters.get('favorite_ids')
+    filter_search = (filters.get('search') or '').lower()
     
     filtered = []
     for talent in talents:
@@ -219,21 +240,22 @@ def filter_remote_talents(talents: List[Dict], filters: Dict) -> List[Dict]:
         if filter_name and filter_name not in talent.get('name', '').lower():
             continue
         
-        # Gender filter
-        if filter_gender and talent.get('gender', '') != filter_gender:
-            continue
-        
-        # Age group filter
-        if filter_age_group and talent.get('age_group', '') != filter_age_group:
+        # Free text search over name and description
+        if filter_search and filter_search not in talent.get('name', '').lower() \
+                and filter_search not in talent.get('description', '').lower():
             continue
         
-        # Ethnicity filter
-        if filter_ethnicity and talent.get('ethnicity', '') != filter_ethnicity:
+        # Attribute filters (gender, age group, ethnicity, appearance)
+        if any(talent.get(attr, '') != value for attr, value in filter_attributes):
             continue
         
-        # Favorites filter
-        if filter_favorites_only and not talent.get('is_favorite', False):
-            continue
+        # Favorites filter (overlay ids when given, the record flag otherwise)
+        if filter_favorites_only:
+            if favorite_ids is not None:
+                if talent.get('id') not in favorite_ids:
+                    continue
+            elif not talent.get('is_favorite', False):
+                continue
         
         # Tag filter
         if filter_tags:
@@ -249,6 +271,46 @@ def filter_remote_talents(talents: List[Dict], filters: Dict) -> List[Dict]:
     
     return filtered
 
+FILTER_SPEC_ATTRIBUTES = ['gender', 'age_group', 'ethnicity', 'skin_tone', 'hair_color', 'hair_style', 'eye_color', 'body_type']
+
+def parse_filter_spec(spec: str) -> Dict[str, Any]:
+    """Parse a node filter spec into the filters dict used by the catalog filters
+    
+    Accepts JSON ({"gender": "female", "tags": ["editorial"], "logic": "AND"}) or
+    query-string syntax (gender=female&tags=editorial,beauty&logic=AND), using the
+    same keys as the /morpheus/talents query parameters.
+    """
+    spec = (spec or '').strip()
+    if not spec:
+        return {}
+    
+    if spec.startswith('{'):
+        raw = json.loads(spec)
+    else:
+        raw = {k: v[-1] for k, v in urllib.parse.parse_qs(spec.replace(';', '&').replace('\n', '&')).items()}
+    
+    tags = raw.get('tags', [])
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    favorites_only = raw.get('favorites_only', False)
+    if isinstance(favorites_only, str):
+        favorites_only = favorites_only.strip().lower() == 'true'
+    
+    filters = {
+        "name_filter": str(raw.get('name', '')).strip().lower(),
+        "tag_filter": [str(tag).strip().lower() for tag in tags if str(tag).strip()],
+        "tag_logic": str(raw.get('logic', 'OR')).upper(),
+        "favorites_only": bool(favorites_only),
+    }
+    for attr in FILTER_SPEC_ATTRIBUTES:
+        value = str(raw.get(attr, '')).strip()
+        filters[attr] = value or None
+    return filters
+
+def parse_talent_ids(text: str) -> List[str]:
+    """Split a comma, whitespace or newline separated list of talent ids"""
+    return [part for part in text.replace(',', ' ').split() if part]
+
 def paginate_talents(talents: List[Dict], page: int, page_size: int = 20) -> Tuple[List[Dict], int, int]:
     """Paginate talents with special handling for page 1 (upload card + 7 talents)"""
     total_talents = len(talents)
@@ -284,6 +346,331 @@ def add_remote_image_urls(talents: List[Dict]) -> None:
                 talent['full_image_url'] = full_url
                 talent['image_path'] = full_url
 
+class CatalogSnapshot:
+    """Read-only view of a catalog shared by node executions, with an id index
+    
+    `version` changes whenever the catalog content changes, so it can be used as
+    a cache key for anything derived from the talents.
+    """
+    
+    def __init__(self, catalog: Dict[str, Any], source: str, version: Any = None, digest: str = "",
+                 filter_fn=None, by_id: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.catalog = catalog
+        self.talents = catalog.get("talents", [])
+        self.by_id = by_id if by_id is not None else {t.get("id"): t for t in self.talents}
+        self.source = source
+        self.digest = digest
+        self.version = version if version is not None else (
+            len(self.talents), catalog.get("last_updated"), hash(tuple(self.by_id))
+        )
+        self.filter_fn = filter_fn or filter_remote_talents
+        self.loaded_at = time.monotonic()
+        self._revisions = {}
+    
+    def get(self, talent_id: str) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(talent_id)
+    
+    def filter(self, filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return self.filter_fn(self.talents, with_favorite_ids(filters))
+    
+    def talent_revision(self, talent_id: str) -> str:
+        """Short digest of a talent record, memoized for the lifetime of the snapshot"""
+        revision = self._revisions.get(talent_id)
+        if revision is None:
+            record = self.by_id.get(talent_id)
+            payload = json.dumps(record, sort_keys=True, default=str).encode('utf-8')
+            revision = hashlib.sha1(payload).hexdigest()[:16]
+            self._revisions[talent_id] = revision
+        return revision
+
+_remote_snapshot: Optional[CatalogSnapshot] = None
+_remote_snapshot_lock = threading.Lock()
+_remote_fetch_failed_at = 0.0
+
+def get_remote_catalog_snapshot(max_age: float = REMOTE_CATALOG_TTL_SECONDS,
+                                force_refresh: bool = False) -> Optional[CatalogSnapshot]:
+    """Shared remote catalog snapshot, re-fetched only once it is older than max_age
+    
+    The version number is bumped only when the fetched content differs from the
+    current snapshot. If the fetch fails, the previous snapshot keeps being served
+    until the next refresh attempt.
+    """
+    global _remote_snapshot, _remote_fetch_failed_at
+    snapshot = _remote_snapshot
+    if snapshot and not force_refresh and time.monotonic() - snapshot.loaded_at < max_age:
+        return snapshot
+    if not snapshot and not force_refresh and time.monotonic() - _remote_fetch_failed_at < REMOTE_CATALOG_RETRY_SECONDS:
+        return None
+    
+    with _remote_snapshot_lock:
+        # Another thread may have refreshed while we waited for the lock
+        snapshot = _remote_snapshot
+        if snapshot and not force_refresh and time.monotonic() - snapshot.loaded_at < max_age:
+            return snapshot
+        
+        catalog_data = fetch_remote_catalog()
+        if not catalog_data:
+            if snapshot:
+                snapshot.loaded_at = time.monotonic()
+            else:
+                _remote_fetch_failed_at = time.monotonic()
+            return snapshot
+        
+        digest = hashlib.sha256(json.dumps(catalog_data, sort_keys=True).encode('utf-8')).hexdigest()
+        if snapshot and snapshot.digest == digest:
+            snapshot.loaded_at = time.monotonic()
+            return snapshot
+        
+        catalog = dict(catalog_data)
+        catalog["talents"] = [dict(t) for t in catalog_data.get("talents", [])]
+        add_remote_image_urls(catalog["talents"])
+        version = snapshot.version + 1 if snapshot else 1
+        _remote_snapshot = CatalogSnapshot(catalog, "remote", version=version, digest=digest)
+        return _remote_snapshot
+
+LOCAL_CATALOG_PATH = os.path.join(NODE_DIR, "catalog", "catalog.json")
+_local_snapshot: Optional[CatalogSnapshot] = None
+
+def get_local_catalog_snapshot() -> CatalogSnapshot:
+    """Snapshot of the local catalog, rebuilt only when the shared manager's version moves"""
+    global _local_snapshot
+    manager = get_catalog_manager(LOCAL_CATALOG_PATH)
+    with manager.lock:
+        if not manager.load_catalog().get("talents"):
+            # Create sample catalog if empty
+            manager.save_catalog(create_sample_catalog())
+        snapshot = _local_snapshot
+        if snapshot is None or snapshot.version != manager.version:
+            snapshot = CatalogSnapshot(manager.catalog_data, "local", version=manager.version,
+                                       filter_fn=manager.filter_talents, by_id=manager.talent_index)
+            _local_snapshot = snapshot
+            # Render missing or stale thumbnails in the background
+            get_thumbnail_builder(os.path.dirname(LOCAL_CATALOG_PATH), THUMBNAIL_SIZE, THUMBNAIL_WORKERS) \
+                .schedule(snapshot.talents, version=snapshot.version)
+        return snapshot
+
+def _seed_favorites() -> List[str]:
+    """Favorites flagged in the local catalog before the overlay existed"""
+    catalog_data = get_catalog_manager(LOCAL_CATALOG_PATH).load_catalog()
+    return [t["id"] for t in catalog_data.get("talents", []) if t.get("is_favorite") and t.get("id")]
+
+# Per-device favorites, merged into local and remote talents at query time
+favorites = FavoritesOverlay(FAVORITES_FILE, device_id_fn=lambda: get_or_create_device_id(), seed_fn=_seed_favorites)
+
+def with_favorite_ids(filters: Dict[str, Any]) -> Dict[str, Any]:
+    """Filters plus the overlay's favorite ids when favorites_only is requested"""
+    if filters.get("favorites_only") and "favorite_ids" not in filters:
+        return {**filters, "favorite_ids": favorites.ids()}
+    return filters
+
+def broadcast_catalog_event(kind: str, **data):
+    """Push a compact catalog change to every open gallery over the ComfyUI websocket
+    
+    Sent as a "morpheus.catalog" message with `kind` one of talent_added,
+    talent_updated, talent_deleted, favorite or catalog_version.
+    """
+    if not COMFYUI_AVAILABLE or server is None:
+        return
+    try:
+        # send_sync hands the message to the server loop, safe from any thread
+        server.PromptServer.instance.send_sync("morpheus.catalog", {"kind": kind, **data})
+    except Exception as e:
+        print(f"Morpheus: Could not broadcast {kind} event: {e}")
+
+def _on_external_catalog_change(manager):
+    if manager.catalog_path == os.path.realpath(LOCAL_CATALOG_PATH):
+        broadcast_catalog_event("catalog_version", source="local", revision=manager.revision)
+
+add_external_change_listener(_on_external_catalog_change)
+
+image_hashes = ImageHashIndex(IMAGE_HASHES_FILE)
+
+def find_catalog_duplicates(sha256: str, phash: Optional[int]) -> List[Dict[str, Any]]:
+    """Local catalog talents whose image matches an upload exactly or perceptually"""
+    manager = get_catalog_manager(LOCAL_CATALOG_PATH)
+    with manager.lock:
+        catalog_data = manager.load_catalog()
+        version = manager.version
+        images = [(t["id"], os.path.join(NODE_DIR, "catalog", t["image_path"]))
+                  for t in catalog_data.get("talents", []) if t.get("id") and t.get("image_path")]
+    image_hashes.refresh(images, catalog_version=version)
+    matches = image_hashes.find_duplicates(sha256, phash, UPLOAD_NEAR_DUPLICATE_DISTANCE)
+    for match in matches:
+        talent = manager.talent_index.get(match["talent_id"]) or {}
+        match["name"] = talent.get("name", "")
+    return matches
+
+_folder_scanners: Dict[Tuple[str, str], FolderScanner] = {}
+
+def sync_catalog_with_folder(manager, images_folder: str) -> ScanDelta:
+    """Apply the images folder's changes since the last scan to the catalog
+    
+    New files become talents (unless a talent already points at them), talents
+    of removed files are dropped (on the first scan: talents under the folder
+    whose file is missing), and changed files only bump the revision so
+    image-derived caches refresh. Metadata of existing talents is never touched.
+    """
+    import re
+    catalog_dir = os.path.dirname(manager.catalog_path)
+    key = (os.path.realpath(manager.catalog_path), os.path.realpath(images_folder))
+    scanner = _folder_scanners.get(key)
+    if scanner is None:
+        scanner = _folder_scanners.setdefault(key, FolderScanner(images_folder, manager.catalog_path + ".scan.json"))
+    
+    def catalog_image_path(path: str) -> str:
+        return os.path.relpath(os.path.join(images_folder, path), catalog_dir).replace(os.sep, '/')
+    
+    with manager.lock:
+        delta = scanner.scan()
+        if delta.initial:
+            # First scan: talents whose files vanished before there was a manifest
+            folder_prefix = catalog_image_path("").rstrip('/') + '/'
+            for talent in manager.load_catalog().get("talents", []):
+                image_path = talent.get("image_path") or ""
+                if image_path.startswith(folder_prefix) and talent.get("id") \
+                        and not os.path.exists(os.path.join(catalog_dir, image_path)):
+                    delta.removed[image_path[len(folder_prefix):]] = talent["id"]
+        if not delta:
+            scanner.commit()
+            return delta
+        
+        catalog_data = manager.load_catalog()
+        by_image = {t.get("image_path"): t["id"] for t in catalog_data.get("talents", []) if t.get("id")}
+        used_ids = set(manager.talent_index)
+        new_talents = []
+        for path in delta.added:
+            image_path = catalog_image_path(path)
+            talent_id = by_image.get(image_path)
+            if talent_id is None:
+                name = os.path.splitext(os.path.basename(path))[0]
+                talent_id = base_id = f"talent_{re.sub(r'[^a-z0-9_]', '_', name.lower())}"
+                counter = 1
+                while talent_id in used_ids:
+                    talent_id = f"{base_id}_{counter}"
+                    counter += 1
+                used_ids.add(talent_id)
+                by_image[image_path] = talent_id
+                new_talents.append({
+                    "id": talent_id,
+                    "name": name.replace('_', ' ').replace('-', ' ').title(),
+                    "image_path": image_path,
+                    "description": f"Auto-generated entry for {name}",
+                    "tags": ["auto_generated"],
+                    "copyright": "Unknown"
+                })
+            scanner.assign(path, talent_id)
+        for path in delta.changed:
+            if scanner.talent_for(path) is None:
+                scanner.assign(path, by_image.get(catalog_image_path(path)))
+        
+        removed = 0
+        for path, talent_id in delta.removed.items():
+            talent = manager.get_talent(talent_id) if talent_id else None
+            # Only if the talent still points at the vanished file
+            if talent and talent.get("image_path") == catalog_image_path(path):
+                manager.remove_talent(talent_id)
+                removed += 1
+        
+        manager.add_talents(new_talents)
+        if new_talents or removed or delta.changed:
+            revision = manager.commit_revision({"last_updated": datetime.now().strftime("%Y-%m-%d")})
+            manager.schedule_save()
+            broadcast_catalog_event("catalog_version", source="local", revision=revision)
+        scanner.commit()
+    print(f"Morpheus: Folder scan of {images_folder}: {delta.summary()}")
+    return delta
+
+# Visual descriptors for "similar talents", local images and cached remote images
+local_descriptors = DescriptorIndex(LOCAL_DESCRIPTORS_FILE)
+remote_descriptors = DescriptorIndex(REMOTE_DESCRIPTORS_FILE)
+_descriptor_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="morpheus-descriptors")
+
+def schedule_descriptor(index: DescriptorIndex, talent_id: str, image_path: str):
+    """Compute an image's descriptor in the background once it is uploaded or cached"""
+    _descriptor_executor.submit(index.add, talent_id, image_path)
+
+def schedule_descriptor_refresh(index: DescriptorIndex, list_images: Callable[[], List[Tuple[str, str]]], catalog_version: Any):
+    """Backfill an index on the descriptor thread, once per catalog version
+    
+    `list_images` only runs there, so a query against an unchanged catalog
+    costs no filesystem access.
+    """
+    if not index.begin_refresh(catalog_version):
+        return
+    
+    def refresh():
+        try:
+            index.refresh(list_images(), catalog_version)
+        except Exception as e:
+            index.invalidate()
+            print(f"Morpheus: Descriptor refresh failed: {e}")
+    _descriptor_executor.submit(refresh)
+
+def find_similar_talents(talent_id: str, source: str, filters: Dict[str, Any], limit: int) -> Optional[List[Tuple[Dict, float]]]:
+    """(talent, similarity) pairs most visually similar to talent_id, None if it is unknown
+    
+    Results cover the descriptors computed so far; missing ones are backfilled
+    in the background (`DescriptorIndex.refreshing`).
+    """
+    if source == "remote":
+        snapshot = get_remote_catalog_snapshot()
+        if not snapshot:
+            return None
+        index = remote_descriptors
+        
+        def list_images():
+            # Only images already in the download cache have descriptors
+            images = [(t["id"], get_cached_image_path(t["id"])) for t in snapshot.talents if t.get("id")]
+            return [(key, path) for key, path in images if os.path.exists(path)]
+        
+        def image_of(talent):
+            return get_cached_image_path(talent["id"])
+    else:
+        snapshot = get_local_catalog_snapshot()
+        index = local_descriptors
+        catalog_dir = os.path.dirname(LOCAL_CATALOG_PATH)
+        
+        def list_images():
+            return [(t["id"], os.path.join(catalog_dir, t["image_path"])) for t in snapshot.talents
+                    if t.get("id") and t.get("image_path") and not t["image_path"].startswith(('http://', 'https://'))]
+        
+        def image_of(talent):
+            image_path = talent.get("image_path") or ""
+            return None if image_path.startswith(('http://', 'https://')) else os.path.join(catalog_dir, image_path)
+    
+    if talent_id not in snapshot.by_id:
+        return None
+    schedule_descriptor_refresh(index, list_images, snapshot.version)
+    candidates = None
+    if filters:
+        candidates = {t.get("id") for t in snapshot.filter(filters)}
+    matches = index.search(talent_id, limit, candidates)
+    if matches is None:
+        # The queried talent itself is not backfilled yet, one image is cheap
+        image_path = image_of(snapshot.by_id[talent_id])
+        if image_path and os.path.isfile(image_path):
+            index.add(talent_id, image_path)
+            matches = index.search(talent_id, limit, candidates)
+    if matches is None:
+        return None
+    return [(snapshot.by_id[key], score) for key, score in matches if key in snapshot.by_id]
+
+_last_temp_cleanup: Optional[float] = None
+
+def schedule_temp_upload_cleanup():
+    """Expire orphaned temp uploads and import work dirs, at most once an hour"""
+    global _last_temp_cleanup
+    now = time.monotonic()
+    if _last_temp_cleanup is not None and now - _last_temp_cleanup < 3600:
+        return
+    _last_temp_cleanup = now
+
+    def cleanup():
+        removed = expire_temp_files(TEMP_UPLOAD_DIR, TEMP_UPLOAD_MAX_AGE_HOURS * 3600)
+        if removed:
+            print(f"Morpheus: Expired {removed} orphaned temp uploads")
+    threading.Thread(target=cleanup, name="morpheus-temp-janitor", daemon=True).start()
+
 MINIMUM_TIER_CENTS = 1500  # 15€ = R&D Insider tier minimum
 CREATOR_BYPASS_NAMES = ["Sergio Valsecchi"]  # Campaign creators get automatic access
 
@@ -353,6 +740,139 @@ def is_image_cached(talent_id: str) -> bool:
     cache_path = get_cached_image_path(talent_id)
     return os.path.exists(cache_path)
 
+class BandwidthLimiter:
+    """Token bucket shared by download workers to cap aggregate throughput"""
+    
+    def __init__(self, max_bytes_per_sec: int):
+        self.rate = max(0, int(max_bytes_per_sec or 0))
+        self.allowance = float(self.rate)
+        self.last_check = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def consume(self, nbytes: int):
+        """Block until nbytes may be transferred without exceeding the rate"""
+        if not self.rate:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.allowance = min(float(self.rate), self.allowance + (now - self.last_check) * self.rate)
+            self.last_check = now
+            self.allowance -= nbytes
+            wait = -self.allowance / self.rate if self.allowance < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+def stream_remote_image(talent_id: str, image_url: str, validators: Optional[Dict[str, str]] = None,
+                        limiter: Optional[BandwidthLimiter] = None, progress_callback=None,
+                        timeout: float = REMOTE_DOWNLOAD_TIMEOUT, force: bool = False) -> Dict[str, Any]:
+    """Stream a remote image into the cache in chunks, resuming partial downloads
+    
+    Data is written to `<cache_path>.part` and only moved into place once complete,
+    so an interrupted download is resumed with an HTTP Range request next time,
+    guarded by If-Range with the partial response's ETag or Last-Modified (a
+    partial without either is downloaded again from the start).
+    When the image is already cached, `validators` (etag / last_modified) or the
+    file mtime are sent as a conditional request so unchanged images cost a 304
+    (unless `force` is set).
+    `progress_callback(done, total)` is called after every chunk; exceptions it
+    raises abort the download and propagate to the caller.
+    
+    Returns a dict with `status` ("downloaded", "not_modified" or "error"), `path`,
+    `bytes`, `etag` and `last_modified`.
+    """
+    result = {"status": "error", "path": None, "bytes": 0, "etag": "", "last_modified": ""}
+    if not talent_id or not image_url:
+        result["error"] = "Missing talent_id or image_url"
+        return result
+    
+    cache_path = get_cached_image_path(talent_id)
+    part_path = cache_path + ".part"
+    validators = validators or {}
+    headers = {"User-Agent": "Morpheus-ComfyUI-Node"}
+    
+    if os.path.exists(cache_path) and not force:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        headers["If-Modified-Since"] = validators.get("last_modified") or formatdate(os.path.getmtime(cache_path), usegmt=True)
+    
+    # Validators of the response the partial file came from
+    part_validators_path = part_path + ".json"
+    resume_from = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if resume_from:
+        try:
+            with open(part_validators_path, 'r', encoding='utf-8') as f:
+                part_validators = json.load(f)
+        except (OSError, ValueError):
+            part_validators = {}
+        # If-Range needs a strong ETag, Last-Modified is the fallback
+        etag = part_validators.get("etag", "")
+        if_range = etag if etag and not etag.startswith('W/') else part_validators.get("last_modified", "")
+        if if_range:
+            headers["Range"] = f"bytes={resume_from}-"
+            headers["If-Range"] = if_range
+        else:
+            # Nothing proves the remote object is unchanged, so appending could mix two versions
+            os.remove(part_path)
+            resume_from = 0
+    
+    try:
+        request = urllib.request.Request(image_url, headers=headers)
+        try:
+            response = urllib.request.urlopen(request, timeout=timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                result.update(status="not_modified", path=cache_path, bytes=os.path.getsize(cache_path),
+                              etag=validators.get("etag", ""), last_modified=validators.get("last_modified", ""))
+                return result
+            if e.code == 416 and resume_from:
+                # Partial file no longer matches the remote object - start over
+                os.remove(part_path)
+                if os.path.exists(part_validators_path):
+                    os.remove(part_validators_path)
+                return stream_remote_image(talent_id, image_url, validators, limiter, progress_callback, timeout, force)
+            raise
+        
+        with response:
+            if response.status == 206:
+                mode = 'ab'
+                done = resume_from
+            else:
+                mode = 'wb'
+                done = 0
+                with open(part_validators_path, 'w', encoding='utf-8') as f:
+                    json.dump({"etag": response.headers.get('ETag', ''),
+                               "last_modified": response.headers.get('Last-Modified', '')}, f)
+            length = response.headers.get('Content-Length')
+            total = done + int(length) if length and length.isdigit() else 0
+            
+            with open(part_path, mode) as f:
+                while True:
+                    chunk = response.read(REMOTE_DOWNLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if limiter:
+                        limiter.consume(len(chunk))
+                    f.write(chunk)
+                    done += len(chunk)
+                    if progress_callback:
+                        progress_callback(done, total)
+            
+            if total and done < total:
+                raise IOError(f"Incomplete download ({done}/{total} bytes)")
+            
+            os.replace(part_path, cache_path)
+            if os.path.exists(part_validators_path):
+                os.remove(part_validators_path)
+            schedule_descriptor(remote_descriptors, talent_id, cache_path)
+            result.update(status="downloaded", path=cache_path, bytes=done,
+                          etag=response.headers.get('ETag', ''),
+                          last_modified=response.headers.get('Last-Modified', ''))
+            return result
+    except (urllib.error.URLError, http.client.HTTPException, OSError, ValueError) as e:
+        print(f"Morpheus: Error downloading image for {talent_id}: {e}")
+        result["error"] = str(e)
+        return result
+
 async def download_remote_image(talent_id: str, image_url: str, semaphore) -> Optional[str]:
     """Download a single remote image to local cache with semaphore limiting"""
     if not image_url:
@@ -373,6 +893,7 @@ async def download_remote_image(talent_id: str, image_url: str, semaphore) -> Op
                         content = await response.read()
                         with open(cache_path, 'wb') as f:
                             f.write(content)
+                        schedule_descriptor(remote_descriptors, talent_id, cache_path)
                         print(f"Morpheus: Cached image for {talent_id}")
                         return cache_path
                     else:
@@ -417,7 +938,278 @@ def get_cached_image_or_url(talent_id: str, image_url: str) -> str:
         return cache_path
     return image_url
 
-def load_cached_image_as_tensor(talent_id: str) -> Optional[torch.Tensor]:
+# Content hashes memoized by (mtime_ns, size) so unchanged files are hashed once
+_content_hash_memo: Dict[str, Tuple[int, int, str]] = {}
+_content_hash_lock = threading.Lock()
+
+def get_file_content_hash(file_path: str) -> Optional[str]:
+    """SHA-256 of a file's contents, re-hashed only when its size or mtime changes"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    
+    with _content_hash_lock:
+        memo = _content_hash_memo.get(file_path)
+    if memo and memo[0] == st.st_mtime_ns and memo[1] == st.st_size:
+        return memo[2]
+    
+    digest = hashlib.sha256()
+    try:
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    
+    content_hash = digest.hexdigest()
+    with _content_hash_lock:
+        _content_hash_memo[file_path] = (st.st_mtime_ns, st.st_size, content_hash)
+    return content_hash
+
+class DecodedImageCache:
+    """Byte-budgeted LRU of decoded image tensors keyed by content hash and output size
+    
+    Cached tensors are shared between executions, so callers must treat them as
+    read-only (ComfyUI nodes never modify their inputs in place).
+    """
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+    
+    def get(self, key: Tuple) -> Optional[torch.Tensor]:
+        with self.lock:
+            tensor = self.entries.get(key)
+            if tensor is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return tensor
+    
+    def put(self, key: Tuple, tensor: torch.Tensor):
+        size = tensor.element_size() * tensor.nelement()
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous.element_size() * previous.nelement()
+            self.entries[key] = tensor
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self.entries:
+                _, evicted = self.entries.popitem(last=False)
+                self.current_bytes -= evicted.element_size() * evicted.nelement()
+                self.evictions += 1
+    
+    def invalidate(self, content_hash: Optional[str] = None):
+        """Drop every entry, or only those decoded from the given content hash"""
+        with self.lock:
+            for key in [k for k in self.entries if content_hash is None or k[0] == content_hash]:
+                evicted = self.entries.pop(key)
+                self.current_bytes -= evicted.element_size() * evicted.nelement()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+decoded_image_cache = DecodedImageCache(DECODED_TENSOR_CACHE_MB * 1024 * 1024)
+
+DECODED_SIDECAR_DIR = os.path.join(NODE_DIR, "cache", "decoded")
+
+# Output options exposed on the node
+FIT_MODES = ["contain", "cover", "crop"]
+RESAMPLE_FILTERS = {
+    "lanczos": Image.Resampling.LANCZOS,
+    "bicubic": Image.Resampling.BICUBIC,
+    "bilinear": Image.Resampling.BILINEAR,
+    "box": Image.Resampling.BOX,
+    "nearest": Image.Resampling.NEAREST,
+}
+OUTPUT_DTYPES = {
+    "float32": torch.float32,
+    "float16": torch.float16,
+}
+
+def get_decode_variant(long_edge: int = 0, fit_mode: str = "contain", resample: str = "lanczos") -> str:
+    """Stable name for a decode geometry, used in cache keys and sidecar names"""
+    if not long_edge:
+        return "original"
+    return f"{int(long_edge)}-{fit_mode}-{resample}"
+
+def compute_output_size(width: int, height: int, long_edge: int, fit_mode: str) -> Tuple[int, int]:
+    """Size to scale a (width, height) image to before any crop"""
+    if not long_edge:
+        return width, height
+    if fit_mode == "contain":
+        scale = long_edge / max(width, height)
+    else:
+        # cover and crop scale the short edge to the target
+        scale = long_edge / min(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+def _decoded_sidecar_prefix(image_path: str) -> str:
+    """Sidecar path prefix shared by every version and variant of one image
+    
+    Remote images keep their sidecar next to the cached file; local catalog
+    images use DECODED_SIDECAR_DIR so the catalog folder stays untouched, with
+    a hash of the source folder so same-named images of different folders
+    don't share (and clean up) each other's sidecars.
+    """
+    image_dir = os.path.dirname(os.path.abspath(image_path))
+    if image_dir == os.path.abspath(REMOTE_IMAGE_CACHE_DIR):
+        return os.path.join(image_dir, os.path.basename(image_path)) + "."
+    dir_hash = hashlib.sha1(image_dir.encode('utf-8')).hexdigest()[:8]
+    return os.path.join(DECODED_SIDECAR_DIR, f"{os.path.basename(image_path)}.{dir_hash}.")
+
+def get_decoded_sidecar_path(image_path: str, content_hash: str, variant: str = "original") -> str:
+    """Path of the raw uint8 pixel sidecar for an image version and decode variant"""
+    suffix = "" if variant == "original" else f".{variant}"
+    return f"{_decoded_sidecar_prefix(image_path)}{content_hash[:16]}{suffix}.npy"
+
+def load_decoded_sidecar(sidecar_path: str) -> Optional[np.ndarray]:
+    """Memory-map a decoded sidecar, or None if it is missing or malformed"""
+    if not os.path.exists(sidecar_path):
+        return None
+    try:
+        pixels = np.load(sidecar_path, mmap_mode='r')
+    except (ValueError, OSError) as e:
+        print(f"Morpheus: Ignoring unreadable sidecar {sidecar_path}: {e}")
+        return None
+    if pixels.dtype != np.uint8 or pixels.ndim != 3 or pixels.shape[2] != 3:
+        return None
+    return pixels
+
+def save_decoded_sidecar(sidecar_path: str, image_path: str, content_hash: str, pixels: np.ndarray):
+    """Atomically write a sidecar and drop sidecars of older versions of the same image"""
+    try:
+        sidecar_dir = os.path.dirname(sidecar_path)
+        os.makedirs(sidecar_dir, exist_ok=True)
+        prefix = _decoded_sidecar_prefix(image_path)
+        for stale in glob.glob(glob.escape(prefix) + "*.npy"):
+            if not stale[len(prefix):].startswith(content_hash[:16]):
+                os.remove(stale)
+        # Concurrent decodes of the same image must not share (and publish) one temp file
+        temp_path = f"{sidecar_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'wb') as f:
+                np.save(f, pixels, allow_pickle=False)
+            os.replace(temp_path, sidecar_path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    except OSError as e:
+        print(f"Morpheus: Could not write decoded sidecar {sidecar_path}: {e}")
+
+def decode_image_pixels(image_path: str, long_edge: int = 0, fit_mode: str = "contain",
+                        resample: str = "lanczos") -> np.ndarray:
+    """Decode an image to uint8 RGB pixels, downscaling during decode when possible
+    
+    JPEGs are decoded directly at a reduced DCT scale with `draft`, other formats
+    are box-reduced by an integer factor first, so only the final resize works
+    on a near-target-sized image.
+    """
+    with Image.open(image_path) as img:
+        target_w, target_h = compute_output_size(img.width, img.height, long_edge, fit_mode)
+        if long_edge and img.format == 'JPEG':
+            img.draft('RGB', (target_w, target_h))
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        if long_edge:
+            factor = min(img.width // target_w, img.height // target_h)
+            if factor >= 2:
+                img = img.reduce(factor)
+            if img.size != (target_w, target_h):
+                img = img.resize((target_w, target_h), RESAMPLE_FILTERS.get(resample, Image.Resampling.LANCZOS))
+            if fit_mode == "crop":
+                left = (target_w - long_edge) // 2
+                top = (target_h - long_edge) // 2
+                img = img.crop((left, top, left + long_edge, top + long_edge))
+        return np.array(img)
+
+def load_image_pixels(image_path: str, content_hash: str, long_edge: int = 0, fit_mode: str = "contain",
+                      resample: str = "lanczos") -> np.ndarray:
+    """uint8 RGB pixels for a decode variant, from the sidecar when one exists"""
+    variant = get_decode_variant(long_edge, fit_mode, resample)
+    sidecar_path = get_decoded_sidecar_path(image_path, content_hash, variant) if DECODED_SIDECARS_ENABLED else None
+    if sidecar_path:
+        pixels = load_decoded_sidecar(sidecar_path)
+        if pixels is not None:
+            return pixels
+    
+    pixels = decode_image_pixels(image_path, long_edge, fit_mode, resample)
+    if sidecar_path:
+        save_decoded_sidecar(sidecar_path, image_path, content_hash, pixels)
+    return pixels
+
+def pixels_to_tensor(pixels: np.ndarray) -> torch.Tensor:
+    """Wrap uint8 pixels as a tensor without copying (sidecar memmaps are read-only)"""
+    with warnings.catch_warnings():
+        # The dtype conversion done by every caller copies the data anyway
+        warnings.simplefilter("ignore", UserWarning)
+        return torch.from_numpy(pixels)
+
+def load_image_as_tensor(image_path: str, long_edge: int = 0, fit_mode: str = "contain",
+                         resample: str = "lanczos", output_dtype: str = "float32") -> Optional[torch.Tensor]:
+    """Decode an image file to a [1, H, W, C] tensor, served from the LRU when possible"""
+    content_hash = get_file_content_hash(image_path)
+    if content_hash is None:
+        return None
+    
+    variant = get_decode_variant(long_edge, fit_mode, resample)
+    cache_key = (content_hash, f"{variant}:{output_dtype}")
+    tensor = decoded_image_cache.get(cache_key)
+    if tensor is not None:
+        return tensor
+    
+    pixels = load_image_pixels(image_path, content_hash, long_edge, fit_mode, resample)
+    # Single float copy of the decoded pixels, scaled in place
+    tensor = pixels_to_tensor(pixels).to(OUTPUT_DTYPES.get(output_dtype, torch.float32)).div_(255.0).unsqueeze(0)
+    
+    decoded_image_cache.put(cache_key, tensor)
+    return tensor
+
+def probe_output_size(image_path: str, long_edge: int = 0, fit_mode: str = "contain", **_) -> Tuple[int, int]:
+    """(height, width) an image will decode to, read from the file header only"""
+    with Image.open(image_path) as img:
+        width, height = compute_output_size(img.width, img.height, long_edge, fit_mode)
+    if long_edge and fit_mode == "crop":
+        return long_edge, long_edge
+    return height, width
+
+def decode_image_into(region: torch.Tensor, image_path: str, long_edge: int = 0, fit_mode: str = "contain",
+                      resample: str = "lanczos", output_dtype: str = "float32"):
+    """Decode an image straight into a preallocated [H, W, C] slice of a batch tensor"""
+    content_hash = get_file_content_hash(image_path)
+    if content_hash is None:
+        raise IOError(f"Cannot read {image_path}")
+    
+    variant = get_decode_variant(long_edge, fit_mode, resample)
+    cached = decoded_image_cache.get((content_hash, f"{variant}:{output_dtype}"))
+    if cached is not None:
+        region.copy_(cached[0])
+        return
+    
+    region.copy_(pixels_to_tensor(load_image_pixels(image_path, content_hash, long_edge, fit_mode, resample)))
+    region.div_(255.0)
+
+def load_cached_image_as_tensor(talent_id: str, **decode_options) -> Optional[torch.Tensor]:
     """Load a cached image and convert to PyTorch tensor for ComfyUI output"""
     cache_path = get_cached_image_path(talent_id)
     
@@ -425,21 +1217,270 @@ def load_cached_image_as_tensor(talent_id: str) -> Optional[torch.Tensor]:
         return None
     
     try:
-        # Load image with PIL
-        img = Image.open(cache_path)
-        img = img.convert('RGB')
-        
-        # Convert to numpy array
-        img_array = np.array(img).astype(np.float32) / 255.0
-        
-        # Convert to tensor with shape [1, H, W, C] (batch, height, width, channels)
-        tensor = torch.from_numpy(img_array).unsqueeze(0)
-        
-        return tensor
+        return load_image_as_tensor(cache_path, **decode_options)
     except Exception as e:
         print(f"Morpheus: Error loading cached image {talent_id}: {e}")
         return None
 
+class TalentIteratorCache:
+    """Id-ordered filter results reused across prompts while the catalog is unchanged"""
+    
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get_matches(self, snapshot: CatalogSnapshot, filter_spec: str) -> List[Dict]:
+        filters = parse_filter_spec(filter_spec)
+        key = (snapshot.source, snapshot.version, json.dumps(filters, sort_keys=True),
+               favorites.version if filters.get("favorites_only") else 0)
+        with self.lock:
+            matches = self.entries.get(key)
+            if matches is not None:
+                self.entries.move_to_end(key)
+                return matches
+        
+        matches = sorted(snapshot.filter(filters), key=lambda t: t.get("id", ""))
+        with self.lock:
+            self.entries[key] = matches
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return matches
+
+talent_iterator_cache = TalentIteratorCache()
+
+# Background prefetch of upcoming iterate-mode images
+_prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="morpheus-prefetch")
+_prefetch_pending = set()
+_prefetch_lock = threading.Lock()
+
+class AsyncRWLock:
+    """Asyncio reader-writer lock: readers share, writers are exclusive
+    
+    Waiting writers block new readers so a steady stream of gallery reads
+    cannot starve an edit.
+    """
+    
+    def __init__(self):
+        self.readers = 0
+        self.writer = False
+        self.writers_waiting = 0
+        self._condition = None
+    
+    @property
+    def condition(self) -> asyncio.Condition:
+        # Created lazily so it binds to the server's event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+    
+    @asynccontextmanager
+    async def read(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: not self.writer and not self.writers_waiting)
+            self.readers += 1
+        try:
+            yield
+        finally:
+            async with self.condition:
+                self.readers -= 1
+                if not self.readers:
+                    self.condition.notify_all()
+    
+    @asynccontextmanager
+    async def write(self):
+        async with self.condition:
+            self.writers_waiting += 1
+            try:
+                await self.condition.wait_for(lambda: not self.writer and not self.readers)
+            finally:
+                self.writers_waiting -= 1
+            self.writer = True
+        try:
+            yield
+        finally:
+            async with self.condition:
+                self.writer = False
+                self.condition.notify_all()
+
+# Guards the local catalog across endpoints
+catalog_rw_lock = AsyncRWLock()
+
+def catalog_reader(handler):
+    """Run an endpoint under the shared (read) side of catalog_rw_lock"""
+    @functools.wraps(handler)
+    async def wrapper(request):
+        async with catalog_rw_lock.read():
+            return await handler(request)
+    return wrapper
+
+def catalog_writer(handler):
+    """Run an endpoint under the exclusive (write) side of catalog_rw_lock"""
+    @functools.wraps(handler)
+    async def wrapper(request):
+        async with catalog_rw_lock.write():
+            return await handler(request)
+    return wrapper
+
+def parse_if_match(header: str) -> Optional[List[str]]:
+    """Revisions listed in an If-Match header, None when absent or a wildcard"""
+    if not header or header.strip() == "*":
+        return None
+    return [value.strip().removeprefix("W/").strip('"') for value in header.split(",") if value.strip()]
+
+def check_catalog_revision(request, data: Dict[str, Any], manager) -> Optional[Any]:
+    """Optimistic concurrency check for mutation endpoints
+    
+    Clients send the revision they last read either as an If-Match header
+    (412 on mismatch) or as expected_revision in the JSON body (409 on
+    mismatch). Requests without either are accepted as before.
+    """
+    current = manager.revision
+    expected = parse_if_match(request.headers.get("If-Match", ""))
+    if expected is not None and str(current) not in expected:
+        return web.json_response({"error": "Catalog revision mismatch", "revision": current},
+                                 status=412, headers={"ETag": f'"{current}"'})
+    expected_revision = data.get("expected_revision")
+    if expected_revision is not None and str(expected_revision) != str(current):
+        return web.json_response({"error": "Catalog was modified by another request", "revision": current},
+                                 status=409, headers={"ETag": f'"{current}"'})
+    return None
+
+IMPORT_IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+
+def parse_import_metadata(text: str, filename: str = "") -> Dict[str, Dict[str, Any]]:
+    """Per-image metadata for a bulk import, keyed by image file name
+    
+    Accepts JSON (a list of objects with "filename", or an object keyed by file
+    name) or CSV with a filename column, where tags are separated by ; or |.
+    """
+    import re
+    import csv
+    import io
+    text = text.lstrip("\ufeff").strip()
+    if not text:
+        return {}
+    if filename.lower().endswith(".json") or text[:1] in "[{":
+        data = json.loads(text)
+        items = [{**fields, "filename": name} for name, fields in data.items()] if isinstance(data, dict) else data
+    else:
+        items = []
+        for row in csv.DictReader(io.StringIO(text)):
+            row = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+            if "tags" in row:
+                row["tags"] = [tag.strip() for tag in re.split(r"[;|]", row["tags"]) if tag.strip()]
+            if "freckles" in row:
+                row["freckles"] = row["freckles"].lower() in ("1", "true", "yes")
+            items.append(row)
+    return {os.path.basename(str(item.get("filename", ""))): item
+            for item in items if isinstance(item, dict) and item.get("filename")}
+
+def extract_import_zip(zip_path: str, work_dir: str) -> Tuple[List[Tuple[str, str]], Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+    """Unpack images and metadata files from an import zip into work_dir
+    
+    Returns (images as (file name, extracted path), metadata, per-member errors).
+    """
+    import zipfile
+    import shutil
+    images, metadata, errors = [], {}, []
+    max_bytes = IMPORT_MAX_FILE_MB * 1024 * 1024
+    with zipfile.ZipFile(zip_path) as archive:
+        for index, info in enumerate(archive.infolist()):
+            filename = os.path.basename(info.filename)
+            if info.is_dir() or not filename or filename.startswith('.') or '__MACOSX' in info.filename:
+                continue
+            ext = os.path.splitext(filename)[1].lower()
+            if info.file_size > max_bytes:
+                errors.append({"filename": filename, "status": "error", "error": f"File exceeds {IMPORT_MAX_FILE_MB} MB"})
+            elif ext in ('.csv', '.json'):
+                metadata.update(parse_import_metadata(archive.read(info).decode('utf-8'), filename))
+            elif ext in IMPORT_IMAGE_EXTENSIONS:
+                target = os.path.join(work_dir, f"zip_{index}{ext}")
+                with archive.open(info) as source, open(target, 'wb') as f:
+                    shutil.copyfileobj(source, f, REMOTE_DOWNLOAD_CHUNK_SIZE)
+                images.append((filename, target))
+    return images, metadata, errors
+
+def build_import_talent(filename: str, meta: Dict[str, Any], talent_id: str, image_filename: str) -> Dict[str, Any]:
+    """Talent record for an imported image, using whatever metadata was supplied"""
+    talent = {
+        "id": talent_id,
+        "name": meta.get("name") or os.path.splitext(filename)[0].replace('_', ' ').replace('-', ' ').title(),
+    }
+    for field in TALENT_SCHEMA["properties"]:
+        if field not in ("id", "name", "image_path", "is_favorite") and meta.get(field) not in (None, ""):
+            talent[field] = meta[field]
+    talent.setdefault("tags", [])
+    talent.setdefault("description", "")
+    talent.setdefault("copyright", "User Upload")
+    talent.setdefault("download_url", "")
+    talent["image_path"] = f"images/{image_filename}"
+    return talent
+
+# External edits to the local catalog reach the caches through the watcher
+catalog_watcher: Optional[FileWatcher] = None
+
+def _on_catalog_file_changed(paths):
+    # Picking up an external edit broadcasts catalog_version, our own compactions leave the parsed copy as it is
+    manager = get_catalog_manager(LOCAL_CATALOG_PATH)
+    manager.invalidate()
+    manager.load_catalog()
+
+def _is_catalog_image(path: str, images_dir: str) -> bool:
+    # Hidden folders (thumbnails, sidecars) and partial or temp files are not catalog images
+    relative = os.path.relpath(path, images_dir)
+    if any(part.startswith('.') for part in relative.split(os.sep)):
+        return False
+    return os.path.splitext(path)[1].lower() in SCAN_IMAGE_EXTENSIONS
+
+def _resync_thumbnails():
+    talents = get_catalog_manager(LOCAL_CATALOG_PATH).load_catalog().get("talents", [])
+    get_thumbnail_builder(os.path.dirname(LOCAL_CATALOG_PATH), THUMBNAIL_SIZE, THUMBNAIL_WORKERS) \
+        .schedule(talents, force=True)
+
+def _on_images_changed(paths):
+    """Drop everything derived from the changed image files"""
+    images_dir = os.path.join(os.path.dirname(LOCAL_CATALOG_PATH), "images")
+    paths = {path for path in paths if _is_catalog_image(path, images_dir)}
+    if not paths:
+        return
+    with _content_hash_lock:
+        memos = [_content_hash_memo.pop(path, None) for path in paths]
+    for memo in memos:
+        if memo:
+            decoded_image_cache.invalidate(memo[2])
+    image_hashes.invalidate()
+    local_descriptors.invalidate()
+    _resync_thumbnails()
+
+def _on_thumbnails_changed(paths):
+    # The builder's own writes land here too, only deletions need a resync; image indexes are unaffected
+    if any(path.endswith("_thumb.jpg") and not os.path.exists(path) for path in paths):
+        _resync_thumbnails()
+
+def start_catalog_watcher() -> Optional[FileWatcher]:
+    """Watch catalog.json, catalog/images and catalog/.thumbnails (once per process)"""
+    global catalog_watcher
+    if catalog_watcher is None and WATCHER_ENABLED:
+        catalog_dir = os.path.dirname(LOCAL_CATALOG_PATH)
+        manager = get_catalog_manager(LOCAL_CATALOG_PATH)
+        
+        def watching():
+            # Only once every watch is registered, earlier edits still need the stat check
+            manager.watched = True
+        
+        def unwatched():
+            # Loads go back to stat-checking the file once nobody reports edits
+            manager.watched = False
+            manager.invalidate()
+        catalog_watcher = FileWatcher(interval=WATCHER_INTERVAL_SECONDS, backend=WATCHER_BACKEND,
+                                      on_start=watching, on_stop=unwatched)
+        catalog_watcher.watch(LOCAL_CATALOG_PATH, _on_catalog_file_changed)
+        catalog_watcher.watch(os.path.join(catalog_dir, "images"), _on_images_changed, directory=True)
+        catalog_watcher.watch(os.path.join(catalog_dir, ".thumbnails"), _on_thumbnails_changed, directory=True)
+        catalog_watcher.start()
+    return catalog_watcher
+
 # Safe route registration function
 def register_routes():
     """Register API endpoints only when ComfyUI server is available"""
@@ -476,8 +1517,9 @@ def register_routes():
             page = int(request.query.get('page', 1))
             page_size = int(request.query.get('page_size', 20))
             
-            # Fetch remote catalog
-            catalog_data = fetch_remote_catalog()
+            # Fetch remote catalog (also refreshes the snapshot used by node execution)
+            snapshot = get_remote_catalog_snapshot(force_refresh=True)
+            catalog_data = snapshot.catalog if snapshot else None
             if not catalog_data:
                 return web.json_response({
                     "error": "Failed to fetch remote catalog",
@@ -488,13 +1530,14 @@ def register_routes():
                 }, status=503)
             
             # Apply filters using shared helper
-            filtered_talents = filter_remote_talents(catalog_data.get("talents", []), filters)
+            filtered_talents = filter_remote_talents(catalog_data.get("talents", []), with_favorite_ids(filters))
             
             # Add remote image URLs
             add_remote_image_urls(filtered_talents)
             
             # Paginate using shared helper
             paginated_talents, total_pages, total_count = paginate_talents(filtered_talents, page, page_size)
+            paginated_talents = favorites.merge(paginated_talents)
             
             return web.json_response({
                 "talents": paginated_talents,
@@ -509,7 +1552,48 @@ def register_routes():
             print(f"Morpheus: Error in get_remote_talents_endpoint: {traceback.format_exc()}")
             return web.json_response({"error": str(e)}, status=500)
 
+    @server.PromptServer.instance.routes.post("/morpheus/cache/warmup")
+    async def warmup_cache_endpoint(request):
+        """Start (or cancel) a background download of every remote talent image"""
+        try:
+            from .warmup import start_background_warmup, cancel_warmup, get_warmup_status
+            from .config import WARMUP_DEFAULT_WORKERS, WARMUP_DEFAULT_MAX_KBPS
+            
+            data = await request.json() if request.can_read_body else {}
+            if data.get('action') == 'cancel':
+                cancelled = cancel_warmup()
+                return web.json_response({"status": "cancelling" if cancelled else "idle", **get_warmup_status()})
+            
+            start_background_warmup(
+                workers=int(data.get('workers', WARMUP_DEFAULT_WORKERS)),
+                max_kbps=int(data.get('max_kbps', WARMUP_DEFAULT_MAX_KBPS)),
+                revalidate=bool(data.get('revalidate', True)),
+                force=bool(data.get('force', False))
+            )
+            return web.json_response({"status": "started", **get_warmup_status()})
+        except Exception as e:
+            import traceback
+            print(f"Morpheus: Error in warmup_cache_endpoint: {traceback.format_exc()}")
+            return web.json_response({"error": str(e)}, status=500)
+
+    @server.PromptServer.instance.routes.get("/morpheus/cache/warmup")
+    async def warmup_status_endpoint(request):
+        """Progress of the running warm-up and summary of the last completion manifest"""
+        try:
+            from .warmup import get_warmup_status
+            return web.json_response(get_warmup_status())
+        except Exception as e:
+            return web.json_response({"error": str(e)}, status=500)
+
+    @server.PromptServer.instance.routes.get("/morpheus/cache/stats")
+    async def cache_stats_endpoint(request):
+        """Hit/miss statistics of the in-process caches"""
+        return web.json_response({
+            "decoded_tensors": decoded_image_cache.stats()
+        })
+
     @server.PromptServer.instance.routes.get("/morpheus/talents")
+    @catalog_reader
     async def get_talents_endpoint(request):
         try:
             # Check if remote catalog is requested
@@ -545,6 +1629,7 @@ def register_routes():
             filter_age_group = request.query.get('age_group', '').strip()
             filter_ethnicity = request.query.get('ethnicity', '').strip()
             filter_favorites_only = request.query.get('favorites_only', '').lower() == 'true'
+            filter_search = request.query.get('search', '').strip()
             
             page = int(request.query.get('page', 1))
             page_size = int(request.query.get('page_size', 20))
@@ -554,7 +1639,8 @@ def register_routes():
             
             # For remote mode, we don't need local paths
             if use_remote:
-                catalog_data = fetch_remote_catalog()
+                snapshot = get_remote_catalog_snapshot(force_refresh=True)
+                catalog_data = snapshot.catalog if snapshot else None
                 if not catalog_data:
                     return web.json_response({"error": "Failed to fetch remote catalog"}, status=503)
             else:
@@ -568,7 +1654,7 @@ def register_routes():
                     images_folder = os.path.join(NODE_DIR, images_folder)
                 
                 # Initialize catalog manager
-                manager = CatalogManager(catalog_path)
+                manager = get_catalog_manager(catalog_path)
                 catalog_data = manager.load_catalog()
                 
                 if not catalog_data:
@@ -587,18 +1673,26 @@ def register_routes():
                 "age_group": filter_age_group if filter_age_group else None,
                 "ethnicity": filter_ethnicity if filter_ethnicity else None,
                 "favorites_only": filter_favorites_only,
+                "search": filter_search,
             }
             
             if use_remote:
                 # Use shared helper for remote filtering
-                filtered_talents = filter_remote_talents(catalog_data.get("talents", []), filters)
+                filtered_talents = filter_remote_talents(catalog_data.get("talents", []), with_favorite_ids(filters))
                 # Add remote image URLs
                 add_remote_image_urls(filtered_talents)
             else:
-                manager = CatalogManager(catalog_path)
-                filtered_talents = manager.filter_talents(catalog_data.get("talents", []), filters)
+                filtered_talents = manager.query_talents(with_favorite_ids(filters))
+            
+            # Paginate using shared helper
+            paginated_talents, total_pages, total_count = paginate_talents(filtered_talents, page, page_size)
+            
+            # Copies with is_favorite from the overlay, the records belong to the shared catalog cache
+            paginated_talents = favorites.merge(paginated_talents)
+            
+            if not use_remote:
                 # Add local image URLs
-                for talent in filtered_talents:
+                for talent in paginated_talents:
                     talent_id = talent.get('id', '')
                     image_path = talent.get('image_path', '')
                     if image_path and image_path.startswith('http'):
@@ -608,9 +1702,6 @@ def register_routes():
                         talent['thumbnail_url'] = f"/morpheus/thumbnail/{talent_id}?catalog_path={catalog_path}&images_folder={images_folder}"
                         talent['full_image_url'] = f"/morpheus/image/{talent_id}?catalog_path={catalog_path}&images_folder={images_folder}"
             
-            # Paginate using shared helper
-            paginated_talents, total_pages, total_count = paginate_talents(filtered_talents, page, page_size)
-            
             response_data = {
                 "talents": paginated_talents,
                 "total_pages": total_pages,
@@ -622,14 +1713,57 @@ def register_routes():
             # Add authenticated flag for remote mode
             if use_remote:
                 response_data["authenticated"] = True
+                return web.json_response(response_data)
             
-            return web.json_response(response_data)
+            # Local edits can send this revision back as If-Match
+            response_data["revision"] = manager.revision
+            builder = get_thumbnail_builder(os.path.dirname(catalog_path), THUMBNAIL_SIZE, THUMBNAIL_WORKERS)
+            builder.schedule(manager.catalog_data.get("talents", []), version=manager.version)
+            response_data["thumbnails"] = builder.progress()
+            return web.json_response(response_data, headers={"ETag": f'"{response_data["revision"]}"'})
             
         except Exception as e:
             import traceback
             print(f"Morpheus: Error in get_talents_endpoint: {traceback.format_exc()}")
             return web.json_response({"error": str(e)}, status=500)
 
+    @server.PromptServer.instance.routes.post("/morpheus/rescan")
+    @catalog_writer
+    async def rescan_images_folder(request):
+        """Sync the local catalog with files added, changed or removed in catalog/images"""
+        try:
+            manager = get_catalog_manager(LOCAL_CATALOG_PATH)
+            images_folder = os.path.join(os.path.dirname(LOCAL_CATALOG_PATH), "images")
+            loop = asyncio.get_running_loop()
+            delta = await loop.run_in_executor(None, sync_catalog_with_folder, manager, images_folder)
+            return web.json_response({"status": "success", **delta.summary(), "revision": manager.revision},
+                                     headers={"ETag": f'"{manager.revision}"'})
+        except Exception as e:
+            import traceback
+            print(f"Morpheus: Error in rescan_images_folder: {traceback.format_exc()}")
+            return web.json_response({"error": str(e)}, status=500)
+
+    @server.PromptServer.instance.routes.get("/morpheus/thumbnails/status")
+    async def get_thumbnail_status(request):
+        """Progress of the local catalog's background thumbnail builder"""
+        try:
+            builder = get_thumbnail_builder(os.path.dirname(LOCAL_CATALOG_PATH), THUMBNAIL_SIZE, THUMBNAIL_WORKERS)
+            return web.json_response(builder.progress())
+        except Exception as e:
+            print(f"Morpheus: Error in get_thumbnail_status: {e}")
+            return web.json_response({"error": str(e)}, status=500)
+
+    @server.PromptServer.instance.routes.post("/morpheus/thumbnails/rebuild")
+    async def rebuild_thumbnails(request):
+        """Re-check every local thumbnail against its source image"""
+        try:
+            builder = get_thumbnail_builder(os.path.dirname(LOCAL_CATALOG_PATH), THUMBNAIL_SIZE, THUMBNAIL_WORKERS)
+            builder.schedule(get_local_catalog_snapshot().talents, force=True)
+            return web.json_response({"status": "scheduled", **builder.progress()})
+        except Exception as e:
+            print(f"Morpheus: Error in rebuild_thumbnails: {e}")
+            return web.json_response({"error": str(e)}, status=500)
+
     @server.PromptServer.instance.routes.get("/morpheus/thumbnail/{talent_id}")
     async def get_thumbnail(request):
         talent_id = request.match_info.get('talent_id')
@@ -668,10 +1802,10 @@ def register_routes():
                 return web.FileResponse(thumbnail_path)
             
             # If no thumbnail, try to serve original image
-            manager = CatalogManager(catalog_path)
+            manager = get_catalog_manager(catalog_path)
             catalog_data = manager.load_catalog()
             
-            talent = next((t for t in catalog_data.get('talents', []) if t['id'] == talent_id), None)
+            talent = manager.get_talent(talent_id)
             if not talent:
                 return web.Response(status=404)
             
@@ -725,10 +1859,10 @@ def register_routes():
                 return web.Response(status=403)
             
             # Load catalog and find talent
-            manager = CatalogManager(catalog_path)
+            manager = get_catalog_manager(catalog_path)
             catalog_data = manager.load_catalog()
             
-            talent = next((t for t in catalog_data.get('talents', []) if t['id'] == talent_id), None)
+            talent = manager.get_talent(talent_id)
             if not talent:
                 return web.Response(status=404)
             
@@ -754,8 +1888,16 @@ def register_routes():
 
     @server.PromptServer.instance.routes.post("/morpheus/upload")
     async def upload_talent_image(request):
-        """Upload talent image file"""
+        """Upload talent image file
+        
+        The file is hashed while it streams to disk and rejected with 409 when
+        the catalog already holds the same or a visually near-identical image,
+        unless allow_duplicates=1 is passed.
+        """
+        temp_path = None
         try:
+            schedule_temp_upload_cleanup()
+            allow_duplicates = request.query.get('allow_duplicates', '').lower() in ('1', 'true', 'yes')
             reader = await request.multipart()
             field = await reader.next()
             
@@ -774,34 +1916,61 @@ def register_routes():
                 return web.json_response({"error": "Only JPG and PNG files are allowed"}, status=400)
             
             # Create temp directory if it doesn't exist
-            temp_dir = os.path.join(NODE_DIR, '.temp_uploads')
-            os.makedirs(temp_dir, exist_ok=True)
+            os.makedirs(TEMP_UPLOAD_DIR, exist_ok=True)
             
             # Generate unique temp filename
-            import uuid
             temp_filename = f"temp_{uuid.uuid4().hex}{file_ext}"
-            temp_path = os.path.join(temp_dir, temp_filename)
+            temp_path = os.path.join(TEMP_UPLOAD_DIR, temp_filename)
             
-            # Save uploaded file
+            # Save uploaded file, hashing and size-checking each chunk
+            max_bytes = UPLOAD_MAX_FILE_MB * 1024 * 1024
+            digest = hashlib.sha256()
+            size = 0
             with open(temp_path, 'wb') as f:
                 while True:
-                    chunk = await field.read_chunk()
+                    chunk = await field.read_chunk(REMOTE_DOWNLOAD_CHUNK_SIZE)
                     if not chunk:
                         break
+                    size += len(chunk)
+                    if size > max_bytes:
+                        break
+                    digest.update(chunk)
                     f.write(chunk)
+            if size > max_bytes:
+                os.remove(temp_path)
+                return web.json_response({"error": f"File exceeds {UPLOAD_MAX_FILE_MB} MB"}, status=413)
+            
+            if not allow_duplicates:
+                loop = asyncio.get_running_loop()
+                phash = await loop.run_in_executor(None, dhash, temp_path)
+                matches = await loop.run_in_executor(None, find_catalog_duplicates, digest.hexdigest(), phash)
+                if matches:
+                    os.remove(temp_path)
+                    best = matches[0]
+                    kind = "already in" if best["match"] == "exact" else "very similar to an image in"
+                    return web.json_response({
+                        "status": "duplicate",
+                        "error": f"Image is {kind} the catalog ({best['name'] or best['talent_id']})",
+                        "duplicates": matches[:5],
+                        "original_filename": filename
+                    }, status=409)
             
             return web.json_response({
                 "status": "success",
                 "temp_filename": temp_filename,
-                "original_filename": filename
+                "original_filename": filename,
+                "sha256": digest.hexdigest()
             })
             
         except Exception as e:
             import traceback
             print(f"Morpheus: Error in upload_talent_image: {traceback.format_exc()}")
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
             return web.json_response({"error": str(e)}, status=500)
 
     @server.PromptServer.instance.routes.post("/morpheus/save_talent")
+    @catalog_writer
     async def save_talent_metadata(request):
         """Save talent with metadata to catalog"""
         try:
@@ -813,6 +1982,13 @@ def register_routes():
                 if not data.get(field):
                     return web.json_response({"error": f"Missing required field: {field}"}, status=400)
             
+            # Reject stale edits before touching any files
+            catalog_path = os.path.join(NODE_DIR, 'catalog', 'catalog.json')
+            manager = get_catalog_manager(catalog_path)
+            conflict = check_catalog_revision(request, data, manager)
+            if conflict:
+                return conflict
+            
             # Generate unique talent ID
             import uuid
             import re
@@ -821,8 +1997,7 @@ def register_routes():
             talent_id = f"{base_id}_{uuid.uuid4().hex[:8]}"
             
             # Move temp file to images directory
-            temp_dir = os.path.join(NODE_DIR, '.temp_uploads')
-            temp_path = os.path.join(temp_dir, data['temp_filename'])
+            temp_path = os.path.join(TEMP_UPLOAD_DIR, data['temp_filename'])
             
             if not os.path.exists(temp_path):
                 return web.json_response({"error": "Temp file not found"}, status=404)
@@ -871,68 +2046,191 @@ def register_routes():
                 "is_favorite": False
             }
             
-            # Load and update catalog
-            catalog_path = os.path.join(NODE_DIR, 'catalog', 'catalog.json')
-            manager = CatalogManager(catalog_path)
-            catalog_data = manager.load_catalog()
-            
-            if not catalog_data:
-                catalog_data = {
-                    "version": "1.0",
-                    "description": "Morpheus Model Management Talent Catalog",
-                    "created": "2025-09-14",
-                    "last_updated": "2025-09-14",
-                    "talents": []
-                }
+            # Load and update catalog (the manager starts an empty catalog when there is none)
+            manager.load_catalog()
             
             # Add new talent to catalog
-            catalog_data["talents"].append(talent_entry)
+            manager.add_talent(talent_entry)
             
-            # Update last_updated timestamp
+            # Update last_updated timestamp and bump the catalog revision
             from datetime import datetime
-            catalog_data["last_updated"] = datetime.now().strftime("%Y-%m-%d")
+            revision = manager.commit_revision({"last_updated": datetime.now().strftime("%Y-%m-%d")})
             
-            # Save updated catalog
-            manager.save_catalog(catalog_data)
+            # Journaled already; catalog.json is compacted in the background when due
+            manager.schedule_save()
             
             # Generate thumbnail
-            try:
-                from PIL import Image
-                with Image.open(final_path) as img:
-                    # Create thumbnail
-                    thumbnail_size = (150, 150)
-                    img.thumbnail(thumbnail_size, Image.LANCZOS)
-                    
-                    # Save thumbnail
-                    thumbnails_dir = os.path.join(NODE_DIR, 'catalog', '.thumbnails')
-                    os.makedirs(thumbnails_dir, exist_ok=True)
-                    thumbnail_path = os.path.join(thumbnails_dir, f"{talent_id}_thumb.jpg")
-                    
-                    # Convert to RGB if needed (for PNG with transparency)
-                    if img.mode in ('RGBA', 'LA', 'P'):
-                        background = Image.new('RGB', img.size, (255, 255, 255))
-                        if img.mode == 'P':
-                            img = img.convert('RGBA')
-                        if img.mode in ('RGBA', 'LA'):
-                            background.paste(img, mask=img.split()[-1])
-                            img = background
-                    
-                    img.save(thumbnail_path, 'JPEG', quality=85)
-            except Exception as thumb_error:
-                print(f"Morpheus: Error generating thumbnail: {thumb_error}")
+            thumbnail_path = os.path.join(NODE_DIR, 'catalog', '.thumbnails', f"{talent_id}_thumb.jpg")
+            thumb_error = make_thumbnail(final_path, thumbnail_path)
+            if thumb_error:
                 # Continue anyway, thumbnail will be generated on demand
+                print(f"Morpheus: Error generating thumbnail: {thumb_error}")
+            schedule_descriptor(local_descriptors, talent_id, final_path)
+            broadcast_catalog_event("talent_added", source="local", revision=revision, talent_ids=[talent_id])
             
             return web.json_response({
                 "status": "success",
                 "talent_id": talent_id,
-                "message": "Talent saved successfully"
-            })
+                "message": "Talent saved successfully",
+                "revision": revision
+            }, headers={"ETag": f'"{revision}"'})
             
         except Exception as e:
             import traceback
             print(f"Morpheus: Error in save_talent_metadata: {traceback.format_exc()}")
             return web.json_response({"error": str(e)}, status=500)
 
+    @server.PromptServer.instance.routes.post("/morpheus/import")
+    async def bulk_import_talents(request):
+        """Import many talents in one request
+        
+        Accepts multipart image files and/or zip archives, with metadata as a
+        CSV/JSON file (inside the zip or as a separate part) or a "metadata"
+        text field. Files are streamed to disk, thumbnails rendered in a process
+        pool, and every valid talent is committed in a single catalog change.
+        """
+        import re
+        import shutil
+        work_dir = os.path.join(TEMP_UPLOAD_DIR, f"import_{uuid.uuid4().hex}")
+        try:
+            os.makedirs(work_dir)
+            loop = asyncio.get_running_loop()
+            images, metadata, results = [], {}, []
+            
+            reader = await request.multipart()
+            while True:
+                part = await reader.next()
+                if part is None:
+                    break
+                filename = os.path.basename(part.filename or "")
+                if not filename:
+                    if part.name == "metadata":
+                        metadata.update(parse_import_metadata(await part.text()))
+                    continue
+                
+                file_ext = os.path.splitext(filename)[1].lower()
+                if file_ext in ('.csv', '.json'):
+                    metadata.update(parse_import_metadata((await part.read()).decode('utf-8'), filename))
+                    continue
+                if file_ext != '.zip' and file_ext not in IMPORT_IMAGE_EXTENSIONS:
+                    results.append({"filename": filename, "status": "error", "error": "Unsupported file type"})
+                    continue
+                
+                # Stream the part to disk, stopping as soon as it passes its cap
+                limit_mb = IMPORT_MAX_ARCHIVE_MB if file_ext == '.zip' else IMPORT_MAX_FILE_MB
+                limit_bytes = limit_mb * 1024 * 1024
+                temp_path = os.path.join(work_dir, f"part_{len(images)}_{uuid.uuid4().hex[:8]}{file_ext}")
+                size = 0
+                with open(temp_path, 'wb') as f:
+                    while True:
+                        chunk = await part.read_chunk(REMOTE_DOWNLOAD_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        size += len(chunk)
+                        if size > limit_bytes:
+                            break
+                        f.write(chunk)
+                if size > limit_bytes:
+                    # The rest of the part is discarded by reader.next()
+                    os.remove(temp_path)
+                    results.append({"filename": filename, "status": "error", "error": f"File exceeds {limit_mb} MB"})
+                elif file_ext == '.zip':
+                    zip_images, zip_metadata, zip_errors = await loop.run_in_executor(None, extract_import_zip, temp_path, work_dir)
+                    os.remove(temp_path)
+                    images.extend(zip_images)
+                    metadata.update(zip_metadata)
+                    results.extend(zip_errors)
+                else:
+                    images.append((filename, temp_path))
+            
+            if not images and not results:
+                return web.json_response({"error": "No images provided"}, status=400)
+            
+            catalog_path = os.path.join(NODE_DIR, 'catalog', 'catalog.json')
+            manager = get_catalog_manager(catalog_path)
+            manager.load_catalog()
+            thumbnails_dir = os.path.join(NODE_DIR, 'catalog', '.thumbnails')
+            
+            # Build and validate records
+            pending, taken_ids = [], set()
+            for filename, temp_path in images:
+                meta = metadata.get(filename, {})
+                talent_id = str(meta.get("id") or "")
+                if not re.match(r'^[a-zA-Z0-9_]+$', talent_id) or manager.get_talent(talent_id) or talent_id in taken_ids:
+                    name = meta.get("name") or os.path.splitext(filename)[0]
+                    talent_id = f"{re.sub(r'[^a-zA-Z0-9_]', '_', name.lower())}_{uuid.uuid4().hex[:8]}"
+                taken_ids.add(talent_id)
+                file_ext = os.path.splitext(temp_path)[1]
+                talent = build_import_talent(filename, meta, talent_id, f"{talent_id}{file_ext}")
+                errors = validate_talent(talent)
+                if errors:
+                    results.append({"filename": filename, "status": "error", "error": "; ".join(errors)})
+                    continue
+                thumbnail_path = os.path.join(thumbnails_dir, f"{talent_id}_thumb.jpg")
+                pending.append((filename, temp_path, talent, thumbnail_path))
+            
+            # Thumbnails off the event loop, in worker processes
+            thumb_errors = await loop.run_in_executor(
+                None, generate_thumbnails, [(temp_path, thumb) for _, temp_path, _, thumb in pending], THUMBNAIL_SIZE, THUMBNAIL_WORKERS
+            )
+            
+            # Commit everything as one catalog change
+            images_dir = os.path.join(NODE_DIR, 'catalog', 'images')
+            os.makedirs(images_dir, exist_ok=True)
+            async with catalog_rw_lock.write():
+                conflict = check_catalog_revision(request, {}, manager)
+                if conflict:
+                    for _, _, _, thumbnail_path in pending:
+                        if os.path.exists(thumbnail_path):
+                            os.remove(thumbnail_path)
+                    return conflict
+                
+                new_talents = []
+                for filename, temp_path, talent, thumbnail_path in pending:
+                    # A concurrent writer may have taken the id since it was checked
+                    if manager.get_talent(talent["id"]):
+                        talent_id = f"{re.sub(r'[^a-zA-Z0-9_]', '_', talent['name'].lower())}_{uuid.uuid4().hex[:8]}"
+                        talent["id"] = talent_id
+                        talent["image_path"] = f"images/{talent_id}{os.path.splitext(temp_path)[1]}"
+                        renamed_thumbnail = os.path.join(thumbnails_dir, f"{talent_id}_thumb.jpg")
+                        if os.path.exists(thumbnail_path):
+                            os.replace(thumbnail_path, renamed_thumbnail)
+                        if thumbnail_path in thumb_errors:
+                            thumb_errors[renamed_thumbnail] = thumb_errors[thumbnail_path]
+                        thumbnail_path = renamed_thumbnail
+                    shutil.move(temp_path, os.path.join(NODE_DIR, 'catalog', talent["image_path"]))
+                    new_talents.append(talent)
+                    result = {"filename": filename, "status": "imported", "talent_id": talent["id"]}
+                    if thumb_errors.get(thumbnail_path):
+                        result["thumbnail_error"] = thumb_errors[thumbnail_path]
+                    results.append(result)
+                
+                revision = manager.revision
+                if new_talents:
+                    manager.add_talents(new_talents)
+                    revision = manager.commit_revision({"last_updated": datetime.now().strftime("%Y-%m-%d")})
+                    manager.schedule_save()
+                    for talent in new_talents:
+                        schedule_descriptor(local_descriptors, talent["id"], os.path.join(NODE_DIR, 'catalog', talent["image_path"]))
+                    broadcast_catalog_event("talent_added", source="local", revision=revision,
+                                            talent_ids=[talent["id"] for talent in new_talents])
+            
+            imported = len(new_talents)
+            return web.json_response({
+                "status": "success" if imported and imported == len(results) else ("partial" if imported else "error"),
+                "imported": imported,
+                "failed": len(results) - imported,
+                "results": results,
+                "revision": revision
+            }, headers={"ETag": f'"{revision}"'})
+            
+        except Exception as e:
+            import traceback
+            print(f"Morpheus: Error in bulk_import_talents: {traceback.format_exc()}")
+            return web.json_response({"error": str(e)}, status=500)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
     @server.PromptServer.instance.routes.post("/morpheus/ui_state")
     async def set_ui_state(request):
         try:
@@ -940,16 +2238,13 @@ def register_routes():
             node_id = str(data.get("node_id"))
             gallery_id = data.get("gallery_id")
             state = data.get("state", {})
+            workflow_id = str(data.get("workflow_id") or "")
             
             if not node_id or not gallery_id:
                 return web.json_response({"status": "error", "message": "node_id or gallery_id required"}, status=400)
             
-            node_key = f"{gallery_id}_{node_id}"
-            ui_states = load_ui_state()
-            if node_key not in ui_states:
-                ui_states[node_key] = {}
-            ui_states[node_key].update(state)
-            save_ui_state(ui_states)
+            # In-memory update, the shard file is flushed in the background
+            ui_state_store.update(gallery_id, node_id, state, workflow_id=workflow_id)
             
             return web.json_response({"status": "ok"})
             
@@ -965,9 +2260,7 @@ def register_routes():
             if not node_id or not gallery_id:
                 return web.json_response({"error": "node_id or gallery_id required"}, status=400)
             
-            node_key = f"{gallery_id}_{node_id}"
-            ui_states = load_ui_state()
-            node_state = ui_states.get(node_key, {
+            node_state = ui_state_store.get(gallery_id, node_id) or {
                 "selected_talent_id": "",
                 "filters": {
                     "name": "",
@@ -977,7 +2270,7 @@ def register_routes():
                     "age_group": "",
                     "ethnicity": ""
                 }
-            })
+            }
             
             return web.json_response(node_state)
             
@@ -985,7 +2278,9 @@ def register_routes():
             return web.json_response({"status": "error", "message": str(e)}, status=500)
 
     @server.PromptServer.instance.routes.post("/morpheus/favorite")
+    @catalog_reader
     async def toggle_favorite(request):
+        """Toggle a favorite in the per-device overlay (or set it with is_favorite)"""
         try:
             data = await request.json()
             talent_id = data.get("talent_id")
@@ -998,36 +2293,25 @@ def register_routes():
             if not os.path.isabs(catalog_path):
                 catalog_path = os.path.join(NODE_DIR, catalog_path)
             
-            # Initialize catalog manager and load catalog
-            manager = CatalogManager(catalog_path)
-            catalog_data = manager.load_catalog()
-            
-            if not catalog_data:
-                return web.json_response({"error": "Could not load catalog"}, status=500)
-            
-            # Find the talent and toggle favorite status
-            talent_found = False
-            for talent in catalog_data.get("talents", []):
-                if talent.get("id") == talent_id:
-                    talent_found = True
-                    # Toggle is_favorite field
-                    current_favorite = talent.get("is_favorite", False)
-                    talent["is_favorite"] = not current_favorite
-                    break
-            
-            if not talent_found:
-                return web.json_response({"error": "Talent not found"}, status=404)
-            
-            # Save the updated catalog
-            try:
-                manager.save_catalog(catalog_data)
-                return web.json_response({
-                    "status": "success", 
-                    "talent_id": talent_id,
-                    "is_favorite": talent["is_favorite"]
-                })
-            except Exception as e:
-                return web.json_response({"error": f"Could not save catalog: {str(e)}"}, status=500)
+            # The talent may come from the local or the remote catalog
+            manager = get_catalog_manager(catalog_path)
+            manager.load_catalog()
+            if not manager.get_talent(talent_id):
+                snapshot = await asyncio.get_running_loop().run_in_executor(None, get_remote_catalog_snapshot)
+                if not (snapshot and snapshot.get(talent_id)):
+                    return web.json_response({"error": "Talent not found"}, status=404)
+            
+            # Only the overlay changes, the catalog is not rewritten
+            if "is_favorite" in data:
+                is_favorite = favorites.set(talent_id, bool(data["is_favorite"]))
+            else:
+                is_favorite = favorites.toggle(talent_id)
+            broadcast_catalog_event("favorite", talent_id=talent_id, is_favorite=is_favorite)
+            return web.json_response({
+                "status": "success", 
+                "talent_id": talent_id,
+                "is_favorite": is_favorite
+            })
             
         except Exception as e:
             import traceback
@@ -1035,6 +2319,7 @@ def register_routes():
             return web.json_response({"error": str(e)}, status=500)
 
     @server.PromptServer.instance.routes.get("/morpheus/talent/{talent_id}")
+    @catalog_reader
     async def get_talent_data(request):
         """Get talent data for editing"""
         try:
@@ -1050,33 +2335,152 @@ def register_routes():
             
             # Load catalog
             catalog_path = os.path.join(NODE_DIR, 'catalog', 'catalog.json')
-            manager = CatalogManager(catalog_path)
+            manager = get_catalog_manager(catalog_path)
             catalog_data = manager.load_catalog()
             
             if not catalog_data:
                 return web.json_response({"error": "Catalog not found"}, status=404)
             
             # Find talent by id
-            talent = None
-            for t in catalog_data.get("talents", []):
-                if t.get("id") == talent_id:
-                    talent = t
-                    break
+            talent = manager.get_talent(talent_id)
             
             if not talent:
                 return web.json_response({"error": "Talent not found"}, status=404)
             
+            revision = manager.revision
             return web.json_response({
                 "status": "success",
-                "talent": talent
-            })
+                "talent": favorites.merge([talent])[0],
+                "revision": revision
+            }, headers={"ETag": f'"{revision}"'})
             
         except Exception as e:
             import traceback
             print(f"Morpheus: Error in get_talent_data: {traceback.format_exc()}")
             return web.json_response({"error": str(e)}, status=500)
 
+    @server.PromptServer.instance.routes.post("/morpheus/talents/batch")
+    @catalog_reader
+    async def get_talents_batch(request):
+        """Several talents in one round trip, straight from the in-memory indexes
+        
+        Body: {"ids": [...], "fields": [...] (optional projection, id is always
+        included), "source": "local" | "remote" | "auto"}. With "auto" ids are
+        looked up in the local catalog first, then in the remote snapshot.
+        Records come back in request order; unknown ids are listed in "missing".
+        """
+        try:
+            data = await request.json()
+            ids = data.get('ids') if isinstance(data, dict) else None
+            if not isinstance(ids, list) or not all(isinstance(talent_id, str) for talent_id in ids):
+                return web.json_response({"error": "ids must be a list of talent ids"}, status=400)
+            if len(ids) > 1000:
+                return web.json_response({"error": "At most 1000 ids per request"}, status=400)
+            fields = data.get('fields')
+            if fields is not None and (not isinstance(fields, list) or not all(isinstance(f, str) for f in fields)):
+                return web.json_response({"error": "fields must be a list of field names"}, status=400)
+            source = data.get('source', 'auto')
+            if source not in ('local', 'remote', 'auto'):
+                return web.json_response({"error": "source must be local, remote or auto"}, status=400)
+            
+            found = {}
+            remote_ids = set()
+            manager = get_catalog_manager(LOCAL_CATALOG_PATH)
+            if source != 'remote':
+                manager.load_catalog()
+                for talent_id in ids:
+                    talent = manager.talent_index.get(talent_id)
+                    if talent is not None:
+                        found[talent_id] = talent
+            if source != 'local' and len(found) < len(set(ids)):
+                snapshot = await asyncio.get_running_loop().run_in_executor(None, get_remote_catalog_snapshot)
+                if snapshot:
+                    for talent_id in ids:
+                        if talent_id not in found and talent_id in snapshot.by_id:
+                            found[talent_id] = snapshot.by_id[talent_id]
+                            remote_ids.add(talent_id)
+            
+            ordered = [talent_id for talent_id in dict.fromkeys(ids) if talent_id in found]
+            talents = favorites.merge([found[talent_id] for talent_id in ordered])
+            add_remote_image_urls([talent for talent in talents if talent.get("id") in remote_ids])
+            if fields is not None:
+                keep = set(fields) | {"id"}
+                talents = [{key: value for key, value in talent.items() if key in keep} for talent in talents]
+            
+            revision = manager.revision
+            return web.json_response({
+                "status": "success",
+                "talents": talents,
+                "missing": [talent_id for talent_id in dict.fromkeys(ids) if talent_id not in found],
+                "revision": revision
+            }, headers={"ETag": f'"{revision}"'})
+            
+        except json.JSONDecodeError:
+            return web.json_response({"error": "Invalid JSON body"}, status=400)
+        except Exception as e:
+            import traceback
+            print(f"Morpheus: Error in get_talents_batch: {traceback.format_exc()}")
+            return web.json_response({"error": str(e)}, status=500)
+
+    @server.PromptServer.instance.routes.get("/morpheus/similar/{talent_id}")
+    @catalog_reader
+    async def get_similar_talents(request):
+        """Talents that look most like the given one
+        
+        Query: limit (default 12), source ("local" or "remote", default: the
+        catalog holding the talent) and the listing filters (gender, age_group,
+        ethnicity, tags, logic, search, favorites_only) to restrict the results.
+        """
+        try:
+            talent_id = request.match_info.get('talent_id')
+            import re
+            if not talent_id or not re.match(r'^[a-zA-Z0-9_-]+$', talent_id):
+                return web.json_response({"error": "Invalid talent_id format"}, status=400)
+            
+            limit = max(1, min(int(request.query.get('limit', 12)), 100))
+            source = request.query.get('source', '')
+            if source not in ('local', 'remote'):
+                in_local = get_catalog_manager(LOCAL_CATALOG_PATH).get_talent(talent_id) is not None
+                source = 'local' if in_local else 'remote'
+            
+            filters = {}
+            for key in ('gender', 'age_group', 'ethnicity', 'search'):
+                if request.query.get(key, '').strip():
+                    filters[key] = request.query[key].strip()
+            tags = [tag.strip() for tag in request.query.get('tags', '').lower().split(',') if tag.strip()]
+            if tags:
+                filters["tag_filter"] = tags
+                filters["tag_logic"] = request.query.get('logic', 'OR').upper()
+            if request.query.get('favorites_only', '').lower() == 'true':
+                filters["favorites_only"] = True
+            
+            loop = asyncio.get_running_loop()
+            matches = await loop.run_in_executor(None, find_similar_talents, talent_id, source, filters, limit)
+            if matches is None:
+                return web.json_response({"error": "Talent not found or image unavailable"}, status=404)
+            
+            talents = favorites.merge([talent for talent, _ in matches])
+            for talent, (_, score) in zip(talents, matches):
+                talent["similarity"] = score
+            if source == 'remote':
+                add_remote_image_urls(talents)
+            return web.json_response({
+                "status": "success",
+                "talent_id": talent_id,
+                "source": source,
+                "talents": talents,
+                "indexing": (remote_descriptors if source == 'remote' else local_descriptors).refreshing
+            })
+            
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        except Exception as e:
+            import traceback
+            print(f"Morpheus: Error in get_similar_talents: {traceback.format_exc()}")
+            return web.json_response({"error": str(e)}, status=500)
+
     @server.PromptServer.instance.routes.post("/morpheus/delete_talent")
+    @catalog_writer
     async def delete_talent(request):
         """Delete talent from catalog and filesystem"""
         try:
@@ -1093,25 +2497,20 @@ def register_routes():
             
             # Load catalog
             catalog_path = os.path.join(NODE_DIR, 'catalog', 'catalog.json')
-            manager = CatalogManager(catalog_path)
+            manager = get_catalog_manager(catalog_path)
             catalog_data = manager.load_catalog()
             
             if not catalog_data:
                 return web.json_response({"error": "Catalog not found"}, status=404)
             
             # Find talent to delete (but don't remove from catalog yet)
-            talent_to_delete = None
-            talent_index = -1
-            talents_list = catalog_data.get("talents", [])
-            
-            for i, talent in enumerate(talents_list):
-                if talent.get("id") == talent_id:
-                    talent_to_delete = talent
-                    talent_index = i
-                    break
+            talent_to_delete = manager.get_talent(talent_id)
             
             if not talent_to_delete:
                 return web.json_response({"error": "Talent not found"}, status=404)
+            conflict = check_catalog_revision(request, data, manager)
+            if conflict:
+                return conflict
             
             # Store original catalog for rollback if file deletion fails
             original_catalog = catalog_data.copy()
@@ -1165,17 +2564,19 @@ def register_routes():
                     return web.json_response({"error": f"Failed to delete thumbnail: {str(e)}"}, status=500)
             
             # Only now remove from catalog after successful file deletions
-            catalog_data["talents"].pop(talent_index)
+            manager.remove_talent(talent_id)
             
             # Update catalog
             from datetime import datetime
-            catalog_data["last_updated"] = datetime.now().strftime("%Y-%m-%d")
-            manager.save_catalog(catalog_data)
+            revision = manager.commit_revision({"last_updated": datetime.now().strftime("%Y-%m-%d")})
+            manager.schedule_save()
+            broadcast_catalog_event("talent_deleted", source="local", revision=revision, talent_id=talent_id)
             
             return web.json_response({
                 "status": "success",
-                "message": f"Talent '{talent_to_delete.get('name', talent_id)}' deleted successfully"
-            })
+                "message": f"Talent '{talent_to_delete.get('name', talent_id)}' deleted successfully",
+                "revision": revision
+            }, headers={"ETag": f'"{revision}"'})
             
         except Exception as e:
             import traceback
@@ -1183,6 +2584,7 @@ def register_routes():
             return web.json_response({"error": str(e)}, status=500)
 
     @server.PromptServer.instance.routes.post("/morpheus/update_talent")
+    @catalog_writer
     async def update_talent_metadata(request):
         """Update existing talent metadata"""
         try:
@@ -1205,43 +2607,45 @@ def register_routes():
             
             # Load catalog
             catalog_path = os.path.join(NODE_DIR, 'catalog', 'catalog.json')
-            manager = CatalogManager(catalog_path)
+            manager = get_catalog_manager(catalog_path)
             catalog_data = manager.load_catalog()
             
             if not catalog_data:
                 return web.json_response({"error": "Catalog not found"}, status=404)
+            conflict = check_catalog_revision(request, data, manager)
+            if conflict:
+                return conflict
             
             # Find talent to update
-            talent_found = False
-            for talent in catalog_data.get("talents", []):
-                if talent.get("id") == talent_id:
-                    talent_found = True
-                    # Update talent fields
-                    talent["name"] = data['name']
-                    talent["gender"] = data['gender']
-                    talent["age_group"] = data['age_group']
-                    talent["ethnicity"] = data['ethnicity']
-                    talent["hair_color"] = data.get('hair_color', '')
-                    talent["hair_style"] = data.get('hair_style', '')
-                    talent["eye_color"] = data.get('eye_color', '')
-                    talent["tags"] = data.get('tags', [])
-                    talent["description"] = data.get('description', '')
-                    break
+            fields = {
+                "name": data['name'],
+                "gender": data['gender'],
+                "age_group": data['age_group'],
+                "ethnicity": data['ethnicity'],
+                "hair_color": data.get('hair_color', ''),
+                "hair_style": data.get('hair_style', ''),
+                "eye_color": data.get('eye_color', ''),
+                "tags": data.get('tags', []),
+                "description": data.get('description', '')
+            }
+            talent = manager.update_talent(talent_id, fields)
             
-            if not talent_found:
+            if not talent:
                 return web.json_response({"error": "Talent not found"}, status=404)
             
-            # Update timestamp
+            # Update timestamp and bump the catalog revision
             from datetime import datetime
-            catalog_data["last_updated"] = datetime.now().strftime("%Y-%m-%d")
+            revision = manager.commit_revision({"last_updated": datetime.now().strftime("%Y-%m-%d")})
             
-            # Save updated catalog
-            manager.save_catalog(catalog_data)
+            # Journaled already; catalog.json is compacted in the background when due
+            manager.schedule_save()
+            broadcast_catalog_event("talent_updated", source="local", revision=revision, talent_id=talent_id, fields=fields)
             
             return web.json_response({
                 "status": "success",
-                "message": f"Talent '{data['name']}' updated successfully"
-            })
+                "message": f"Talent '{data['name']}' updated successfully",
+                "revision": revision
+            }, headers={"ETag": f'"{revision}"'})
             
         except Exception as e:
             import traceback
@@ -1709,6 +3113,10 @@ if COMFYUI_AVAILABLE and server:
         register_routes()
     except Exception as e:
         print(f"Morpheus: Failed to register routes: {e}")
+    try:
+        start_catalog_watcher()
+    except Exception as e:
+        print(f"Morpheus: Failed to start file watcher: {e}")
 
 class MorpheusModelManagement:
     """ComfyUI custom node for talent model management and selection"""
@@ -1722,6 +3130,26 @@ class MorpheusModelManagement:
     def INPUT_TYPES(cls):
         return {
             "required": {},
+            "optional": {
+                "long_edge": ("INT", {"default": 0, "min": 0, "max": 8192, "step": 8,
+                                      "tooltip": "Target long edge in pixels (0 keeps the original resolution)"}),
+                "fit_mode": (FIT_MODES, {"default": "contain",
+                                         "tooltip": "contain: long edge = target; cover: short edge = target; crop: cover then center-crop to a square"}),
+                "resample": (list(RESAMPLE_FILTERS.keys()), {"default": "lanczos"}),
+                "output_dtype": (list(OUTPUT_DTYPES.keys()), {"default": "float32"}),
+                "mode": (["single", "batch", "iterate"], {"default": "single",
+                                                          "tooltip": "batch: output every listed or matching talent as one IMAGE batch; iterate: output the index-th talent matching filter_spec"}),
+                "talent_ids": ("STRING", {"default": "", "multiline": True,
+                                          "tooltip": "Batch mode: comma or newline separated talent ids"}),
+                "filter_spec": ("STRING", {"default": "",
+                                           "tooltip": "Batch mode without ids: e.g. gender=female&tags=editorial,beauty&logic=AND "
+                                                      "(empty: the first max_batch talents of the catalog)"}),
+                "max_batch": ("INT", {"default": 16, "min": 1, "max": 256}),
+                "index": ("INT", {"default": 0, "min": 0, "max": 0xffffffff, "control_after_generate": True,
+                                  "tooltip": "Iterate mode: position in the id-ordered filter matches (wraps around)"}),
+                "prefetch": ("INT", {"default": 0, "min": 0, "max": 16,
+                                     "tooltip": "Iterate mode: decode this many upcoming talents in the background"}),
+            },
             "hidden": {
                 "unique_id": "UNIQUE_ID",
                 "extra_pnginfo": "EXTRA_PNGINFO",
@@ -1738,240 +3166,344 @@ class MorpheusModelManagement:
         self,
         unique_id=None,
         extra_pnginfo=None,
-        selected_talent_id: str = ""
+        selected_talent_id: str = "",
+        long_edge: int = 0,
+        fit_mode: str = "contain",
+        resample: str = "lanczos",
+        output_dtype: str = "float32",
+        mode: str = "single",
+        talent_ids: str = "",
+        filter_spec: str = "",
+        max_batch: int = 16,
+        index: int = 0,
+        prefetch: int = 0
     ) -> Tuple[torch.Tensor, str, str]:
         """Main function called by ComfyUI to select and return talent data"""
+        decode_options = {
+            "long_edge": int(long_edge or 0),
+            "fit_mode": fit_mode if fit_mode in FIT_MODES else "contain",
+            "resample": resample if resample in RESAMPLE_FILTERS else "lanczos",
+            "output_dtype": output_dtype if output_dtype in OUTPUT_DTYPES else "float32",
+        }
         
         # Use fixed paths for local catalog (fallback)
-        catalog_path = "catalog/catalog.json"
         images_folder = "catalog/images" 
-        thumbnail_size = 150
         
         # Resolve paths relative to node directory
-        full_catalog_path = os.path.join(NODE_DIR, catalog_path)
+        full_catalog_path = LOCAL_CATALOG_PATH
         full_images_path = os.path.join(NODE_DIR, images_folder)
         
         # Initialize catalog manager for local fallback
         if not self.catalog_manager:
-            self.catalog_manager = CatalogManager(full_catalog_path)
+            self.catalog_manager = get_catalog_manager(full_catalog_path)
         
         # Try to load from REMOTE catalog first (Patreon patrons get remote access)
         catalog_data = None
         using_remote = False
         
-        remote_catalog = fetch_remote_catalog()
-        if remote_catalog and remote_catalog.get("talents"):
-            catalog_data = remote_catalog
+        # Shared snapshot: no network access while it is fresh, URLs already resolved
+        snapshot = get_remote_catalog_snapshot()
+        if snapshot and snapshot.talents:
+            catalog_data = snapshot.catalog
             using_remote = True
-            # Add remote image URLs to talents
-            add_remote_image_urls(catalog_data.get("talents", []))
-            print(f"Morpheus: Using remote catalog with {len(catalog_data.get('talents', []))} talents")
         else:
-            # Fallback to local catalog
-            catalog_data = self.catalog_manager.load_catalog()
-            if not catalog_data.get("talents"):
-                # Create sample catalog if empty
-                catalog_data = create_sample_catalog()
-                try:
-                    self.catalog_manager.save_catalog(catalog_data)
-                except:
-                    pass
+            # Fallback to local catalog (parsed once, shared with the endpoints)
+            snapshot = get_local_catalog_snapshot()
+            catalog_data = snapshot.catalog
             print(f"Morpheus: Using local catalog with {len(catalog_data.get('talents', []))} talents")
         
-        # Generate thumbnails if needed (only for local catalog)
-        if not using_remote and not self._thumbnails_exist(os.path.dirname(full_catalog_path)):
-            self._generate_thumbnails(catalog_data, os.path.dirname(full_catalog_path), thumbnail_size)
+        if mode == "batch":
+            talents = self._select_batch_talents(snapshot, talent_ids, filter_spec, max_batch)
+            if not talents:
+                return self._create_placeholder_output(decode_options)
+            image_batch = self._load_talent_batch(talents, os.path.dirname(full_catalog_path), decode_options)
+            descriptions = [self._talent_description(talent) for talent in talents]
+            metadata_blocks = [self._format_metadata(talent) for talent in talents]
+            self.last_selected_talent = talents[-1]
+            return (image_batch, "\n".join(descriptions), "\n\n".join(metadata_blocks))
+        
+        if mode == "iterate":
+            return self._select_iteration(snapshot, filter_spec, index, prefetch,
+                                          os.path.dirname(full_catalog_path), decode_options)
         
         # Select talent
         selected_talent = None
         if selected_talent_id:
-            selected_talent = next((t for t in catalog_data.get("talents", []) if t["id"] == selected_talent_id), None)
+            selected_talent = snapshot.get(selected_talent_id)
         
-        if not selected_talent and catalog_data.get("talents"):
+        if not selected_talent and snapshot.talents:
             # Default to first talent if none selected
-            selected_talent = catalog_data["talents"][0]
+            selected_talent = snapshot.talents[0]
         
         if not selected_talent:
             # Return placeholder if no talent found
-            return self._create_placeholder_output()
+            return self._create_placeholder_output(decode_options)
         
         # Load image
-        image_tensor = self._load_talent_image(selected_talent, os.path.dirname(full_catalog_path))
-        
-        # Generate description
-        if not selected_talent.get("description"):
-            selected_talent["description"] = self.catalog_manager.generate_description(selected_talent)
+        image_tensor = self._load_talent_image(selected_talent, os.path.dirname(full_catalog_path), decode_options)
         
         # Extract description
-        description = selected_talent.get("description", "No description available")
+        description = self._talent_description(selected_talent)
         
         # Format metadata for display
-        metadata_lines = []
-        metadata_lines.append(f"Name: {selected_talent.get('name', 'Unknown')}")
-        metadata_lines.append(f"ID: {selected_talent.get('id', 'N/A')}")
-        if selected_talent.get('gender'):
-            metadata_lines.append(f"Gender: {selected_talent['gender']}")
-        if selected_talent.get('age_group'):
-            metadata_lines.append(f"Age Group: {selected_talent['age_group']}")
-        if selected_talent.get('ethnicity'):
-            metadata_lines.append(f"Ethnicity: {selected_talent['ethnicity']}")
-        if selected_talent.get('tags'):
-            metadata_lines.append(f"Tags: {', '.join(selected_talent['tags'])}")
-        if selected_talent.get('is_favorite'):
-            metadata_lines.append(f"Favorite: {selected_talent['is_favorite']}")
-        
-        metadata_text = "\n".join(metadata_lines)
+        metadata_text = self._format_metadata(selected_talent)
         
         self.last_selected_talent = selected_talent
         
         return (image_tensor, description, metadata_text)
     
-    def _scan_folder_and_generate_catalog(self, images_folder: str, catalog_path: str) -> Dict[str, Any]:
-        """Scan images folder and generate automatic catalog"""
-        catalog_data = {
-            "version": "1.0",
-            "description": "Auto-generated Morpheus Model Management Catalog",
-            "talents": []
-        }
+    def _talent_description(self, talent: Dict[str, Any]) -> str:
+        """Talent description, generated from metadata when the catalog has none"""
+        # Generated text is not written back so the record (and its revision) stays as loaded
+        return talent.get("description") or self.catalog_manager.generate_description(talent) or "No description available"
+    
+    def _format_metadata(self, talent: Dict[str, Any]) -> str:
+        """Format talent metadata for display"""
+        metadata_lines = []
+        metadata_lines.append(f"Name: {talent.get('name', 'Unknown')}")
+        metadata_lines.append(f"ID: {talent.get('id', 'N/A')}")
+        if talent.get('gender'):
+            metadata_lines.append(f"Gender: {talent['gender']}")
+        if talent.get('age_group'):
+            metadata_lines.append(f"Age Group: {talent['age_group']}")
+        if talent.get('ethnicity'):
+            metadata_lines.append(f"Ethnicity: {talent['ethnicity']}")
+        if talent.get('tags'):
+            metadata_lines.append(f"Tags: {', '.join(talent['tags'])}")
+        if favorites.contains(talent.get('id', '')):
+            metadata_lines.append("Favorite: True")
         
-        if not os.path.exists(images_folder):
-            os.makedirs(images_folder, exist_ok=True)
-            return catalog_data
+        return "\n".join(metadata_lines)
+    
+    @staticmethod
+    def _select_batch_talents(snapshot: CatalogSnapshot, talent_ids: str,
+                              filter_spec: str, max_batch: int) -> List[Dict[str, Any]]:
+        """Talents for batch mode: explicit ids in the given order, else the filter matches
         
-        supported_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp'}
+        With neither ids nor a filter spec every talent matches, so the batch is
+        the first max_batch talents in catalog order.
+        """
+        ids = parse_talent_ids(talent_ids or "")
+        if ids:
+            selected = [snapshot.by_id[talent_id] for talent_id in ids if talent_id in snapshot.by_id]
+        else:
+            selected = snapshot.filter(parse_filter_spec(filter_spec))
+        return selected[:max(1, int(max_batch))]
+    
+    def _select_iteration(self, snapshot: CatalogSnapshot, filter_spec: str, index: int, prefetch: int,
+                          base_path: str, decode_options: Dict[str, Any]) -> Tuple[torch.Tensor, str, str]:
+        """Iterate mode: return the index-th filter match and prefetch the ones after it"""
+        matches = talent_iterator_cache.get_matches(snapshot, filter_spec)
+        if not matches:
+            return self._create_placeholder_output(decode_options)
         
-        for filename in os.listdir(images_folder):
-            name, ext = os.path.splitext(filename)
-            if ext.lower() in supported_extensions:
-                talent_id = f"talent_{name.lower().replace(' ', '_').replace('-', '_')}"
-                
-                talent_entry = {
-                    "id": talent_id,
-                    "name": name.replace('_', ' ').replace('-', ' ').title(),
-                    "image_path": f"images/{filename}",
-                    "description": f"Auto-generated entry for {name}",
-                    "tags": ["auto_generated"],
-                    "copyright": "Unknown"
-                }
-                
-                catalog_data["talents"].append(talent_entry)
+        position = int(index) % len(matches)
+        talent = matches[position]
+        image_tensor = self._load_talent_image(talent, base_path, decode_options)
         
-        # Save auto-generated catalog
-        try:
-            if self.catalog_manager:
-                self.catalog_manager.save_catalog(catalog_data)
-        except Exception as e:
-            print(f"Could not save auto-generated catalog: {e}")
+        upcoming = [matches[(position + offset) % len(matches)] for offset in range(1, min(int(prefetch), len(matches) - 1) + 1)]
+        for upcoming_talent in upcoming:
+            self._prefetch_talent_image(upcoming_talent, base_path, decode_options)
         
-        return catalog_data
+        metadata_text = self._format_metadata(talent) + f"\nIteration: {position + 1}/{len(matches)}"
+        self.last_selected_talent = talent
+        return (image_tensor, self._talent_description(talent), metadata_text)
     
-    def _thumbnails_exist(self, base_path: str) -> bool:
-        """Check if thumbnail directory exists with some thumbnails"""
-        thumb_dir = os.path.join(base_path, ".thumbnails")
-        if not os.path.exists(thumb_dir):
-            return False
-        return len(os.listdir(thumb_dir)) > 0
+    def _prefetch_talent_image(self, talent: Dict[str, Any], base_path: str, decode_options: Dict[str, Any]):
+        """Download and decode a talent image into the tensor LRU on a background thread"""
+        key = (talent.get('id', ''), tuple(sorted(decode_options.items())))
+        with _prefetch_lock:
+            if key in _prefetch_pending:
+                return
+            _prefetch_pending.add(key)
+        
+        def task():
+            try:
+                image_path = self._resolve_talent_image_path(talent, base_path)
+                if image_path:
+                    load_image_as_tensor(image_path, **decode_options)
+            except Exception as e:
+                print(f"Morpheus: Prefetch failed for {talent.get('id')}: {e}")
+            finally:
+                with _prefetch_lock:
+                    _prefetch_pending.discard(key)
+        
+        _prefetch_executor.submit(task)
     
-    def _generate_thumbnails(self, catalog_data: Dict[str, Any], base_path: str, size: int):
-        """Generate thumbnail images for all talents"""
-        thumb_dir = os.path.join(base_path, ".thumbnails")
-        os.makedirs(thumb_dir, exist_ok=True)
+    def _load_talent_batch(self, talents: List[Dict[str, Any]], base_path: str,
+                           decode_options: Dict[str, Any]) -> torch.Tensor:
+        """Decode talents in parallel into one letterboxed [N, H, W, C] batch
         
-        for talent in catalog_data.get("talents", []):
-            image_path = os.path.join(base_path, talent["image_path"])
-            thumb_path = os.path.join(thumb_dir, f"{talent['id']}_thumb.jpg")
-            
-            if os.path.exists(image_path) and not os.path.exists(thumb_path):
+        Output sizes are probed from file headers first so the batch tensor can be
+        allocated once; worker threads then decode each image directly into its
+        centered slot (PIL releases the GIL while decoding).
+        """
+        from concurrent.futures import as_completed
+        
+        interrupt_check = self._download_progress_callback(show_progress=False)
+        
+        def prepare(talent):
+            image_path = self._resolve_talent_image_path(talent, base_path, interrupt_check)
+            if not image_path:
+                return None, None
+            try:
+                return image_path, probe_output_size(image_path, **decode_options)
+            except Exception as e:
+                print(f"Error reading image {image_path}: {e}")
+                return None, None
+        
+        with ThreadPoolExecutor(max_workers=BATCH_DECODE_WORKERS) as executor:
+            prepared = list(executor.map(prepare, talents))
+            
+            sizes = [size for _, size in prepared if size]
+            fallback = decode_options.get("long_edge") or 512
+            height = max((h for h, _ in sizes), default=fallback)
+            width = max((w for _, w in sizes), default=fallback)
+            dtype = OUTPUT_DTYPES.get(decode_options.get("output_dtype", "float32"), torch.float32)
+            batch = torch.zeros((len(talents), height, width, 3), dtype=dtype)
+            
+            def fill(index):
+                image_path, size = prepared[index]
+                if not image_path:
+                    batch[index].fill_(0.5)
+                    return
+                h, w = size
+                top, left = (height - h) // 2, (width - w) // 2
                 try:
-                    with Image.open(image_path) as img:
-                        # Convert to RGB if necessary
-                        if img.mode in ('RGBA', 'LA', 'P'):
-                            img = img.convert('RGB')
-                        
-                        # Create thumbnail
-                        img.thumbnail((size, size), Image.Resampling.LANCZOS)
-                        img.save(thumb_path, "JPEG", quality=85)
-                        
+                    decode_image_into(batch[index, top:top + h, left:left + w], image_path, **decode_options)
                 except Exception as e:
-                    print(f"Could not generate thumbnail for {talent['id']}: {e}")
+                    print(f"Error loading image {image_path}: {e}")
+                    batch[index].fill_(0.5)
+            
+            progress_bar = comfy.utils.ProgressBar(len(talents)) if COMFY_EXECUTION_AVAILABLE else None
+            for future in as_completed([executor.submit(fill, i) for i in range(len(talents))]):
+                future.result()
+                if progress_bar:
+                    progress_bar.update(1)
+        
+        return batch
     
-    def _load_talent_image(self, talent: Dict[str, Any], base_path: str) -> torch.Tensor:
-        """Load talent image and convert to tensor - supports both local and remote cached images"""
+    def _resolve_talent_image_path(self, talent: Dict[str, Any], base_path: str,
+                                   progress_callback=None) -> Optional[str]:
+        """Local path of a talent image, downloading remote images into the cache first"""
         talent_id = talent.get('id', '')
         talent_image_path = talent.get("image_path", "")
         
         # First check if image is in remote cache
         if talent_id:
-            cached_tensor = load_cached_image_as_tensor(talent_id)
-            if cached_tensor is not None:
-                return cached_tensor
+            cache_path = get_cached_image_path(talent_id)
+            if os.path.exists(cache_path):
+                return cache_path
         
         # Check for remote URL in image_path
         if talent_image_path.startswith('http'):
-            # Try to download and cache synchronously
-            cache_path = get_cached_image_path(talent_id)
-            if not os.path.exists(cache_path):
-                try:
-                    with urllib.request.urlopen(talent_image_path, timeout=30) as response:
-                        content = response.read()
-                        ensure_cache_dir()
-                        with open(cache_path, 'wb') as f:
-                            f.write(content)
-                        print(f"Morpheus: Downloaded and cached image for {talent_id}")
-                except Exception as e:
-                    print(f"Morpheus: Failed to download remote image for {talent_id}: {e}")
-            
-            # Try to load from cache
-            cached_tensor = load_cached_image_as_tensor(talent_id)
-            if cached_tensor is not None:
-                return cached_tensor
+            # Stream to the cache, reporting progress and honoring interrupts
+            result = stream_remote_image(talent_id, talent_image_path, progress_callback=progress_callback)
+            if result['status'] == 'downloaded':
+                print(f"Morpheus: Downloaded and cached image for {talent_id}")
+                return result['path']
+            print(f"Morpheus: Failed to download remote image for {talent_id}: {result.get('error')}")
+            return None
         
         # Fall back to local file path
         image_path = os.path.join(base_path, talent_image_path)
+        return image_path if os.path.exists(image_path) else None
+    
+    def _load_talent_image(self, talent: Dict[str, Any], base_path: str,
+                           decode_options: Optional[Dict[str, Any]] = None) -> torch.Tensor:
+        """Load talent image and convert to tensor - supports both local and remote cached images"""
+        decode_options = decode_options or {}
+        image_path = self._resolve_talent_image_path(talent, base_path, self._download_progress_callback())
         
-        if not os.path.exists(image_path):
-            return self._create_placeholder_image()
+        if not image_path:
+            return self._create_placeholder_image(decode_options)
         
         try:
-            with Image.open(image_path) as img:
-                # Convert to RGB
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # Convert to numpy array
-                img_array = np.array(img).astype(np.float32) / 255.0
-                
-                # Convert to tensor with batch dimension [1, H, W, C]
-                img_tensor = torch.from_numpy(img_array).unsqueeze(0)
-                
-                return img_tensor
+            img_tensor = load_image_as_tensor(image_path, **decode_options)
+            if img_tensor is None:
+                return self._create_placeholder_image(decode_options)
+            return img_tensor
                 
         except Exception as e:
             print(f"Error loading image {image_path}: {e}")
-            return self._create_placeholder_image()
+            return self._create_placeholder_image(decode_options)
     
-    def _create_placeholder_image(self) -> torch.Tensor:
+    def _download_progress_callback(self, show_progress: bool = True):
+        """Build a stream_remote_image callback that drives ComfyUI's progress bar
+        
+        Raises ComfyUI's interrupt exception when the prompt is cancelled; the partial
+        download is kept and resumed by the next execution.
+        """
+        if not COMFY_EXECUTION_AVAILABLE:
+            return None
+        
+        progress = {"bar": None}
+        
+        def callback(done: int, total: int):
+            comfy.model_management.throw_exception_if_processing_interrupted()
+            if not total or not show_progress:
+                return
+            if progress["bar"] is None:
+                progress["bar"] = comfy.utils.ProgressBar(max(1, total // 1024))
+            progress["bar"].update_absolute(done // 1024)
+        
+        return callback
+    
+    def _create_placeholder_image(self, decode_options: Optional[Dict[str, Any]] = None) -> torch.Tensor:
         """Create a placeholder image tensor"""
-        # Create a 512x512 gray placeholder
-        placeholder = np.full((512, 512, 3), 0.5, dtype=np.float32)
-        return torch.from_numpy(placeholder).unsqueeze(0)
+        decode_options = decode_options or {}
+        # Create a gray square placeholder (512x512 unless a long edge was requested)
+        size = decode_options.get("long_edge") or 512
+        dtype = OUTPUT_DTYPES.get(decode_options.get("output_dtype", "float32"), torch.float32)
+        return torch.full((1, size, size, 3), 0.5, dtype=dtype)
     
-    def _create_placeholder_output(self) -> Tuple[torch.Tensor, str, str]:
+    def _create_placeholder_output(self, decode_options: Optional[Dict[str, Any]] = None) -> Tuple[torch.Tensor, str, str]:
         """Create placeholder output when no talent is selected"""
-        image_tensor = self._create_placeholder_image()
+        image_tensor = self._create_placeholder_image(decode_options)
         description = "No talent selected"
         metadata = "No metadata available"
         return (image_tensor, description, metadata)
     
     @classmethod
-    def IS_CHANGED(cls, **kwargs):
-        """Return hash for caching - node should re-execute when inputs change"""
-        # Create hash from relevant inputs
-        relevant_inputs = [
-            kwargs.get("selected_talent_id", ""),
-            kwargs.get("refresh_thumbnails", False)
-        ]
-        return hash(str(relevant_inputs))
+    def IS_CHANGED(cls, selected_talent_id: str = "", mode: str = "single", talent_ids: str = "",
+                   filter_spec: str = "", max_batch: int = 16, index: int = 0, **kwargs):
+        """Fingerprint of the catalog data behind the output (inputs are compared by ComfyUI)
+        
+        Combines the catalog snapshot version with the record revision, favorite
+        flag and image (content hash for local files, URL for remote ones) of
+        every talent the execution would select, so cached output is reused
+        exactly as long as none of them changed.
+        """
+        # The snapshot the last execution used; refreshing it could block on the network
+        snapshot = _remote_snapshot
+        if not (snapshot and snapshot.talents):
+            # Stat-validated: only re-parsed when catalog.json changed on disk
+            snapshot = get_local_catalog_snapshot()
+        
+        if mode == "batch":
+            talents = cls._select_batch_talents(snapshot, talent_ids, filter_spec, max_batch)
+        elif mode == "iterate":
+            matches = talent_iterator_cache.get_matches(snapshot, filter_spec)
+            talents = [matches[int(index) % len(matches)]] if matches else []
+        else:
+            talent = snapshot.get(selected_talent_id) if selected_talent_id else None
+            talents = [talent or snapshot.talents[0]] if snapshot.talents else []
+        
+        base_path = os.path.dirname(LOCAL_CATALOG_PATH)
+        parts = [snapshot.source, snapshot.version]
+        for talent in talents:
+            talent_id = talent.get("id", "")
+            image_path = talent.get("image_path", "")
+            if image_path.startswith('http'):
+                # Remote images are identified by URL whether or not they are cached yet,
+                # so a download alone does not change the fingerprint
+                image_key = image_path
+            else:
+                image_path = os.path.join(base_path, image_path)
+                image_key = get_file_content_hash(image_path) or image_path
+            parts.extend([talent_id, snapshot.talent_revision(talent_id), favorites.contains(talent_id), image_key])
+        
+        return hashlib.sha1(json.dumps(parts, default=str).encode('utf-8')).hexdigest()
 
 NODE_CLASS_MAPPINGS = {
     "MorpheusModelManagement": MorpheusModelManagement
@@ -0,0 +1,213 @@
+"""
+Morpheus Model Management - Write-behind persistence
+Atomic JSON writes, a debounced flusher that coalesces bursts of mutations
+and an append-only mutation journal
+"""
+
+import os
+import json
+import time
+import atexit
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Optional
+
+def atomic_write_json(path: str, data: Any, indent: Optional[int] = 2):
+    """Write JSON to a temp file next to `path`, fsync it and swap it into place"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Per process and thread: two writers of the same file must not share a temp file
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+class DebouncedFlusher:
+    """Runs `write_fn` on a background thread once mutations stop arriving
+
+    `mark_dirty()` is cheap and can be called for every mutation. The write
+    happens `delay` seconds after the last one, but never later than
+    `max_delay` seconds after the first unflushed one, so a steady stream of
+    mutations still reaches disk. `flush()` writes synchronously, and every
+    flusher with pending changes is flushed when the interpreter exits.
+    """
+
+    def __init__(self, write_fn: Callable[[], None], delay: float = 1.0, max_delay: float = 5.0,
+                 name: str = "morpheus-flush"):
+        self.write_fn = write_fn
+        self.delay = max(0.0, float(delay))
+        self.max_delay = max(self.delay, float(max_delay))
+        self.name = name
+        self.condition = threading.Condition()
+        self.write_lock = threading.Lock()
+        self.first_dirty_at = None
+        self.last_dirty_at = None
+        self.thread = None
+        self.flush_count = 0
+        _flushers.add(self)
+
+    @property
+    def pending(self) -> bool:
+        return self.first_dirty_at is not None
+
+    def mark_dirty(self):
+        """Record a mutation and schedule a write"""
+        with self.condition:
+            now = time.monotonic()
+            if self.first_dirty_at is None:
+                self.first_dirty_at = now
+            self.last_dirty_at = now
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.first_dirty_at is None:
+                    # Idle threads exit, mark_dirty starts a new one
+                    if not self.condition.wait(timeout=60):
+                        if self.first_dirty_at is None:
+                            self.thread = None
+                            return
+                deadline = min(self.last_dirty_at + self.delay, self.first_dirty_at + self.max_delay)
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self.condition.wait(timeout=remaining)
+                    continue
+            self.flush()
+
+    def flush(self) -> bool:
+        """Write pending changes now, returns False if the write failed"""
+        with self.write_lock:
+            with self.condition:
+                if self.first_dirty_at is None:
+                    return True
+                self.first_dirty_at = None
+                self.last_dirty_at = None
+            try:
+                self.write_fn()
+                self.flush_count += 1
+                return True
+            except Exception as e:
+                print(f"Morpheus: Write-behind flush failed ({self.name}): {e}")
+                with self.condition:
+                    # Keep the changes pending and retry after another delay
+                    if self.first_dirty_at is None:
+                        self.first_dirty_at = self.last_dirty_at = time.monotonic()
+                return False
+
+    def discard(self):
+        """Drop pending changes (the caller wrote them some other way)"""
+        with self.condition:
+            self.first_dirty_at = None
+            self.last_dirty_at = None
+
+_flushers = weakref.WeakSet()
+
+def flush_all():
+    """Flush every flusher with pending changes (registered with atexit)"""
+    for flusher in list(_flushers):
+        if flusher.pending:
+            flusher.flush()
+
+atexit.register(flush_all)
+
+class MutationJournal:
+    """Append-only JSON lines log, each entry synced to disk before append() returns
+
+    The first line is a header recording `base`, the signature of the snapshot
+    the entries apply on top of, so a journal is never replayed over a file
+    that was replaced in the meantime. A torn final line (crash mid-append) is
+    dropped and truncated away on the next read, so replay always sees a clean
+    prefix of the acknowledged entries.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+        self.base: Optional[List[Any]] = None
+        try:
+            self.size = os.path.getsize(path)
+        except OSError:
+            self.size = 0
+
+    @staticmethod
+    def _encode(data: Dict[str, Any]) -> bytes:
+        return (json.dumps(data, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+
+    def append(self, entry: Dict[str, Any]):
+        line = self._encode(entry)
+        with self.lock:
+            if self.file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self.file = open(self.path, 'ab')
+            if self.size == 0:
+                line = self._encode({"journal": 1, "base": self.base}) + line
+            self.file.write(line)
+            self.file.flush()
+            # fdatasync skips the metadata flush where the platform offers it
+            getattr(os, "fdatasync", os.fsync)(self.file.fileno())
+            self.size += len(line)
+
+    def read(self) -> List[Dict[str, Any]]:
+        """Entries in append order, `base` is set from the header (None for headerless journals)"""
+        entries = []
+        with self.lock:
+            if not os.path.exists(self.path):
+                return entries
+            valid_bytes = 0
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    valid_bytes += len(line)
+                    if valid_bytes == len(line) and "journal" in entry:
+                        self.base = entry.get("base")
+                    else:
+                        entries.append(entry)
+            if valid_bytes != os.path.getsize(self.path):
+                print(f"Morpheus: Dropping torn tail of {os.path.basename(self.path)} after {len(entries)} entries")
+                self._close()
+                with open(self.path, 'r+b') as f:
+                    f.truncate(valid_bytes)
+            self.size = valid_bytes
+        return entries
+
+    def reset(self, base: Optional[List[Any]] = None):
+        """Discard every entry (after they were folded into the snapshot identified by `base`)"""
+        with self.lock:
+            self._close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.size = 0
+            self.base = list(base) if base is not None else None
+
+    def set_aside(self) -> str:
+        """Move the journal out of the way without applying it, returns where it went"""
+        with self.lock:
+            self._close()
+            target = f"{self.path}.conflict-{time.strftime('%Y%m%d-%H%M%S')}"
+            os.replace(self.path, target)
+            self.size = 0
+            return target
+
+    def close(self):
+        with self.lock:
+            self._close()
+
+    def _close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
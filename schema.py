@@ -4,7 +4,17 @@ Schema definitions for the Morpheus Model Management catalog
 
 import json
 import os
-from typing import Dict, List, Any, Optional
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from .config import (
+    CATALOG_FLUSH_DELAY_SECONDS, CATALOG_FLUSH_MAX_DELAY_SECONDS, CATALOG_BACKEND,
+    CATALOG_JOURNAL_ENABLED, CATALOG_JOURNAL_COMPACT_BYTES, CATALOG_MANAGER_LIMIT
+)
+from .persistence import DebouncedFlusher, MutationJournal, atomic_write_json
 
 # Schema for talent entry in catalog.json
 TALENT_SCHEMA = {
@@ -31,35 +41,317 @@ TALENT_SCHEMA = {
     }
 }
 
+def validate_talent(talent: Dict[str, Any]) -> List[str]:
+    """Check a talent record against TALENT_SCHEMA, returns a list of problems
+    
+    Empty strings count as absent for optional attributes, matching how the
+    upload form submits unset fields.
+    """
+    errors = []
+    properties = TALENT_SCHEMA["properties"]
+    for field in TALENT_SCHEMA["required"]:
+        if talent.get(field) in (None, ""):
+            errors.append(f"{field} is required")
+    
+    python_types = {"string": str, "boolean": bool, "array": list}
+    for field, value in talent.items():
+        spec = properties.get(field)
+        if spec is None or value is None or (value == "" and field not in TALENT_SCHEMA["required"]):
+            continue
+        if not isinstance(value, python_types[spec["type"]]):
+            errors.append(f"{field} must be a {spec['type']}")
+            continue
+        if "enum" in spec and value not in spec["enum"]:
+            errors.append(f"{field} must be one of: {', '.join(spec['enum'])}")
+        if isinstance(value, str):
+            if "pattern" in spec and not re.match(spec["pattern"], value):
+                errors.append(f"{field} has an invalid format")
+            if len(value) < spec.get("minLength", 0):
+                errors.append(f"{field} must not be empty")
+        if spec["type"] == "array" and not all(isinstance(item, str) for item in value):
+            errors.append(f"{field} must contain strings")
+    return errors
+
 class CatalogManager:
-    """Manager for handling catalog operations"""
+    """Manager for handling catalog operations
+    
+    Managers obtained through get_catalog_manager() are shared process-wide and
+    keep the parsed catalog in memory; load_catalog() only re-parses the file
+    when its (mtime_ns, size) signature changes.
+    
+    Mutations are appended to a journal next to the catalog (one synced JSON
+    line each), so they are durable at once, and a debounced background flush
+    folds them into a new catalog.json, keeping the file current for external
+    readers. The journal records the signature of the catalog.json it builds
+    on and is only replayed over that file; when catalog.json was replaced by
+    someone else, the unfolded edits are moved to a `.conflict-*` file and
+    reported instead of being applied over (or silently dropped for) the new
+    content.
+    """
     
     def __init__(self, catalog_path: str):
         self.catalog_path = catalog_path
         self.catalog_data = None
+        # id -> talent record and id -> position in catalog_data["talents"]
+        self.talent_index: Dict[str, Dict[str, Any]] = {}
+        self.position_index: Dict[str, int] = {}
+        # Bumped whenever catalog_data changes, in memory or on disk
+        self.version = 0
+        self.file_signature: Optional[Tuple[int, int, int]] = None
+        self.lock = threading.RLock()
+        self.flusher = DebouncedFlusher(self._write_catalog, CATALOG_FLUSH_DELAY_SECONDS,
+                                        CATALOG_FLUSH_MAX_DELAY_SECONDS, name="morpheus-catalog-flush")
+        self.journal = MutationJournal(catalog_path + ".journal") if CATALOG_JOURNAL_ENABLED else None
+        self._revision = 0
+        # Set while a file watcher calls invalidate() on external edits, loads then skip the stat
+        self.watched = False
+        self.stale = True
+    
+    def _stat_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.catalog_path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
         
     def load_catalog(self) -> Dict[str, Any]:
-        """Load catalog from JSON file"""
-        if os.path.exists(self.catalog_path):
-            try:
-                with open(self.catalog_path, 'r', encoding='utf-8') as f:
-                    self.catalog_data = json.load(f)
+        """Load catalog from JSON file (cached until the file changes)"""
+        with self.lock:
+            if self.catalog_data is not None and self.watched and not self.stale:
                 return self.catalog_data
-            except (json.JSONDecodeError, IOError) as e:
-                print(f"Error loading catalog: {e}")
-                return {"talents": []}
-        return {"talents": []}
+            self.stale = False
+            signature = self._stat_signature()
+            if self.catalog_data is not None and signature == self.file_signature:
+                return self.catalog_data
+            if self.catalog_data is not None and self.journal is None and self.flusher.pending:
+                # Unflushed in-memory changes win over the file until they are written
+                return self.catalog_data
+            
+            # A re-parse after the first load means someone else rewrote the file
+            external = self.catalog_data is not None
+            self.file_signature = signature
+            self.version += 1
+            self.catalog_data = None
+            if signature is not None:
+                try:
+                    with open(self.catalog_path, 'r', encoding='utf-8') as f:
+                        self.catalog_data = json.load(f)
+                except (json.JSONDecodeError, IOError) as e:
+                    print(f"Error loading catalog: {e}")
+            if self.catalog_data is None:
+                self.catalog_data = {"talents": []}
+            self._rebuild_index()
+            
+            if self.journal is not None:
+                self._replay_journal(signature)
+            self._sync_revision(external)
+            catalog_data = self.catalog_data
+        if external:
+            _notify_external_change(self)
+        return catalog_data
+    
+    def _sync_revision(self, external: bool):
+        """Adopt the loaded revision without ever going back
+        
+        An external rewrite always moves the revision forward, so a client
+        holding an older revision (even one equal to the file's) is refused.
+        """
+        file_revision = int(self.catalog_data.get("revision", 0) or 0)
+        self._revision = max(self._revision + 1 if external else self._revision, file_revision)
+        self.catalog_data["revision"] = self._revision
+    
+    def _replay_journal(self, signature: Optional[Tuple[int, int, int]]):
+        """Apply the journal if it builds on the file just parsed, set it aside otherwise"""
+        entries = self.journal.read()
+        base = self.journal.base
+        if not entries:
+            self.journal.reset(signature)
+            return
+        # Headerless journals predate base signatures and are trusted as before
+        if base is not None and base != (list(signature) if signature is not None else None):
+            # Replaying over a replaced file could resurrect what it removed
+            conflict_path = self.journal.set_aside()
+            self.journal.reset(signature)
+            print(f"Morpheus: WARNING - {os.path.basename(self.catalog_path)} was changed outside Morpheus; "
+                  f"{len(entries)} catalog edits made since its last save were not applied and are kept in {conflict_path}")
+            return
+        for entry in entries:
+            self._apply(entry)
+        print(f"Morpheus: Replayed {len(entries)} catalog journal entries")
+        # Fold them into catalog.json soon, the next load must not depend on the journal
+        self.flusher.mark_dirty()
+    
+    def invalidate(self):
+        """The file may have changed on disk, the next load_catalog checks it again"""
+        self.stale = True
+    
+    def _rebuild_index(self):
+        """Rebuild the id indexes from catalog_data"""
+        talents = self.catalog_data.setdefault("talents", []) if self.catalog_data is not None else []
+        self.talent_index = {t.get("id"): t for t in talents}
+        self.position_index = {t.get("id"): i for i, t in enumerate(talents)}
+    
+    def get_talent(self, talent_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a talent record by id"""
+        return self.talent_index.get(talent_id)
+    
+    def _apply(self, entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Apply one mutation to the in-memory catalog (shared by live edits and replay)"""
+        op = entry.get("op")
+        talents = self.catalog_data["talents"]
+        result = None
+        if op in ("add", "add_many"):
+            for talent in ([entry["talent"]] if op == "add" else entry["talents"]):
+                position = self.position_index.get(talent["id"])
+                if position is None:
+                    self.position_index[talent["id"]] = len(talents)
+                    talents.append(talent)
+                else:
+                    talents[position] = talent
+                self.talent_index[talent["id"]] = talent
+                result = talent
+        elif op == "update":
+            result = self.talent_index.get(entry["id"])
+            if result is not None:
+                result.update(entry["fields"])
+        elif op == "remove":
+            position = self.position_index.pop(entry["id"], None)
+            if position is not None:
+                result = talents.pop(position)
+                del self.talent_index[entry["id"]]
+                for i in range(position, len(talents)):
+                    self.position_index[talents[i].get("id")] = i
+        elif op == "meta":
+            self.catalog_data.update(entry["fields"])
+            if "revision" in entry["fields"]:
+                self._revision = max(self._revision, int(entry["fields"]["revision"]))
+        self.version += 1
+        return result
+    
+    def _record(self, entry: Dict[str, Any]):
+        """Journal a mutation that was just applied"""
+        if self.journal is None:
+            return
+        self.journal.append(entry)
+        if self.journal.size >= CATALOG_JOURNAL_COMPACT_BYTES:
+            self.flusher.mark_dirty()
+    
+    def add_talent(self, talent: Dict[str, Any]):
+        """Append a talent record, keeping the indexes in sync"""
+        with self.lock:
+            if self.catalog_data is None:
+                self.load_catalog()
+            entry = {"op": "add", "talent": talent}
+            self._apply(entry)
+            self._record(entry)
+    
+    def add_talents(self, new_talents: List[Dict[str, Any]]):
+        """Append several talent records as one journaled change"""
+        if not new_talents:
+            return
+        with self.lock:
+            if self.catalog_data is None:
+                self.load_catalog()
+            entry = {"op": "add_many", "talents": new_talents}
+            self._apply(entry)
+            self._record(entry)
+    
+    def update_talent(self, talent_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update fields of a talent record in place, returns the record or None"""
+        with self.lock:
+            if talent_id not in self.talent_index:
+                return None
+            entry = {"op": "update", "id": talent_id, "fields": fields}
+            talent = self._apply(entry)
+            self._record(entry)
+            return talent
+    
+    def remove_talent(self, talent_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a talent record, returns it or None if the id is unknown
+        
+        Catalog order is preserved, so positions after the removed entry shift down.
+        """
+        with self.lock:
+            if talent_id not in self.position_index:
+                return None
+            entry = {"op": "remove", "id": talent_id}
+            talent = self._apply(entry)
+            self._record(entry)
+            return talent
+    
+    @property
+    def revision(self) -> int:
+        """Catalog revision, bumped once per committed edit or picked-up external change
+        
+        Kept in process and never decreasing, so external rewrites of the file
+        cannot bring back a revision a client already saw.
+        """
+        with self.lock:
+            self.load_catalog()
+            return self._revision
+    
+    def commit_revision(self, fields: Optional[Dict[str, Any]] = None) -> int:
+        """Bump the revision (together with optional top-level fields), returns the new one"""
+        with self.lock:
+            revision = self.revision + 1
+            self.update_catalog_fields({**(fields or {}), "revision": revision})
+            return revision
+    
+    def update_catalog_fields(self, fields: Dict[str, Any]):
+        """Set top-level catalog fields such as last_updated"""
+        with self.lock:
+            if self.catalog_data is None:
+                self.load_catalog()
+            entry = {"op": "meta", "fields": fields}
+            self._apply(entry)
+            self._record(entry)
     
     def save_catalog(self, catalog_data: Dict[str, Any]) -> bool:
         """Save catalog to JSON file"""
-        try:
-            os.makedirs(os.path.dirname(self.catalog_path), exist_ok=True)
-            with open(self.catalog_path, 'w', encoding='utf-8') as f:
-                json.dump(catalog_data, f, indent=2, ensure_ascii=False)
-            return True
-        except IOError as e:
-            print(f"Error saving catalog: {e}")
-            return False
+        with self.lock:
+            if catalog_data is not self.catalog_data:
+                self.catalog_data = catalog_data
+                self._rebuild_index()
+            self._sync_revision(external=False)
+            self.version += 1
+            self.flusher.discard()
+            try:
+                atomic_write_json(self.catalog_path, catalog_data)
+                self.file_signature = self._stat_signature()
+                if self.journal is not None:
+                    self.journal.reset(self.file_signature)
+                return True
+            except (IOError, TypeError, ValueError) as e:
+                print(f"Error saving catalog: {e}")
+                return False
+    
+    def schedule_save(self):
+        """Write in-memory changes to catalog.json once mutations pause
+        
+        Journaled mutations are already durable; the debounced write keeps the
+        file itself current for external readers and the journal short.
+        """
+        self.flusher.mark_dirty()
+    
+    def flush(self) -> bool:
+        """Write pending changes now"""
+        return self.flusher.flush()
+    
+    def close(self):
+        """Write pending changes and release the journal (the manager is no longer used)"""
+        self.flush()
+        if self.journal is not None:
+            self.journal.close()
+    
+    def _write_catalog(self):
+        # Snapshot first, then restart the journal on top of it. A crash in between leaves a
+        # journal whose base no longer matches; it is set aside, its entries are in the file
+        with self.lock:
+            if self.catalog_data is not None:
+                atomic_write_json(self.catalog_path, self.catalog_data)
+                self.file_signature = self._stat_signature()
+                if self.journal is not None:
+                    self.journal.reset(self.file_signature)
     
     def generate_description(self, talent: Dict[str, Any]) -> str:
         """Generate description from talent metadata"""
@@ -94,6 +386,10 @@ class CatalogManager:
         else:
             return talent.get('description', f"Talent: {talent.get('name', 'Unknown')}")
     
+    def query_talents(self, filters: Dict[str, Any]) -> List[Dict]:
+        """Filter the whole catalog (backends may answer this from an index)"""
+        return self.filter_talents(self.load_catalog().get("talents", []), filters)
+    
     def filter_talents(self, talents: List[Dict], filters: Dict[str, Any]) -> List[Dict]:
         """Filter talents based on criteria"""
         filtered = talents
@@ -103,6 +399,12 @@ class CatalogManager:
             name_filter = filters['name_filter'].lower()
             filtered = [t for t in filtered if name_filter in t.get('name', '').lower()]
         
+        # Free text search over name and description
+        if filters.get('search'):
+            search = filters['search'].lower()
+            filtered = [t for t in filtered
+                        if search in t.get('name', '').lower() or search in t.get('description', '').lower()]
+        
         # Tag filters
         if filters.get('tag_filter'):
             tag_filters = filters['tag_filter']
@@ -121,12 +423,61 @@ class CatalogManager:
             if filters.get(attr):
                 filtered = [t for t in filtered if t.get(attr) == filters[attr]]
         
-        # Favorites filter
+        # Favorites filter (overlay ids when given, the record flag otherwise)
         if filters.get('favorites_only'):
-            filtered = [t for t in filtered if t.get('is_favorite', False)]
+            favorite_ids = filters.get('favorite_ids')
+            if favorite_ids is not None:
+                filtered = [t for t in filtered if t.get('id') in favorite_ids]
+            else:
+                filtered = [t for t in filtered if t.get('is_favorite', False)]
         
         return filtered
 
+_external_change_listeners: List[Callable[[CatalogManager], None]] = []
+
+def add_external_change_listener(listener: Callable[[CatalogManager], None]):
+    """Call listener(manager) whenever a manager picks up a change made outside this process"""
+    _external_change_listeners.append(listener)
+
+def _notify_external_change(manager: CatalogManager):
+    for listener in list(_external_change_listeners):
+        try:
+            listener(manager)
+        except Exception as e:
+            print(f"Morpheus: Catalog change listener failed: {e}")
+
+# Process-wide registry of catalog managers, keyed by resolved catalog path. The most recently
+# used ones are kept alive, any other manager stays shared for as long as someone still holds it
+_catalog_managers: "OrderedDict[str, CatalogManager]" = OrderedDict()
+_live_catalog_managers: "weakref.WeakValueDictionary[str, CatalogManager]" = weakref.WeakValueDictionary()
+_catalog_managers_lock = threading.Lock()
+
+def get_catalog_manager(catalog_path: str) -> CatalogManager:
+    """Shared CatalogManager for a catalog file, so every caller reuses one parsed copy
+    
+    With MORPHEUS_CATALOG_BACKEND=sqlite the manager is a SQLiteCatalogManager
+    storing the catalog in a database next to the JSON file. Catalog paths come
+    from requests, so only CATALOG_MANAGER_LIMIT managers are kept alive by the
+    registry itself. A manager dropped from it is not closed: callers holding it
+    keep a working manager (and get the same one from here), and its file
+    handles and connection are released once the last of them lets go.
+    """
+    key = os.path.realpath(catalog_path)
+    with _catalog_managers_lock:
+        manager = _catalog_managers.get(key) or _live_catalog_managers.get(key)
+        if manager is None:
+            if CATALOG_BACKEND == "sqlite":
+                from .sqlite_catalog import SQLiteCatalogManager
+                manager = SQLiteCatalogManager(key)
+            else:
+                manager = CatalogManager(key)
+            _live_catalog_managers[key] = manager
+        _catalog_managers[key] = manager
+        _catalog_managers.move_to_end(key)
+        while len(_catalog_managers) > max(1, CATALOG_MANAGER_LIMIT):
+            _catalog_managers.popitem(last=False)
+        return manager
+
 def create_sample_catalog() -> Dict[str, Any]:
     """Create a sample catalog with example talent entries"""
     return {
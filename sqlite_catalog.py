@@ -0,0 +1,331 @@
+"""
+Morpheus Model Management - SQLite catalog backend
+Stores the local catalog in SQLite with indexed attribute columns, a tag join
+table and an FTS5 index on name and description
+
+Enable with MORPHEUS_CATALOG_BACKEND=sqlite; the database lives next to
+catalog.json and is seeded from it on first use. Import/export from the
+ComfyUI custom_nodes directory:
+    python -m comfyui_morpheus_model_management.sqlite_catalog export catalog/catalog.json
+"""
+
+import os
+import json
+import sqlite3
+import argparse
+from typing import Dict, List, Any, Optional
+
+from .schema import TALENT_SCHEMA, CatalogManager, _notify_external_change
+from .persistence import atomic_write_json
+
+# Every scalar TALENT_SCHEMA property gets its own column; tags go to talent_tags
+TALENT_COLUMNS = [name for name, spec in TALENT_SCHEMA["properties"].items()
+                  if name != "id" and spec.get("type") in ("string", "boolean")]
+BOOLEAN_COLUMNS = {name for name in TALENT_COLUMNS if TALENT_SCHEMA["properties"][name]["type"] == "boolean"}
+INDEXED_COLUMNS = [name for name in TALENT_COLUMNS if name not in ("name", "description", "image_path", "download_url", "copyright")]
+
+def get_sqlite_path(catalog_path: str) -> str:
+    return os.path.splitext(catalog_path)[0] + ".sqlite"
+
+def fts5_tokenizer(conn: sqlite3.Connection) -> Optional[str]:
+    """Best available FTS5 tokenizer: trigram gives substring matches like the JSON backend"""
+    for tokenizer in ("trigram", "unicode61"):
+        try:
+            conn.execute(f"CREATE VIRTUAL TABLE temp.fts_probe USING fts5(x, tokenize='{tokenizer}')")
+            conn.execute("DROP TABLE temp.fts_probe")
+            return tokenizer
+        except sqlite3.OperationalError:
+            continue
+    return None
+
+class SQLiteCatalogManager(CatalogManager):
+    """CatalogManager backed by SQLite
+
+    Mutations are committed in a transaction as they happen. `catalog_data`
+    stays available as a materialized view for the node snapshot and for
+    callers written against the JSON backend, and is rebuilt when another
+    connection changes the database.
+    """
+
+    def __init__(self, catalog_path: str, db_path: Optional[str] = None):
+        super().__init__(catalog_path)
+        self.db_path = db_path or get_sqlite_path(catalog_path)
+        # Every mutation is its own transaction, the JSON mutation journal is not needed
+        self.journal = None
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.tokenizer = fts5_tokenizer(self.conn)
+        self.data_version = None
+        self._create_schema()
+
+    def _create_schema(self):
+        columns = ", ".join(f"{name} {'INTEGER' if name in BOOLEAN_COLUMNS else 'TEXT'}" for name in TALENT_COLUMNS)
+        with self.lock:
+            self.conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS talents (
+                    id TEXT PRIMARY KEY, position INTEGER NOT NULL, {columns}, record TEXT NOT NULL);
+                CREATE INDEX IF NOT EXISTS idx_talents_position ON talents(position);
+                CREATE TABLE IF NOT EXISTS talent_tags (
+                    talent_id TEXT NOT NULL REFERENCES talents(id) ON DELETE CASCADE,
+                    tag TEXT NOT NULL, PRIMARY KEY (talent_id, tag));
+                CREATE INDEX IF NOT EXISTS idx_talent_tags_tag ON talent_tags(tag);
+            """)
+            for name in INDEXED_COLUMNS:
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_talents_{name} ON talents({name})")
+            if self.tokenizer:
+                self.conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS talents_fts USING fts5("
+                                  f"id UNINDEXED, name, description, tokenize='{self.tokenizer}')")
+
+    def _transaction(self):
+        return _Transaction(self)
+
+    def _write_row(self, talent: Dict[str, Any], position: int):
+        talent_id = talent["id"]
+        values = [talent.get(name) for name in TALENT_COLUMNS]
+        values = [int(bool(v)) if name in BOOLEAN_COLUMNS and v is not None else v
+                  for name, v in zip(TALENT_COLUMNS, values)]
+        placeholders = ", ".join("?" for _ in range(len(TALENT_COLUMNS) + 3))
+        self.conn.execute(f"INSERT OR REPLACE INTO talents (id, position, {', '.join(TALENT_COLUMNS)}, record) "
+                          f"VALUES ({placeholders})",
+                          [talent_id, position, *values, json.dumps(talent, ensure_ascii=False)])
+        self.conn.execute("DELETE FROM talent_tags WHERE talent_id = ?", (talent_id,))
+        self.conn.executemany("INSERT OR IGNORE INTO talent_tags (talent_id, tag) VALUES (?, ?)",
+                              [(talent_id, tag) for tag in talent.get("tags", []) or []])
+        if self.tokenizer:
+            self.conn.execute("DELETE FROM talents_fts WHERE id = ?", (talent_id,))
+            self.conn.execute("INSERT INTO talents_fts (id, name, description) VALUES (?, ?, ?)",
+                              (talent_id, talent.get("name", ""), talent.get("description", "")))
+
+    def _write_meta(self, catalog_data: Dict[str, Any]):
+        self.conn.execute("DELETE FROM catalog_meta")
+        self.conn.executemany("INSERT INTO catalog_meta (key, value) VALUES (?, ?)",
+                              [(k, json.dumps(v, ensure_ascii=False)) for k, v in catalog_data.items() if k != "talents"])
+
+    def _current_data_version(self) -> int:
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def load_catalog(self) -> Dict[str, Any]:
+        """Materialize the catalog, seeding the database from catalog.json when it is empty"""
+        with self.lock:
+            data_version = self._current_data_version()
+            if self.catalog_data is not None and data_version == self.data_version:
+                return self.catalog_data
+
+            if self.conn.execute("SELECT COUNT(*) FROM talents").fetchone()[0] == 0 \
+                    and self.conn.execute("SELECT COUNT(*) FROM catalog_meta").fetchone()[0] == 0 \
+                    and os.path.exists(self.catalog_path):
+                self.import_json(self.catalog_path)
+                return self.catalog_data
+
+            # Another connection committed since our last load
+            external = self.catalog_data is not None
+            catalog_data = {row["key"]: json.loads(row["value"])
+                            for row in self.conn.execute("SELECT key, value FROM catalog_meta")}
+            catalog_data["talents"] = [json.loads(row["record"]) for row in
+                                       self.conn.execute("SELECT record FROM talents ORDER BY position")]
+            self.catalog_data = catalog_data
+            self._rebuild_index()
+            self._sync_revision(external)
+            self.data_version = data_version
+            self.version += 1
+        if external:
+            _notify_external_change(self)
+        return catalog_data
+
+    def add_talent(self, talent: Dict[str, Any]):
+        with self.lock:
+            if self.catalog_data is None:
+                self.load_catalog()
+            existing = self.position_index.get(talent["id"])
+            with self._transaction():
+                self._write_row(talent, existing if existing is not None else len(self.catalog_data["talents"]))
+            super().add_talent(talent)
+
+    def add_talents(self, new_talents: List[Dict[str, Any]]):
+        with self.lock:
+            if self.catalog_data is None:
+                self.load_catalog()
+            with self._transaction():
+                position = len(self.catalog_data["talents"])
+                for talent in new_talents:
+                    existing = self.position_index.get(talent["id"])
+                    self._write_row(talent, existing if existing is not None else position)
+                    if existing is None:
+                        position += 1
+            super().add_talents(new_talents)
+
+    def update_catalog_fields(self, fields: Dict[str, Any]):
+        # Committed at once like the rows, so a crash cannot leave new rows with the old revision
+        with self.lock:
+            super().update_catalog_fields(fields)
+            with self._transaction():
+                self.conn.executemany("INSERT OR REPLACE INTO catalog_meta (key, value) VALUES (?, ?)",
+                                      [(k, json.dumps(v, ensure_ascii=False)) for k, v in fields.items() if k != "talents"])
+
+    def update_talent(self, talent_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            talent = super().update_talent(talent_id, fields)
+            if talent is not None:
+                with self._transaction():
+                    self._write_row(talent, self.position_index[talent_id])
+            return talent
+
+    def remove_talent(self, talent_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            position = self.position_index.get(talent_id)
+            if position is None:
+                return None
+            with self._transaction():
+                self.conn.execute("DELETE FROM talents WHERE id = ?", (talent_id,))
+                self.conn.execute("UPDATE talents SET position = position - 1 WHERE position > ?", (position,))
+                if self.tokenizer:
+                    self.conn.execute("DELETE FROM talents_fts WHERE id = ?", (talent_id,))
+            return super().remove_talent(talent_id)
+
+    def save_catalog(self, catalog_data: Dict[str, Any]) -> bool:
+        """Replace the whole catalog in one transaction"""
+        with self.lock:
+            self._revision = max(self._revision, int(catalog_data.get("revision", 0) or 0))
+            catalog_data["revision"] = self._revision
+            try:
+                with self._transaction():
+                    self.conn.execute("DELETE FROM talents")
+                    if self.tokenizer:
+                        self.conn.execute("DELETE FROM talents_fts")
+                    self._write_meta(catalog_data)
+                    for position, talent in enumerate(catalog_data.get("talents", [])):
+                        self._write_row(talent, position)
+            except sqlite3.Error as e:
+                print(f"Error saving catalog: {e}")
+                return False
+            self.catalog_data = catalog_data
+            self._rebuild_index()
+            self.flusher.discard()
+            self.data_version = self._current_data_version()
+            self.version += 1
+            return True
+
+    def close(self):
+        """Flush, then close the database connection"""
+        with self.lock:
+            super().close()
+            self.conn.close()
+
+    def _write_catalog(self):
+        # Rows and top-level fields are committed by each mutation; this only catches
+        # fields set directly on catalog_data
+        with self.lock:
+            if self.catalog_data is not None:
+                with self._transaction():
+                    self._write_meta(self.catalog_data)
+                self.data_version = self._current_data_version()
+
+    def query_talents(self, filters: Dict[str, Any]) -> List[Dict]:
+        """Filter with indexed SQL instead of scanning the materialized catalog"""
+        with self.lock:
+            self.load_catalog()
+            clauses, params = [], []
+
+            name_filter = filters.get("name_filter")
+            if name_filter:
+                if self.tokenizer == "trigram" and len(name_filter) >= 3:
+                    clauses.append("id IN (SELECT id FROM talents_fts WHERE talents_fts MATCH ?)")
+                    params.append('name : "' + name_filter.replace('"', '""') + '"')
+                else:
+                    clauses.append("name LIKE ? ESCAPE '\\'")
+                    params.append("%" + name_filter.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+
+            search = filters.get("search")
+            if search:
+                # Only trigram MATCH has the substring semantics of the in-memory filter
+                if self.tokenizer == "trigram" and len(search) >= 3:
+                    clauses.append("id IN (SELECT id FROM talents_fts WHERE talents_fts MATCH ?)")
+                    params.append('"' + search.replace('"', '""') + '"')
+                else:
+                    clauses.append("(name LIKE ? ESCAPE '\\' OR description LIKE ? ESCAPE '\\')")
+                    params.extend(["%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"] * 2)
+
+            tag_filters = filters.get("tag_filter")
+            if tag_filters:
+                if isinstance(tag_filters, str):
+                    tag_filters = [tag_filters]
+                marks = ", ".join("?" for _ in tag_filters)
+                if filters.get("tag_logic") == "AND":
+                    clauses.append(f"id IN (SELECT talent_id FROM talent_tags WHERE tag IN ({marks}) "
+                                   f"GROUP BY talent_id HAVING COUNT(*) = ?)")
+                    params.extend(tag_filters)
+                    params.append(len(set(tag_filters)))
+                else:
+                    clauses.append(f"id IN (SELECT talent_id FROM talent_tags WHERE tag IN ({marks}))")
+                    params.extend(tag_filters)
+
+            for attr in ['gender', 'age_group', 'ethnicity', 'skin_tone', 'hair_color', 'hair_style', 'eye_color', 'body_type']:
+                if filters.get(attr):
+                    clauses.append(f"{attr} = ?")
+                    params.append(filters[attr])
+
+            if filters.get("favorites_only"):
+                favorite_ids = filters.get("favorite_ids")
+                if favorite_ids is not None:
+                    clauses.append("id IN (SELECT value FROM json_each(?))")
+                    params.append(json.dumps(sorted(favorite_ids)))
+                else:
+                    clauses.append("is_favorite = 1")
+
+            where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+            rows = self.conn.execute(f"SELECT id FROM talents {where} ORDER BY position", params)
+            return [self.talent_index[row["id"]] for row in rows if row["id"] in self.talent_index]
+
+    def import_json(self, json_path: str) -> int:
+        """Replace the database content with a catalog.json file, returns the talent count"""
+        with open(json_path, 'r', encoding='utf-8') as f:
+            catalog_data = json.load(f)
+        if not self.save_catalog(catalog_data):
+            raise sqlite3.DatabaseError(f"Could not import {json_path}")
+        return len(catalog_data.get("talents", []))
+
+    def export_json(self, json_path: str) -> int:
+        """Write the catalog in the catalog.json layout, returns the talent count"""
+        catalog_data = self.load_catalog()
+        atomic_write_json(json_path, catalog_data)
+        return len(catalog_data.get("talents", []))
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on error"""
+
+    def __init__(self, manager: SQLiteCatalogManager):
+        self.conn = manager.conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("COMMIT" if exc_type is None else "ROLLBACK")
+        return False
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import or export the Morpheus SQLite catalog")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("json_path", help="catalog.json to read (import) or write (export)")
+    parser.add_argument("--db", help="database path (default: next to the local catalog.json)")
+    args = parser.parse_args(argv)
+
+    from .morpheus_model_management import LOCAL_CATALOG_PATH
+    manager = SQLiteCatalogManager(LOCAL_CATALOG_PATH, db_path=args.db)
+    try:
+        if args.action == "import":
+            count = manager.import_json(args.json_path)
+        else:
+            count = manager.export_json(args.json_path)
+    except (IOError, json.JSONDecodeError, sqlite3.Error) as e:
+        print(f"Morpheus: {args.action} failed: {e}")
+        return 1
+    print(f"Morpheus: {args.action}ed {count} talents ({manager.db_path})")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,16 @@
+"""
+Load the custom node directory as a package, the way ComfyUI imports it
+"""
+
+import os
+import sys
+import importlib.util
+
+PACKAGE_NAME = "comfyui_morpheus_model_management"
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if PACKAGE_NAME not in sys.modules:
+    # Only the package object: submodules are imported by the tests that need them
+    spec = importlib.util.spec_from_file_location(PACKAGE_NAME, os.path.join(PACKAGE_DIR, "__init__.py"),
+                                                  submodule_search_locations=[PACKAGE_DIR])
+    sys.modules[PACKAGE_NAME] = importlib.util.module_from_spec(spec)
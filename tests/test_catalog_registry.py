@@ -0,0 +1,42 @@
+import gc
+import os
+import json
+
+from comfyui_morpheus_model_management import schema
+
+def write_catalog(path, talents):
+    path.write_text(json.dumps({"talents": talents}), encoding="utf-8")
+
+def test_evicted_manager_keeps_working_while_held(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "CATALOG_MANAGER_LIMIT", 2)
+    held_path = tmp_path / "held" / "catalog.json"
+    held_path.parent.mkdir()
+    write_catalog(held_path, [{"id": "a", "name": "A", "image_path": "images/a.jpg"}])
+    held = schema.get_catalog_manager(str(held_path))
+    held.load_catalog()
+
+    # Push it out of the registry's recently used set
+    for i in range(4):
+        other = tmp_path / f"other{i}" / "catalog.json"
+        other.parent.mkdir()
+        write_catalog(other, [])
+        schema.get_catalog_manager(str(other)).load_catalog()
+    assert os.path.realpath(held_path) not in schema._catalog_managers
+
+    held.add_talent({"id": "b", "name": "B", "image_path": "images/b.jpg"})
+    held.commit_revision()
+    held.schedule_save()
+    assert held.flush()
+    assert [t["id"] for t in json.loads(held_path.read_text(encoding="utf-8"))["talents"]] == ["a", "b"]
+    # Still the one shared manager for that path
+    assert schema.get_catalog_manager(str(held_path)) is held
+
+def test_unreferenced_managers_are_released(tmp_path, monkeypatch):
+    monkeypatch.setattr(schema, "CATALOG_MANAGER_LIMIT", 2)
+    for i in range(6):
+        schema.get_catalog_manager(str(tmp_path / f"c{i}.json")).load_catalog()
+    gc.collect()
+    assert len(schema._catalog_managers) == 2
+    root = os.path.realpath(tmp_path)
+    assert not any(key.startswith(root) and key not in schema._catalog_managers
+                   for key in schema._live_catalog_managers.keys())
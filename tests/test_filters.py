@@ -0,0 +1,42 @@
+from comfyui_morpheus_model_management.morpheus_model_management import (
+    CatalogSnapshot, MorpheusModelManagement, parse_filter_spec
+)
+from comfyui_morpheus_model_management.schema import CatalogManager
+
+TALENTS = [
+    {"id": "a", "name": "Ann", "image_path": "images/a.jpg", "gender": "female", "hair_color": "blonde",
+     "eye_color": "blue", "tags": ["editorial"]},
+    {"id": "b", "name": "Bea", "image_path": "images/b.jpg", "gender": "female", "hair_color": "black",
+     "eye_color": "blue", "tags": ["sporty"]},
+    {"id": "c", "name": "Cal", "image_path": "images/c.jpg", "gender": "male", "hair_color": "blonde",
+     "body_type": "athletic", "tags": ["editorial"]},
+]
+
+SPECS = [
+    "hair_color=blonde",
+    "gender=female&hair_color=blonde",
+    "eye_color=blue",
+    "body_type=athletic&tags=editorial",
+    '{"hair_color": "black", "gender": "female"}',
+]
+
+def remote_snapshot():
+    return CatalogSnapshot({"talents": [dict(t) for t in TALENTS]}, "remote", version=1)
+
+def test_remote_snapshot_applies_every_spec_attribute():
+    snapshot = remote_snapshot()
+    assert [t["id"] for t in snapshot.filter(parse_filter_spec("hair_color=blonde"))] == ["a", "c"]
+    assert [t["id"] for t in snapshot.filter(parse_filter_spec("body_type=athletic"))] == ["c"]
+
+def test_remote_and_local_filters_agree(tmp_path):
+    manager = CatalogManager(str(tmp_path / "catalog.json"))
+    manager.save_catalog({"talents": [dict(t) for t in TALENTS]})
+    remote = remote_snapshot()
+    for spec in SPECS:
+        filters = parse_filter_spec(spec)
+        local_ids = [t["id"] for t in manager.filter_talents(manager.load_catalog()["talents"], filters)]
+        assert [t["id"] for t in remote.filter(filters)] == local_ids, spec
+
+def test_batch_without_ids_or_filter_takes_the_first_talents():
+    selected = MorpheusModelManagement._select_batch_talents(remote_snapshot(), "", "", 2)
+    assert [t["id"] for t in selected] == ["a", "b"]
@@ -0,0 +1,230 @@
+"""
+Morpheus Model Management - Thumbnail generation
+Module-level helpers so thumbnails can be rendered in worker processes, and a
+background builder that keeps a catalog's thumbnails current
+"""
+
+import os
+import json
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from .persistence import atomic_write_json
+
+THUMBNAIL_SIZE = 150
+
+def make_thumbnail(image_path: str, thumbnail_path: str, size: int = THUMBNAIL_SIZE) -> Optional[str]:
+    """Write a JPEG thumbnail, returns an error message or None"""
+    try:
+        with Image.open(image_path) as img:
+            img.draft('RGB', (size, size))
+            img.thumbnail((size, size), Image.LANCZOS)
+
+            # Convert to RGB if needed (for PNG with transparency)
+            if img.mode in ('RGBA', 'LA', 'P'):
+                if img.mode == 'P':
+                    img = img.convert('RGBA')
+                background = Image.new('RGB', img.size, (255, 255, 255))
+                background.paste(img, mask=img.split()[-1])
+                img = background
+            elif img.mode != 'RGB':
+                img = img.convert('RGB')
+
+            os.makedirs(os.path.dirname(thumbnail_path), exist_ok=True)
+            temp_path = thumbnail_path + ".tmp"
+            img.save(temp_path, 'JPEG', quality=85)
+            os.replace(temp_path, thumbnail_path)
+        return None
+    except Exception as e:
+        return str(e)
+
+def _make_thumbnail_job(job: Tuple[str, str, int]) -> Optional[str]:
+    return make_thumbnail(*job)
+
+def generate_thumbnails(jobs: List[Tuple[str, str]], size: int = THUMBNAIL_SIZE, workers: int = 4,
+                        progress: Optional[Callable[[str, Optional[str]], None]] = None) -> Dict[str, Optional[str]]:
+    """Render (image_path, thumbnail_path) jobs in a process pool
+
+    Returns thumbnail_path -> error (None on success), and calls
+    `progress(thumbnail_path, error)` as each job completes. Small batches run
+    inline, and a pool that cannot start (restricted platforms, pickling
+    issues) falls back to threads, where PIL still releases the GIL while
+    decoding.
+    """
+    args = [(image_path, thumbnail_path, size) for image_path, thumbnail_path in jobs]
+    results: Dict[str, Optional[str]] = {}
+
+    def collect(job_results):
+        for job, error in zip(args[len(results):], job_results):
+            results[job[1]] = error
+            if progress:
+                progress(job[1], error)
+
+    if len(args) <= 2 or workers <= 1:
+        collect(map(_make_thumbnail_job, args))
+        return results
+
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(args))) as executor:
+            collect(executor.map(_make_thumbnail_job, args, chunksize=4))
+    except (BrokenProcessPool, OSError, ImportError) as e:
+        print(f"Morpheus: Thumbnail process pool unavailable ({e}), using threads")
+        with ThreadPoolExecutor(max_workers=min(workers, len(args))) as executor:
+            collect(executor.map(_make_thumbnail_job, args[len(results):]))
+    return results
+
+class ThumbnailBuilder:
+    """Keeps a catalog's .thumbnails directory in step with its images, off the caller's thread
+
+    A manifest records the source size and mtime each thumbnail was rendered
+    from. `schedule()` returns immediately; a background thread diffs the
+    talents against the manifest and renders only missing or stale
+    thumbnails, so new and replaced images are picked up without redoing
+    the rest. Thumbnails written elsewhere (uploads, imports) are adopted
+    when they are newer than their source.
+    """
+
+    def __init__(self, base_path: str, size: int = THUMBNAIL_SIZE, workers: int = 4):
+        self.base_path = base_path
+        self.thumb_dir = os.path.join(base_path, ".thumbnails")
+        self.manifest_path = os.path.join(self.thumb_dir, "manifest.json")
+        self.size = size
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.manifest: Optional[Dict[str, Dict[str, Any]]] = None
+        self.pending_talents: Optional[List[Dict[str, Any]]] = None
+        self.scheduled_version = None
+        self.thread = None
+        self.status: Dict[str, Any] = {"state": "idle", "total": 0, "done": 0, "failed": 0,
+                                       "started_at": None, "finished_at": None, "errors": {}}
+
+    def thumbnail_path(self, talent_id: str) -> str:
+        return os.path.join(self.thumb_dir, f"{talent_id}_thumb.jpg")
+
+    def schedule(self, talents: List[Dict[str, Any]], version: Any = None, force: bool = False):
+        """Queue a sync against these talents, a no-op for an already scheduled version"""
+        with self.lock:
+            if not force and version is not None and version == self.scheduled_version:
+                return
+            self.scheduled_version = version
+            self.pending_talents = list(talents)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="morpheus-thumbnails", daemon=True)
+                self.thread.start()
+
+    def progress(self) -> Dict[str, Any]:
+        with self.lock:
+            return {**self.status, "errors": dict(self.status["errors"])}
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the builder is idle (for scripts and shutdown), returns False on timeout"""
+        thread = self.thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def _run(self):
+        while True:
+            with self.lock:
+                talents, self.pending_talents = self.pending_talents, None
+                if talents is None:
+                    self.thread = None
+                    return
+            try:
+                self._sync(talents)
+            except Exception as e:
+                print(f"Morpheus: Thumbnail build failed: {e}")
+                with self.lock:
+                    self.status.update(state="error", finished_at=time.time())
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if self.manifest is None:
+            self.manifest = {}
+            if os.path.exists(self.manifest_path):
+                try:
+                    with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                        self.manifest = json.load(f).get("thumbnails", {})
+                except (json.JSONDecodeError, IOError, AttributeError) as e:
+                    print(f"Morpheus: Ignoring unreadable thumbnail manifest: {e}")
+        return self.manifest
+
+    def _sync(self, talents: List[Dict[str, Any]]):
+        manifest = dict(self._load_manifest())
+        jobs, sources = [], {}
+        for talent in talents:
+            talent_id, image_path = talent.get("id"), talent.get("image_path")
+            if not talent_id or not image_path or image_path.startswith(("http://", "https://")):
+                continue
+            source = os.path.join(self.base_path, image_path)
+            try:
+                stat = os.stat(source)
+            except OSError:
+                continue
+            entry = {"source": image_path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "thumb_size": self.size}
+            thumb_path = self.thumbnail_path(talent_id)
+            if manifest.get(talent_id) == entry and os.path.exists(thumb_path):
+                continue
+            if talent_id not in manifest:
+                try:
+                    if os.stat(thumb_path).st_mtime_ns >= stat.st_mtime_ns:
+                        manifest[talent_id] = entry
+                        continue
+                except OSError:
+                    pass
+            jobs.append((source, thumb_path))
+            sources[thumb_path] = (talent_id, entry)
+
+        # Thumbnails of talents that left the catalog
+        live_ids = {talent.get("id") for talent in talents}
+        for talent_id in [talent_id for talent_id in manifest if talent_id not in live_ids]:
+            del manifest[talent_id]
+            try:
+                os.remove(self.thumbnail_path(talent_id))
+            except OSError:
+                pass
+
+        with self.lock:
+            self.status = {"state": "running" if jobs else "idle", "total": len(jobs), "done": 0, "failed": 0,
+                           "started_at": time.time(), "finished_at": None, "errors": {}}
+
+        def on_progress(thumb_path: str, error: Optional[str]):
+            talent_id, entry = sources[thumb_path]
+            with self.lock:
+                self.status["done"] += 1
+                if error:
+                    self.status["failed"] += 1
+                    self.status["errors"][talent_id] = error
+                else:
+                    manifest[talent_id] = entry
+
+        if jobs:
+            print(f"Morpheus: Building {len(jobs)} thumbnails in the background")
+            os.makedirs(self.thumb_dir, exist_ok=True)
+            generate_thumbnails(jobs, self.size, self.workers, progress=on_progress)
+
+        if manifest != self.manifest:
+            self.manifest = manifest
+            atomic_write_json(self.manifest_path, {"thumbnails": manifest}, indent=None)
+        with self.lock:
+            self.status.update(state="idle", finished_at=time.time())
+        if jobs:
+            print(f"Morpheus: Thumbnails up to date ({self.status['failed']} failed)")
+
+_builders: Dict[str, ThumbnailBuilder] = {}
+_builders_lock = threading.Lock()
+
+def get_thumbnail_builder(base_path: str, size: int = THUMBNAIL_SIZE, workers: int = 4) -> ThumbnailBuilder:
+    """Shared builder for a catalog directory"""
+    key = os.path.realpath(base_path)
+    with _builders_lock:
+        builder = _builders.get(key)
+        if builder is None:
+            builder = ThumbnailBuilder(base_path, size, workers)
+            _builders[key] = builder
+        return builder
@@ -0,0 +1,160 @@
+"""
+Morpheus Model Management - Gallery UI state store
+Keeps per-node gallery state in memory and persists it in small shard files
+"""
+
+import os
+import re
+import copy
+import json
+import time
+import zlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Set
+
+from .persistence import DebouncedFlusher, atomic_write_json
+
+class UIStateStore:
+    """Node UI state keyed by "<gallery_id>_<node_id>"
+
+    Entries live in an LRU map; each belongs to a shard, named after the
+    workflow when the client sends one and a hash bucket of the gallery id
+    otherwise. Updates only mark their shard dirty and a debounced flush
+    rewrites just the dirty shard files. Entries beyond `max_entries` or not
+    touched for `max_age_days` are dropped, so the files stop growing with
+    node ids from long-deleted workflows.
+    """
+
+    def __init__(self, state_dir: str, legacy_file: Optional[str] = None, max_entries: int = 1000,
+                 max_age_days: float = 90, shards: int = 16):
+        self.state_dir = state_dir
+        self.legacy_file = legacy_file
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400
+        self.shards = shards
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.dirty_shards: Set[str] = set()
+        self.loaded = False
+        self.flusher = DebouncedFlusher(self._write_dirty_shards, delay=1.0, max_delay=5.0,
+                                        name="morpheus-ui-state-flush")
+
+    def shard_for(self, gallery_id: str, workflow_id: str = "") -> str:
+        if workflow_id:
+            return "wf_" + re.sub(r'[^a-zA-Z0-9_-]', '_', workflow_id)[:64]
+        return f"shard_{zlib.crc32(gallery_id.encode('utf-8')) % self.shards:02d}"
+
+    def _shard_path(self, shard: str) -> str:
+        return os.path.join(self.state_dir, f"{shard}.json")
+
+    def _ensure_loaded(self):
+        if self.loaded:
+            return
+        self.loaded = True
+        if not os.path.isdir(self.state_dir):
+            self._migrate_legacy_file()
+            return
+
+        loaded = []
+        for filename in os.listdir(self.state_dir):
+            if not filename.endswith(".json"):
+                continue
+            shard = filename[:-5]
+            try:
+                with open(self._shard_path(shard), 'r', encoding='utf-8') as f:
+                    for key, entry in json.load(f).items():
+                        loaded.append((entry.get("touched", 0), key, shard, entry.get("state", {})))
+            except (json.JSONDecodeError, IOError, AttributeError) as e:
+                print(f"Morpheus: Ignoring unreadable UI state shard {filename}: {e}")
+        for touched, key, shard, state in sorted(loaded, key=lambda item: item[0]):
+            self.entries[key] = {"shard": shard, "state": state, "touched": touched}
+        self._expire()
+
+    def _migrate_legacy_file(self):
+        """One-time import of the single morpheus_ui_state.json file"""
+        if not self.legacy_file or not os.path.exists(self.legacy_file):
+            return
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                legacy = json.loads(f.read() or "{}")
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Morpheus: Could not migrate {self.legacy_file}: {e}")
+            return
+        now = time.time()
+        for key, state in legacy.items():
+            gallery_id = key.rsplit("_", 1)[0]
+            shard = self.shard_for(gallery_id)
+            self.entries[key] = {"shard": shard, "state": state, "touched": now}
+            self.dirty_shards.add(shard)
+        self._expire()
+        if self.dirty_shards:
+            print(f"Morpheus: Migrated {len(self.entries)} UI state entries to {self.state_dir}")
+            self.flusher.mark_dirty()
+
+    def _expire(self):
+        cutoff = time.time() - self.max_age
+        while self.entries:
+            key, entry = next(iter(self.entries.items()))
+            if len(self.entries) <= self.max_entries and entry["touched"] >= cutoff:
+                break
+            self.entries.popitem(last=False)
+            self.dirty_shards.add(entry["shard"])
+
+    def get(self, gallery_id: str, node_id: str) -> Optional[Dict[str, Any]]:
+        key = f"{gallery_id}_{node_id}"
+        with self.lock:
+            self._ensure_loaded()
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)
+            now = time.time()
+            # Reads keep an entry alive; persisting that is only worth it once a day
+            if now - entry["touched"] > 86400:
+                entry["touched"] = now
+                self.dirty_shards.add(entry["shard"])
+                self.flusher.mark_dirty()
+            return entry["state"]
+
+    def update(self, gallery_id: str, node_id: str, state: Dict[str, Any], workflow_id: str = ""):
+        """Merge `state` into the node's entry"""
+        key = f"{gallery_id}_{node_id}"
+        with self.lock:
+            self._ensure_loaded()
+            entry = self.entries.pop(key, None)
+            shard = self.shard_for(gallery_id, workflow_id)
+            if entry is None:
+                entry = {"shard": shard, "state": {}, "touched": 0}
+            elif entry["shard"] != shard:
+                # Moved to a workflow shard, drop it from the old file
+                self.dirty_shards.add(entry["shard"])
+                entry["shard"] = shard
+            entry["state"].update(state)
+            entry["touched"] = time.time()
+            self.entries[key] = entry
+            self.dirty_shards.add(shard)
+            self._expire()
+        self.flusher.mark_dirty()
+
+    def _write_dirty_shards(self):
+        with self.lock:
+            shards, self.dirty_shards = self.dirty_shards, set()
+            contents = {shard: {} for shard in shards}
+            for key, entry in self.entries.items():
+                if entry["shard"] in contents:
+                    contents[entry["shard"]][key] = {"state": entry["state"], "touched": entry["touched"]}
+            data = copy.deepcopy(contents)
+        try:
+            for shard, entries in data.items():
+                if entries:
+                    atomic_write_json(self._shard_path(shard), entries, indent=None)
+                elif os.path.exists(self._shard_path(shard)):
+                    os.remove(self._shard_path(shard))
+        except Exception:
+            with self.lock:
+                self.dirty_shards |= shards
+            raise
+
+    def flush(self) -> bool:
+        return self.flusher.flush()
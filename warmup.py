@@ -0,0 +1,278 @@
+"""
+Morpheus Model Management - Remote image cache warm-up
+Downloads every talent image of the remote catalog into REMOTE_IMAGE_CACHE_DIR
+
+Run from the ComfyUI custom_nodes directory:
+    python -m comfyui_morpheus_model_management.warmup --workers 8 --max-kbps 4096
+"""
+
+import os
+import json
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from .config import WARMUP_DEFAULT_WORKERS, WARMUP_DEFAULT_MAX_KBPS
+from .morpheus_model_management import (
+    REMOTE_IMAGE_CACHE_DIR, BandwidthLimiter, ensure_cache_dir, get_cached_image_path,
+    stream_remote_image, fetch_remote_catalog, add_remote_image_urls
+)
+
+WARMUP_MANIFEST_FILE = os.path.join(REMOTE_IMAGE_CACHE_DIR, "warmup_manifest.json")
+
+class WarmupCancelled(Exception):
+    """Raised inside download workers when the warm-up is cancelled"""
+
+class CatalogWarmup:
+    """Walks the remote catalog and makes sure every talent image is cached locally
+
+    Progress is written to WARMUP_MANIFEST_FILE while the job runs. If the job is
+    interrupted, the next run picks up the unfinished manifest and skips every
+    image already verified during that run; partially downloaded files are
+    resumed with HTTP Range requests by `stream_remote_image`.
+    """
+
+    def __init__(self, workers: int = WARMUP_DEFAULT_WORKERS, max_kbps: int = WARMUP_DEFAULT_MAX_KBPS,
+                 revalidate: bool = True, force: bool = False, progress_callback=None):
+        self.workers = max(1, int(workers))
+        self.limiter = BandwidthLimiter(int(max_kbps) * 1024)
+        self.revalidate = revalidate
+        self.force = force
+        self.progress_callback = progress_callback
+        self.cancel_event = threading.Event()
+        self.lock = threading.Lock()
+        self.manifest = {}
+        self.progress = {"state": "idle", "total": 0, "done": 0, "failed": 0, "bytes": 0}
+
+    def cancel(self):
+        """Ask running workers to stop after their current chunk"""
+        self.cancel_event.set()
+
+    def status(self) -> Dict[str, Any]:
+        with self.lock:
+            return dict(self.progress)
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        if os.path.exists(WARMUP_MANIFEST_FILE):
+            try:
+                with open(WARMUP_MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (json.JSONDecodeError, IOError) as e:
+                print(f"Morpheus: Ignoring unreadable warm-up manifest: {e}")
+        return {}
+
+    def _save_manifest(self):
+        ensure_cache_dir()
+        temp_path = WARMUP_MANIFEST_FILE + ".tmp"
+        with self.lock:
+            data = json.dumps(self.manifest, indent=2, ensure_ascii=False)
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_path, WARMUP_MANIFEST_FILE)
+        except IOError as e:
+            print(f"Morpheus: Error saving warm-up manifest: {e}")
+
+    def _needs_work(self, talent_id: str, image_url: str, entries: Dict[str, Any], resume_since: str) -> bool:
+        entry = entries.get(talent_id)
+        cached = os.path.exists(get_cached_image_path(talent_id))
+        if self.force or not cached or not entry or entry.get('url') != image_url:
+            return True
+        if resume_since and entry.get('verified_at', '') >= resume_since:
+            return False
+        return self.revalidate
+
+    def _report(self):
+        status = self.status()
+        if self.progress_callback:
+            self.progress_callback(status)
+        else:
+            total = status['total'] or 1
+            print(f"Morpheus: Warm-up {status['done']}/{status['total']} "
+                  f"({status['done'] * 100 // total}%), {status['failed']} failed, "
+                  f"{status['bytes'] / (1024 * 1024):.1f} MB transferred")
+
+    def _download(self, talent_id: str, image_url: str, entry: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        def check_cancel(done, total):
+            if self.cancel_event.is_set():
+                raise WarmupCancelled()
+
+        validators = None
+        if entry and entry.get('url') == image_url:
+            validators = {"etag": entry.get('etag', ''), "last_modified": entry.get('last_modified', '')}
+        return stream_remote_image(talent_id, image_url, validators=validators, limiter=self.limiter,
+                                   progress_callback=check_cancel, force=self.force)
+
+    def _collect(self, futures, entries: Dict[str, Any]):
+        """Record each finished download in the manifest as results arrive"""
+        for future in as_completed(futures):
+            talent_id, image_url = futures[future]
+            try:
+                result = future.result()
+            except WarmupCancelled:
+                continue
+
+            with self.lock:
+                self.progress['done'] += 1
+                if result['status'] == 'error':
+                    self.progress['failed'] += 1
+                    self.manifest['summary']['failed'] += 1
+                    entries[talent_id] = {"url": image_url, "status": "error", "error": result.get('error', '')}
+                else:
+                    self.progress['bytes'] += result['bytes'] if result['status'] == 'downloaded' else 0
+                    self.manifest['summary'][result['status']] += 1
+                    entries[talent_id] = {
+                        "url": image_url,
+                        "path": os.path.basename(result['path']),
+                        "bytes": os.path.getsize(result['path']),
+                        "etag": result['etag'],
+                        "last_modified": result['last_modified'],
+                        "status": "ok",
+                        "verified_at": datetime.now().isoformat(),
+                    }
+                done = self.progress['done']
+
+            if done % 25 == 0:
+                self._save_manifest()
+                self._report()
+
+    def run(self, talents: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        """Run the warm-up to completion (or cancellation) and return the manifest"""
+        if talents is None:
+            catalog_data = fetch_remote_catalog()
+            if not catalog_data:
+                raise RuntimeError("Failed to fetch remote catalog")
+            talents = [dict(t) for t in catalog_data.get('talents', [])]
+            add_remote_image_urls(talents)
+
+        ensure_cache_dir()
+        previous = self._load_manifest()
+        resuming = bool(previous) and not previous.get('complete', False)
+        now = datetime.now().isoformat()
+
+        self.manifest = {
+            "started_at": previous.get('started_at', now) if resuming else now,
+            "completed_at": None,
+            "complete": False,
+            "catalog_talents": len(talents),
+            "summary": {"downloaded": 0, "not_modified": 0, "skipped": 0, "failed": 0},
+            "entries": previous.get('entries', {}),
+        }
+        entries = self.manifest['entries']
+        resume_since = self.manifest['started_at'] if resuming else ""
+
+        work = []
+        for talent in talents:
+            talent_id = talent.get('id', '')
+            image_url = talent.get('image_path') or talent.get('full_image_url') or talent.get('thumbnail_url')
+            if not talent_id or not image_url:
+                continue
+            if self._needs_work(talent_id, image_url, entries, resume_since):
+                work.append((talent_id, image_url))
+            else:
+                self.manifest['summary']['skipped'] += 1
+
+        with self.lock:
+            self.progress = {"state": "running", "total": len(work), "done": 0, "failed": 0, "bytes": 0,
+                             "skipped": self.manifest['summary']['skipped']}
+        if resuming:
+            print(f"Morpheus: Resuming warm-up started at {resume_since}")
+        self._save_manifest()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(self._download, talent_id, image_url, entries.get(talent_id)): (talent_id, image_url)
+                for talent_id, image_url in work
+            }
+            try:
+                self._collect(futures, entries)
+            except KeyboardInterrupt:
+                # Let in-flight workers stop at their next chunk, keep progress for resume
+                self.cancel()
+                for future in futures:
+                    future.cancel()
+                self._save_manifest()
+                raise
+
+        cancelled = self.cancel_event.is_set()
+        self.manifest['complete'] = not cancelled and self.manifest['summary']['failed'] == 0
+        if not cancelled:
+            self.manifest['completed_at'] = datetime.now().isoformat()
+        self._save_manifest()
+
+        with self.lock:
+            self.progress['state'] = "cancelled" if cancelled else "completed"
+        self._report()
+        return self.manifest
+
+# Background job driven by the /morpheus/cache/warmup endpoint
+_active_warmup: Optional[CatalogWarmup] = None
+_active_warmup_lock = threading.Lock()
+
+def start_background_warmup(**options) -> CatalogWarmup:
+    """Start a warm-up on a daemon thread unless one is already running"""
+    global _active_warmup
+    with _active_warmup_lock:
+        if _active_warmup and _active_warmup.status().get('state') == 'running':
+            return _active_warmup
+        job = CatalogWarmup(**options)
+        job.progress['state'] = 'running'
+        _active_warmup = job
+
+    def target():
+        try:
+            job.run()
+        except Exception as e:
+            print(f"Morpheus: Warm-up failed: {e}")
+            with job.lock:
+                job.progress['state'] = 'error'
+                job.progress['error'] = str(e)
+
+    threading.Thread(target=target, name="morpheus-warmup", daemon=True).start()
+    return job
+
+def get_warmup_status() -> Dict[str, Any]:
+    """Current job progress plus the last completion manifest summary"""
+    status = _active_warmup.status() if _active_warmup else {"state": "idle"}
+    if os.path.exists(WARMUP_MANIFEST_FILE):
+        try:
+            with open(WARMUP_MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            status['manifest'] = {k: manifest.get(k) for k in ('started_at', 'completed_at', 'complete', 'catalog_talents', 'summary')}
+        except (json.JSONDecodeError, IOError):
+            pass
+    return status
+
+def cancel_warmup() -> bool:
+    if _active_warmup and _active_warmup.status().get('state') == 'running':
+        _active_warmup.cancel()
+        return True
+    return False
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Download every remote talent image into the local Morpheus cache")
+    parser.add_argument("--workers", type=int, default=WARMUP_DEFAULT_WORKERS, help="parallel downloads")
+    parser.add_argument("--max-kbps", type=int, default=WARMUP_DEFAULT_MAX_KBPS, help="bandwidth cap in KiB/s (0 = unlimited)")
+    parser.add_argument("--no-revalidate", action="store_true", help="trust cached images without a conditional request")
+    parser.add_argument("--force", action="store_true", help="download every image again")
+    args = parser.parse_args(argv)
+
+    job = CatalogWarmup(workers=args.workers, max_kbps=args.max_kbps,
+                        revalidate=not args.no_revalidate, force=args.force)
+    try:
+        manifest = job.run()
+    except KeyboardInterrupt:
+        job.cancel()
+        print("Morpheus: Warm-up interrupted - run again to resume")
+        return 130
+    except RuntimeError as e:
+        print(f"Morpheus: {e}")
+        return 1
+
+    print(f"Morpheus: Manifest written to {WARMUP_MANIFEST_FILE}")
+    return 0 if manifest.get('complete') else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())